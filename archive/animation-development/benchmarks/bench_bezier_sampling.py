@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Batch Bezier Sampling
+Compare the scalar cubic_bezier loop with the Bernstein-basis sampler from 1e3 to 1e7 samples
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'phase1-analysis'))
+
+from analyze_svg_path import cubic_bezier, parse_svg_path, read_flux_path
+from bezier_batch import sample_segments, segments_to_controls
+
+SAMPLES_PER_SEGMENT = 100
+SAMPLE_COUNTS = [10**3, 10**4, 10**5, 10**6, 10**7]
+# The scalar loop takes minutes beyond this, so it is only timed up to here
+MAX_SCALAR_SAMPLES = 10**5
+
+
+def build_controls(total_samples):
+    """Tile the flux curve's segments until the path holds total_samples samples"""
+    start_point, bezier_segments = parse_svg_path(read_flux_path())
+    base = segments_to_controls(start_point, bezier_segments)
+    n_segments = max(1, total_samples // SAMPLES_PER_SEGMENT)
+    repeats = -(-n_segments // len(base))
+    controls = np.tile(base, (repeats, 1, 1))[:n_segments]
+    # Shift each copy right so the tiled path stays continuous in x
+    span = base[-1, 3, 0] - base[0, 0, 0]
+    copy_index = np.arange(n_segments) // len(base)
+    controls[:, :, 0] += (copy_index * span)[:, None]
+    return controls
+
+
+def sample_scalar(controls, samples_per_segment):
+    """Reference implementation: one cubic_bezier call per sample"""
+    return np.array([
+        cubic_bezier(i / samples_per_segment, *segment)
+        for segment in controls
+        for i in range(samples_per_segment)
+    ])
+
+
+def best_time(func, *args, repeat=3):
+    """Best wall time of func(*args) over a few runs"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run_benchmark():
+    """Time both samplers and report throughput and agreement"""
+    print("=== Benchmark: Batch Bezier Sampling ===\n")
+    print(f"{'samples':>10} {'segments':>9} {'scalar (s)':>11} {'batch (s)':>10} {'Msamples/s':>11} {'speedup':>8} {'max diff':>9}")
+
+    for total in SAMPLE_COUNTS:
+        controls = build_controls(total)
+        batch_time, points = best_time(sample_segments, controls, SAMPLES_PER_SEGMENT)
+        throughput = len(points) / batch_time / 1e6
+
+        if total <= MAX_SCALAR_SAMPLES:
+            scalar_time, reference = best_time(sample_scalar, controls, SAMPLES_PER_SEGMENT, repeat=1)
+            speedup = f"{scalar_time / batch_time:7.0f}x"
+            scalar_text = f"{scalar_time:11.4f}"
+            max_diff = f"{np.abs(points - reference).max():9.1e}"
+        else:
+            speedup = f"{'-':>8}"
+            scalar_text = f"{'-':>11}"
+            max_diff = f"{'-':>9}"
+
+        print(f"{len(points):>10} {len(controls):>9} {scalar_text} {batch_time:10.4f} {throughput:11.1f} {speedup} {max_diff}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Generated-CSS Check: Keyframes Resolve and Stay in Sync
+Render every stylesheet the phase 6/7 generators and the pipeline emit (pretty and minified) plus
+the committed outputs in the frame simulator, and fail when a .region-N rule animates @keyframes
+that are not defined or the flares drift from the flux curve
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_DIR = os.path.join(BENCH_DIR, '..', 'phase2-7-scripts')
+CSS_DIR = os.path.join(BENCH_DIR, '..', 'css-iterations')
+sys.path.insert(0, SCRIPTS_DIR)
+
+from frame_simulator import score_stylesheet
+from phase6_continuous import calculate_continuous_breathing
+from phase7_blending import calculate_blended_timing
+from pipeline import PARAMS_FILE, flux_path, load_params, run_pipeline
+
+MAX_SYNC_ERROR = 0.35   # the generated stylesheets score 0.26-0.32 against the blog curve
+COMMITTED = ('blended_timing.css', 'continuous_breathing.css')
+
+
+def generated_stylesheets(params, page):
+    """(label, css) of every generator output and the committed copies of them"""
+    for minify in (False, True):
+        suffix = ' --minify' if minify else ''
+        for label, generate in (('phase6_continuous', calculate_continuous_breathing), ('phase7_blending', calculate_blended_timing)):
+            buffer = io.StringIO()
+            with contextlib.redirect_stdout(io.StringIO()):
+                generate(buffer, minify=minify)
+            yield label + suffix, buffer.getvalue()
+        values, _ = run_pipeline(params, page, minify=minify, use_cache=False)
+        for stage in ('continuous_css', 'blended_css'):
+            yield f'pipeline {stage}{suffix}', values[stage]
+    for filename in COMMITTED:
+        with open(os.path.join(CSS_DIR, filename)) as f:
+            yield f'css-iterations/{filename}', f.read()
+    yield 'blog page', page
+
+
+def check_generated_css(params_path=PARAMS_FILE, max_sync_error=MAX_SYNC_ERROR):
+    """Score every generated stylesheet; returns True when all resolve and stay in sync"""
+    params = load_params(params_path)
+    with open(params['blog_page']) as f:
+        page = f.read()
+    path_d = flux_path(page)
+
+    print("=== Generated-CSS Check ===\n")
+    failures = []
+    for label, css in generated_stylesheets(params, page):
+        try:
+            result = score_stylesheet(css, path_d, params['duration'])
+        except ValueError as error:
+            failures.append(f"{label}: {error}")
+            print(f"  {label:<40} FAIL")
+            continue
+        rules = len(result['frames']) + len(result['missing'])
+        print(f"  {label:<40} {len(result['frames'])}/{rules} regions, sync error {result['sync_error']:.4f}")
+        failures += [f"{label}: {selector} animates undefined @keyframes {name}" for selector, name in result['missing']]
+        if result['sync_error'] > max_sync_error:
+            failures.append(f"{label}: sync error {result['sync_error']:.4f} above {max_sync_error}")
+
+    for failure in failures:
+        print(f"\nFAIL: {failure}")
+    if not failures:
+        print("\nOK")
+    return not failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--params', default=PARAMS_FILE, help="pipeline parameters (JSON)")
+    parser.add_argument('--max-sync-error', type=float, default=MAX_SYNC_ERROR)
+    args = parser.parse_args()
+    sys.exit(0 if check_generated_css(args.params, args.max_sync_error) else 1)
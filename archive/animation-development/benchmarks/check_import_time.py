@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Import-Time Check: Analysis API Cold Start
+Run `python -X importtime` on the analysis modules and fail if the cold start exceeds the budget
+or pulls in plotting/optimization packages that only the figure needs
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+PHASE1_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'phase1-analysis')
+
+MODULE = 'analyze_svg_path'
+BUDGET_MS = 300  # cumulative import time of MODULE, numpy included
+FORBIDDEN = ('matplotlib', 'scipy')
+RUNS = 5
+
+
+def import_profile(module):
+    """{package: (self_us, cumulative_us)} from one cold `python -X importtime` run"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=PHASE1_DIR, capture_output=True, text=True, check=True,
+    )
+    profile = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, package = line[len('import time:'):].split('|')
+        profile[package.strip()] = (int(self_us), int(cumulative_us))
+    return profile
+
+
+def check_import_time(module=MODULE, budget_ms=BUDGET_MS, runs=RUNS):
+    """Best-of-N cumulative import time and any forbidden packages; returns True when within budget"""
+    profiles = [import_profile(module) for _ in range(runs)]
+    best_ms = min(profile[module][1] for profile in profiles) / 1000
+    heavy = sorted({
+        package for package in profiles[0]
+        if package.split('.')[0] in FORBIDDEN
+    })
+
+    print(f"=== Import-Time Check: {module} ===\n")
+    print(f"Cold start (best of {runs}): {best_ms:.1f}ms (budget {budget_ms}ms)")
+    slowest = sorted(profiles[0].items(), key=lambda item: -item[1][1])[:5]
+    for package, (_, cumulative_us) in slowest:
+        print(f"  {package:<40} {cumulative_us / 1000:8.1f}ms")
+
+    ok = best_ms <= budget_ms and not heavy
+    if heavy:
+        print(f"\nFAIL: import pulls in {', '.join(heavy[:5])}")
+    if best_ms > budget_ms:
+        print(f"\nFAIL: {best_ms:.1f}ms exceeds the {budget_ms}ms budget")
+    if ok:
+        print("\nOK")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--module', default=MODULE)
+    parser.add_argument('--budget', type=float, default=BUDGET_MS, help="budget in milliseconds")
+    parser.add_argument('--runs', type=int, default=RUNS)
+    args = parser.parse_args()
+    sys.exit(0 if check_import_time(args.module, args.budget, args.runs) else 1)
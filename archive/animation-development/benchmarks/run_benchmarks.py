@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Benchmark Suite: Analysis and Keyframe Toolchain
+Time cubic_bezier, path sampling, peak finding, analyze_path, the phase 6/7 keyframe generators and
+CSS assembly from the blog's 9-segment curve up to 1e5-segment paths and 1e4-region scenes, record
+the results as JSON and fail when a case regresses past a threshold against a baseline
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..', 'phase2-7-scripts'))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..', 'phase1-analysis'))
+
+from analyze_svg_path import PLOT_TOLERANCE, analyze_path, cubic_bezier, find_peaks, parse_svg_path, read_flux_path, sample_full_path
+from bezier_batch import segments_to_controls
+from phase6_continuous import continuous_keyframes, emit_continuous_css
+from phase7_blending import blended_keyframes, emit_blended_css
+
+SEGMENT_COUNTS = [9, 1_000, 10_000, 100_000]
+REGION_COUNTS = [3, 100, 1_000, 10_000]
+SCALAR_SAMPLES = [1_000, 10_000, 100_000]   # cubic_bezier is one Python call per sample
+
+THRESHOLD = 0.25       # allowed slowdown against the baseline before a case counts as a regression
+ROUNDS = 9             # passes over every case; a case's time is its median over the rounds
+BATCH_TIME = 0.05      # each round times enough back-to-back calls to fill this
+
+
+def tiled_path(n_segments):
+    """(start_point, bezier_segments) of the flux curve tiled end to end to n_segments"""
+    start_point, bezier_segments = parse_svg_path(read_flux_path())
+    base = segments_to_controls(start_point, bezier_segments)
+    repeats = -(-n_segments // len(base))
+    controls = np.tile(base, (repeats, 1, 1))[:n_segments]
+    span = base[-1, 3, 0] - base[0, 0, 0]
+    controls[:, :, 0] += (np.arange(n_segments) // len(base) * span)[:, None]
+    return tuple(controls[0, 0].tolist()), [[tuple(point) for point in segment[1:].tolist()] for segment in controls]
+
+
+def synthetic_regions(n_regions, seed=0):
+    """Scene of n_regions region windows (percent of the animation) like the phase scripts use"""
+    rng = np.random.default_rng(seed)
+    start = rng.uniform(1.0, 60.0, n_regions)
+    peak = start + rng.uniform(3.0, 15.0, n_regions)
+    end = np.minimum(peak + rng.uniform(5.0, 25.0, n_regions), 97.0)
+    return {
+        f'region_{i + 1}': {
+            'name': f'Region {i + 1}',
+            'buildup_start': round(float(start[i]), 1),
+            'peak_time': round(float(peak[i]), 1),
+            'decay_end': round(float(end[i]), 1),
+            'max_scale': round(float(rng.uniform(1.5, 3.0)), 1),
+            'max_glow': int(rng.integers(15, 40)),
+        }
+        for i in range(n_regions)
+    }
+
+
+def scalar_bezier(n_samples):
+    """One cubic_bezier call per sample over the flux curve's segments"""
+    segments = segments_to_controls(*parse_svg_path(read_flux_path())).tolist()
+    per_segment = -(-n_samples // len(segments))
+
+    def run():
+        for i in range(n_samples):
+            cubic_bezier((i % per_segment) / per_segment, *segments[i // per_segment])
+    return run
+
+
+def path_sampling(n_segments, **kwargs):
+    """sample_full_path over the tiled curve"""
+    path = tiled_path(n_segments)
+    return lambda: sample_full_path(*path, **kwargs)
+
+
+def peak_finding(n_segments):
+    """find_peaks over the tiled curve sampled at the default density"""
+    points = sample_full_path(*tiled_path(n_segments))
+    return lambda: find_peaks(points)
+
+
+def quiet(func, *args, **kwargs):
+    """func with its console output discarded"""
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return func(*args, **kwargs)
+    return run
+
+
+def keyframe_generation(generate, n_regions):
+    """A phase 6/7 keyframe generator over a synthetic scene"""
+    regions = synthetic_regions(n_regions)
+    return lambda: generate(regions)
+
+
+def css_assembly(emit, n_regions, minify=False):
+    """Generate and assemble a whole stylesheet into one string"""
+    regions = synthetic_regions(n_regions)
+
+    def run():
+        buffer = io.StringIO()
+        emit(regions, buffer, minify=minify)
+        return buffer.getvalue()
+    return run
+
+
+def build_cases(max_segments, max_regions):
+    """(benchmark, size, unit, setup, args, kwargs) for every case; setup(*args, **kwargs) returns the timed function"""
+    cases = [('cubic_bezier', n, 'samples', scalar_bezier, (n,), {}) for n in SCALAR_SAMPLES]
+    for n in (n for n in SEGMENT_COUNTS if n <= max_segments):
+        cases += [
+            ('sample_full_path', n, 'segments', path_sampling, (n,), {}),
+            ('sample_full_path_adaptive', n, 'segments', path_sampling, (n,), {'tolerance': PLOT_TOLERANCE}),
+            ('find_peaks', n, 'segments', peak_finding, (n,), {}),
+        ]
+    cases.append(('analyze_path', 9, 'segments', quiet, (analyze_path,), {'plot': False}))
+    for n in (n for n in REGION_COUNTS if n <= max_regions):
+        cases += [
+            ('continuous_keyframes', n, 'regions', keyframe_generation, (continuous_keyframes, n), {}),
+            ('blended_keyframes', n, 'regions', keyframe_generation, (blended_keyframes, n), {}),
+            ('emit_continuous_css', n, 'regions', css_assembly, (emit_continuous_css, n), {}),
+            ('emit_blended_css', n, 'regions', css_assembly, (emit_blended_css, n), {}),
+            ('emit_blended_css_minified', n, 'regions', css_assembly, (emit_blended_css, n), {'minify': True}),
+        ]
+    return cases
+
+
+def batch_size(func, batch_time=BATCH_TIME):
+    """Calls per timed batch so one batch takes about batch_time (one warm-up call included)"""
+    start = time.perf_counter()
+    func()
+    return max(1, int(batch_time / max(time.perf_counter() - start, 1e-9)))
+
+
+def time_batch(func, number):
+    """Mean wall time of number back-to-back calls"""
+    start = time.perf_counter()
+    for _ in range(number):
+        func()
+    return (time.perf_counter() - start) / number
+
+
+def summarize(samples):
+    """Median of the per-round times and their noise (half the interquartile range, relative)"""
+    low, median, high = np.percentile(samples, [25, 50, 75])
+    return float(median), float((high - low) / (2 * median)) if median > 0 else 0.0
+
+
+def case_key(benchmark, size):
+    return f"{benchmark}[{size}]"
+
+
+def run_suite(max_segments=max(SEGMENT_COUNTS), max_regions=max(REGION_COUNTS), pattern=None, rounds=ROUNDS):
+    """Time every case: {'meta': environment, 'results': {case key: timing}}
+
+    Cases are interleaved round by round, so a burst of machine load slows one round of every
+    case instead of all runs of one case, and the median over rounds discards it.
+    """
+    cases = []
+    for benchmark, size, unit, setup, args, kwargs in build_cases(max_segments, max_regions):
+        if pattern and pattern not in benchmark:
+            continue
+        func = setup(*args, **kwargs)
+        cases.append((benchmark, size, unit, func, batch_size(func)))
+    samples = [[] for _ in cases]
+    for round_number in range(rounds):
+        print(f"  round {round_number + 1}/{rounds}", flush=True)
+        for (_, _, _, func, number), times in zip(cases, samples):
+            times.append(time_batch(func, number))
+
+    results = {}
+    for (benchmark, size, unit, _, number), times in zip(cases, samples):
+        seconds, noise = summarize(times)
+        results[case_key(benchmark, size)] = {
+            'benchmark': benchmark, 'size': size, 'unit': unit, 'seconds': seconds, 'noise': noise,
+            'runs': rounds * number,
+        }
+        print(f"  {case_key(benchmark, size):<42} {seconds * 1000:12.3f}ms  +/-{noise:4.0%}  ({rounds} x {number} runs)")
+    meta = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'rounds': rounds,
+    }
+    return {'meta': meta, 'results': results}
+
+
+def compare(results, baseline, threshold=THRESHOLD):
+    """Cases slower than the baseline by more than threshold plus their noise band:
+    [(key, baseline s, current s, ratio)]
+
+    The ratio compares the per-call medians directly; every round already times a batch of about
+    BATCH_TIME, so fast cases need no floor. The band is the larger round-to-round noise of the
+    case in the two runs, so a case only fails when the slowdown clears both the threshold and
+    its own jitter.
+    """
+    regressions = []
+    print(f"\n{'case':<42} {'baseline':>12} {'current':>12} {'change':>8} {'allowed':>8}")
+    for key, current in results['results'].items():
+        if key not in baseline['results']:
+            print(f"{key:<42} {'-':>12} {current['seconds'] * 1000:10.3f}ms {'new':>8}")
+            continue
+        before = baseline['results'][key]
+        ratio = current['seconds'] / before['seconds']
+        allowed = (1 + threshold) * (1 + max(current.get('noise', 0.0), before.get('noise', 0.0)))
+        flag = '  REGRESSION' if ratio > allowed else ''
+        print(f"{key:<42} {before['seconds'] * 1000:10.3f}ms {current['seconds'] * 1000:10.3f}ms "
+              f"{ratio - 1:+7.0%} {allowed - 1:+7.0%}{flag}")
+        if flag:
+            regressions.append((key, before['seconds'], current['seconds'], ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--output', default='benchmark_results.json', help="where to write this run's JSON")
+    parser.add_argument('--baseline', help="JSON of an earlier run to compare against")
+    parser.add_argument('--threshold', type=float, default=THRESHOLD, help="allowed slowdown, e.g. 0.25 for 25%%")
+    parser.add_argument('--max-segments', type=int, default=max(SEGMENT_COUNTS))
+    parser.add_argument('--max-regions', type=int, default=max(REGION_COUNTS))
+    parser.add_argument('--filter', help="only benchmarks whose name contains this")
+    parser.add_argument('--rounds', type=int, default=ROUNDS, help="passes over every case (median taken)")
+    args = parser.parse_args(argv)
+
+    print("=== Benchmark Suite: Analysis and Keyframe Toolchain ===\n")
+    results = run_suite(args.max_segments, args.max_regions, args.filter, args.rounds)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nWrote {len(results['results'])} results to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\nFAIL: {len(regressions)} case(s) more than {args.threshold:.0%} slower than {args.baseline}")
+            return 1
+        print("\nOK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
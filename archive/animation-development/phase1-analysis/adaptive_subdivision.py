@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Flatness-Adaptive Subdivision for Solar Flare Animation Timing
+Split each cubic only until its pieces are flat within a tolerance, so flat baseline segments
+cost a couple of points and the sharp peaks get the detail. On the blog curve, whose nine segments
+are all similarly curved, that measures 1.2-1.3x fewer points than uniform sampling at the same
+error bound (see the demo); the gain grows with the share of nearly straight segments
+"""
+
+import numpy as np
+
+# Pieces are processed from an explicit LIFO stack in batches of at most this many,
+# so memory stays bounded by MAX_BATCH * depth no matter how long the path is
+MAX_BATCH = 1 << 16
+MAX_DEPTH = 24
+
+
+def flatness(controls):
+    """Upper bound on the distance from each cubic to its chord segment
+
+    Every curve point is p0, p3 and at most 3/4 of weight on p1/p2, and the distance to a
+    segment is convex, so 3/4 of the inner control points' distance bounds the curve's
+    """
+    p0, p3 = controls[:, 0], controls[:, 3]
+    chord = p3 - p0
+    length_sq = np.einsum('nd,nd->n', chord, chord)
+    worst = np.zeros(len(controls))
+    for inner in (controls[:, 1], controls[:, 2]):
+        offset = inner - p0
+        along = np.einsum('nd,nd->n', offset, chord)
+        t = np.clip(np.divide(along, length_sq, out=np.zeros_like(along), where=length_sq > 0), 0.0, 1.0)
+        gap = offset - t[:, None] * chord
+        np.maximum(worst, np.einsum('nd,nd->n', gap, gap), out=worst)
+    return 0.75 * np.sqrt(worst)
+
+
+def split_half(controls):
+    """de Casteljau split of every cubic at t=0.5 into (left, right) control arrays"""
+    p0, p1, p2, p3 = controls[:, 0], controls[:, 1], controls[:, 2], controls[:, 3]
+    p01, p12, p23 = 0.5 * (p0 + p1), 0.5 * (p1 + p2), 0.5 * (p2 + p3)
+    p012, p123 = 0.5 * (p01 + p12), 0.5 * (p12 + p23)
+    mid = 0.5 * (p012 + p123)
+    left = np.stack([p0, p01, p012, mid], axis=1)
+    right = np.stack([mid, p123, p23, p3], axis=1)
+    return left, right
+
+
+def subdivide(controls, tolerance=0.05, max_depth=MAX_DEPTH, max_batch=MAX_BATCH):
+    """Flat pieces of every segment: (segments, t0, t1) arrays sorted in path order"""
+    controls = np.asarray(controls, dtype=np.float64)
+    n_segments = len(controls)
+    if n_segments == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0), np.empty(0)
+    stack = []
+    for start in range(0, n_segments, max_batch):
+        stop = min(start + max_batch, n_segments)
+        stack.append((controls[start:stop], np.arange(start, stop), np.zeros(stop - start), np.zeros(stop - start, dtype=np.int64)))
+    done_segments, done_t0, done_depth = [], [], []
+
+    while stack:
+        pieces, segments, t0, depth = stack.pop()
+        flat = (flatness(pieces) <= tolerance) | (depth >= max_depth)
+        done_segments.append(segments[flat])
+        done_t0.append(t0[flat])
+        done_depth.append(depth[flat])
+
+        split = ~flat
+        if not np.any(split):
+            continue
+        left, right = split_half(pieces[split])
+        half = 0.5 ** (depth[split] + 1)
+        children = (
+            np.concatenate([left, right]),
+            np.tile(segments[split], 2),
+            np.concatenate([t0[split], t0[split] + half]),
+            np.tile(depth[split] + 1, 2),
+        )
+        for start in range(0, len(children[0]), max_batch):
+            stack.append(tuple(array[start:start + max_batch] for array in children))
+
+    segments = np.concatenate(done_segments)
+    t0 = np.concatenate(done_t0)
+    t1 = t0 + 0.5 ** np.concatenate(done_depth)
+    order = np.lexsort((t0, segments))
+    return segments[order], t0[order], t1[order]
+
+
+def sample_adaptive(controls, tolerance=0.05, max_depth=MAX_DEPTH):
+    """Adaptive polyline through the path: (points, params) with params as global u = segment + t"""
+    controls = np.asarray(controls, dtype=np.float64)
+    if len(controls) == 0:
+        return np.empty((0, 2)), np.empty(0)
+    segments, t0, t1 = subdivide(controls, tolerance, max_depth)
+
+    # One point at the start of every piece, plus the end of each piece that does not
+    # run straight into the next one (subpath breaks and the path end)
+    closes = t1 == 1.0
+    closes[:-1] &= np.any(controls[segments[:-1], 3] != controls[segments[1:], 0], axis=1)
+
+    n_points = len(segments) + int(closes.sum())
+    position = np.arange(len(segments)) + np.r_[0, np.cumsum(closes)[:-1]]
+    seg_all = np.empty(n_points, dtype=np.int64)
+    t_all = np.empty(n_points)
+    seg_all[position], t_all[position] = segments, t0
+    seg_all[position[closes] + 1], t_all[position[closes] + 1] = segments[closes], t1[closes]
+
+    mt = 1.0 - t_all
+    basis = np.stack([mt**3, 3 * mt**2 * t_all, 3 * mt * t_all**2, t_all**3], axis=1)
+    points = np.einsum('nk,nkd->nd', basis, controls[seg_all])
+    return points, seg_all + t_all
+
+
+def uniform_flatness(controls, levels):
+    """Worst chord error when every segment is split uniformly into 2**levels pieces"""
+    pieces = np.asarray(controls, dtype=np.float64)
+    for _ in range(levels):
+        left, right = split_half(pieces)
+        pieces = np.concatenate([left, right])
+    return float(flatness(pieces).max())
+
+
+if __name__ == "__main__":
+    import os
+    import time
+
+    from svg_path_parser import extract_path_data, parse_path_data
+
+    blog_page = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'blog', 'alexis-etl-pipeline.html')
+    with open(blog_page) as f:
+        controls = parse_path_data(extract_path_data(f.read())).controls
+
+    print("=== Flatness-Adaptive Subdivision ===\n")
+    print(f"{'per segment':>12} {'fixed pts':>10} {'max error':>10} {'adaptive pts':>13} {'saving':>7}")
+    for levels in range(3, 9):
+        # Same geometric error bound as uniform sampling with 2**levels samples per segment
+        error = uniform_flatness(controls, levels)
+        points, params = sample_adaptive(controls, tolerance=error)
+        fixed = len(controls) * 2**levels + 1
+        print(f"{2**levels:>12} {fixed:>10} {error:>10.2e} {len(points):>13} {fixed / len(points):>6.1f}x")
+
+    segments, t0, t1 = subdivide(controls, tolerance=0.05)
+    counts = np.bincount(segments, minlength=len(controls))
+    print(f"\nPieces per segment at tolerance 0.05: {counts.tolist()}")
+
+    # A catalog-sized path: deep subdivision without recursion or an unbounded frontier
+    batch = np.tile(controls, (100_000, 1, 1))
+    started = time.perf_counter()
+    points, params = sample_adaptive(batch, tolerance=0.05)
+    elapsed = time.perf_counter() - started
+    print(f"\n{len(batch)} segments -> {len(points)} points in {elapsed:.3f}s")
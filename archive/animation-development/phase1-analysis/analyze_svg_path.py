@@ -4,43 +4,38 @@ SVG Path Analysis for Solar Flare Animation Timing
 Phase 1: Calculate exact locations of Gaussian peaks along the curve
 """
 
+import os
+from functools import lru_cache
+
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy.optimize import minimize_scalar
+
+from adaptive_subdivision import sample_adaptive
+from arc_length import param_to_time, path_length_table
+from bezier_batch import sample_segments, segments_to_controls
+from bezier_extrema import flux_peaks
+from peak_detection import detect_peaks
+from svg_path_parser import extract_path_data, parse_path_data
+
+ANIMATION_DURATION = 6.0  # seconds, matches the animateMotion dur in the blog page
+PLOT_TOLERANCE = 0.05  # max distance (SVG units) between the plotted polyline and the curve
+BLOG_PAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'blog', 'alexis-etl-pipeline.html')
+
+def read_flux_path(html_path=BLOG_PAGE):
+    """Read the flux curve's SVG path data from the blog page"""
+    with open(html_path) as f:
+        return extract_path_data(f.read(), 'fluxCurve')
 
 def parse_svg_path(path_d):
     """Parse SVG path string into coordinate points"""
-    # Current path: "M30,75 C50,74 65,72 75,68 C85,60 95,45 105,35 C115,25 125,28 135,40 C145,52 155,60 165,62 C175,58 185,50 195,38 C205,26 215,18 225,15 C235,18 245,28 255,42 C265,56 275,68 285,72 C295,74 310,75 330,75"
-    
-    # Extract all coordinate pairs
-    coordinates = []
-    
-    # Start point M30,75
-    coordinates.append((30, 75))
-    
-    # Parse cubic Bezier curves
-    bezier_points = [
-        # First curve: C50,74 65,72 75,68
-        [(50, 74), (65, 72), (75, 68)],
-        # Second curve: C85,60 95,45 105,35  
-        [(85, 60), (95, 45), (105, 35)],
-        # Third curve: C115,25 125,28 135,40
-        [(115, 25), (125, 28), (135, 40)],
-        # Fourth curve: C145,52 155,60 165,62
-        [(145, 52), (155, 60), (165, 62)],
-        # Fifth curve: C175,58 185,50 195,38
-        [(175, 58), (185, 50), (195, 38)],
-        # Sixth curve: C205,26 215,18 225,15
-        [(205, 26), (215, 18), (225, 15)],
-        # Seventh curve: C235,18 245,28 255,42
-        [(235, 18), (245, 28), (255, 42)],
-        # Eighth curve: C265,56 275,68 285,72
-        [(265, 56), (275, 68), (285, 72)],
-        # Ninth curve: C295,74 310,75 330,75
-        [(295, 74), (310, 75), (330, 75)]
-    ]
-    
-    return coordinates[0], bezier_points
+    # Every command form is normalized to cubic segments by the path parser
+    controls = parse_path_data(path_d).controls
+    if len(controls) == 0:
+        raise ValueError("path data has no curve segments")
+    
+    start_point = tuple(controls[0, 0].tolist())
+    bezier_segments = [[tuple(point) for point in segment[1:].tolist()] for segment in controls]
+    
+    return start_point, bezier_segments
 
 def cubic_bezier(t, p0, p1, p2, p3):
     """Calculate point on cubic Bezier curve at parameter t (0-1)"""
@@ -48,152 +43,154 @@ def cubic_bezier(t, p0, p1, p2, p3):
     y = (1-t)**3 * p0[1] + 3*(1-t)**2*t * p1[1] + 3*(1-t)*t**2 * p2[1] + t**3 * p3[1]
     return (x, y)
 
-def sample_full_path(start_point, bezier_segments, samples_per_segment=100):
+def sample_full_path(start_point, bezier_segments, samples_per_segment=100, tolerance=None):
     """Sample the entire SVG path into discrete points"""
-    all_points = []
-    current_point = start_point
-    
-    for segment in bezier_segments:
-        p1, p2, p3 = segment
-        p0 = current_point
-        
-        # Sample this segment
-        for i in range(samples_per_segment):
-            t = i / samples_per_segment
-            point = cubic_bezier(t, p0, p1, p2, p3)
-            all_points.append(point)
-        
-        # Update current point to end of this segment
-        current_point = p3
-    
-    return np.array(all_points)
+    controls = segments_to_controls(start_point, bezier_segments)
+    if tolerance is not None:
+        # Subdivide only until every piece is within tolerance of its chord
+        return sample_adaptive(controls, tolerance)[0]
+    # Evaluate all segments at once against the shared Bernstein basis
+    return sample_segments(controls, samples_per_segment)
 
-def find_peaks(points, min_prominence=8):
+def find_peaks(points, min_prominence=8, top_k=2, window=50):
     """Find peaks in the Y-coordinates (flux values)"""
     y_values = points[:, 1]
     
     # Since SVG coordinates have Y increasing downward, we need to invert for peaks
     # Lower Y values = higher flux (peaks)
+    found = detect_peaks(-y_values, window=window, min_prominence=min_prominence, top_k=top_k)
+    
+    # Detector returns the most prominent peaks already sorted by X position (time order)
+    peak_indices = found['indices'].tolist()
+    peaks = [(points[idx][0], y_values[idx]) for idx in peak_indices]
     
-    # Find local minima in Y (which are peaks in flux)
-    peaks = []
-    peak_indices = []
+    return peaks, peak_indices
+
+def locate_flux_events(controls, min_prominence=8):
+    """Exact flux peaks and the deepest valley between the first two, from the segment extrema"""
+    peaks, valleys = flux_peaks(controls, min_prominence=min_prominence, top_k=2)
+    valley = None
+    if len(peaks['params']) >= 2:
+        between = np.flatnonzero((valleys['params'] > peaks['params'][0]) & (valleys['params'] < peaks['params'][1]))
+        if len(between):
+            # Highest Y value (lowest flux) between the two main peaks
+            row = between[np.argmax(valleys['y'][between])]
+            valley = {key: values[row] for key, values in valleys.items()}
+    return peaks, valley
+
+@lru_cache(maxsize=16)
+def flux_event_timings(path_d, duration=ANIMATION_DURATION):
+    """Arc-length timings of the flux peaks and valley, computed once per path"""
+    peaks, valley = locate_flux_events(parse_path_data(path_d).controls)
+    table = path_length_table(path_d)
+    
+    peak_times = param_to_time(table, peaks['params'], duration)
+    timings = {
+        'duration': duration,
+        'peak_times': tuple(peak_times.tolist()),
+        'peak_percentages': tuple((peak_times / duration * 100).tolist()),
+    }
+    if valley is not None:
+        valley_time = float(param_to_time(table, valley['params'], duration))
+        timings['valley_time'] = valley_time
+        timings['valley_percentage'] = valley_time / duration * 100
+    return timings
+
+def plot_analysis(points, peaks, valley_point=None, output='svg_path_analysis.png'):
+    """Save the flux curve with its peaks and valley marked"""
+    # Deferred so the analysis API never pays for matplotlib; Agg renders without a display
+    import matplotlib
+    matplotlib.use('Agg', force=True)
+    import matplotlib.pyplot as plt
     
-    # Use a sliding window approach
-    window_size = 50  # Larger window for better peak detection
+    # Create visualization
+    figure = plt.figure(figsize=(12, 6))
+    plt.plot(points[:, 0], points[:, 1], 'b-', linewidth=2, label='Flux Curve')
+    plt.gca().invert_yaxis()  # Invert Y to match SVG coordinates
     
-    for i in range(window_size, len(y_values) - window_size):
-        current_y = y_values[i]
-        
-        # Check if this is a local minimum (peak in flux)
-        left_window = y_values[i-window_size:i]
-        right_window = y_values[i+1:i+window_size+1]
-        
-        # Must be lower than surrounding points
-        is_local_min = all(current_y <= y for y in left_window) and all(current_y <= y for y in right_window)
-        
-        if is_local_min:
-            # Check prominence (how much it stands out)
-            left_max = max(left_window) if len(left_window) > 0 else current_y
-            right_max = max(right_window) if len(right_window) > 0 else current_y
-            prominence = min(left_max - current_y, right_max - current_y)
-            
-            if prominence >= min_prominence:
-                peaks.append((points[i][0], current_y))
-                peak_indices.append(i)
-    
-    # Remove peaks that are too close to each other (keep the most prominent)
-    if len(peaks) > 2:
-        # Sort by prominence and keep top 2
-        prominences = []
-        for idx in peak_indices:
-            left_max = max(y_values[max(0, idx-50):idx])
-            right_max = max(y_values[idx+1:min(len(y_values), idx+51)])
-            prom = min(left_max - y_values[idx], right_max - y_values[idx])
-            prominences.append(prom)
-        
-        # Get indices of 2 most prominent peaks
-        top_2_indices = sorted(range(len(prominences)), key=lambda i: prominences[i], reverse=True)[:2]
-        peaks = [peaks[i] for i in top_2_indices]
-        peak_indices = [peak_indices[i] for i in top_2_indices]
-        
-        # Sort by X position (time order)
-        sorted_pairs = sorted(zip(peaks, peak_indices), key=lambda x: x[0][0])
-        peaks = [p[0] for p in sorted_pairs]
-        peak_indices = [p[1] for p in sorted_pairs]
+    # Mark peaks
+    for i, peak in enumerate(peaks):
+        plt.plot(peak[0], peak[1], 'ro', markersize=10, label=f'Peak {i+1}')
     
-    return peaks, peak_indices
+    if valley_point is not None:
+        plt.plot(valley_point[0], valley_point[1], 'go', markersize=8, label='Valley/Shoulder')
+    
+    plt.xlabel('X Position (SVG coordinates)')
+    plt.ylabel('Y Position (SVG coordinates - inverted for flux)')
+    plt.title('Solar Flare X-Ray Flux Curve Analysis')
+    plt.legend()
+    plt.grid(True, alpha=0.3)
+    plt.tight_layout()
+    plt.savefig(output, dpi=150, bbox_inches='tight')
+    plt.close(figure)
+    print(f"\nVisualization saved as '{output}'")
 
-def analyze_path():
-    """Main analysis function"""
+def analyze_path(plot=True):
+    """Main analysis function; plot=False skips the figure (headless/batch use)"""
     print("=== Phase 1: SVG Path Analysis ===\n")
     
     # Parse the path
-    start_point, bezier_segments = parse_svg_path("")
+    path_d = read_flux_path()
+    start_point, bezier_segments = parse_svg_path(path_d)
+    controls = segments_to_controls(start_point, bezier_segments)
     print(f"Start point: {start_point}")
     print(f"Number of Bezier segments: {len(bezier_segments)}")
     
-    # Sample the path
-    points = sample_full_path(start_point, bezier_segments)
+    # Sample the path (only needed for the visualization)
+    points, params = sample_adaptive(controls, PLOT_TOLERANCE)
     print(f"Total sampled points: {len(points)}")
     
-    # Find peaks
-    peaks, peak_indices = find_peaks(points)
+    # The indicator moves at constant speed along the path, so time follows arc length
+    table = path_length_table(path_d)
+    print(f"Path arc length: {table.total:.1f}")
+    
+    # Find peaks exactly from the roots of each segment's y'(t)
+    peak_data, valley_data = locate_flux_events(controls)
+    peaks = list(zip(peak_data['x'].tolist(), peak_data['y'].tolist()))
+    peak_times = param_to_time(table, peak_data['params'], ANIMATION_DURATION)
     print(f"\nFound {len(peaks)} peaks:")
     
-    for i, (peak, idx) in enumerate(zip(peaks, peak_indices)):
+    for i, (peak, time_seconds) in enumerate(zip(peaks, peak_times)):
         x, y = peak
-        path_percentage = (idx / len(points)) * 100
-        time_seconds = (idx / len(points)) * 6  # 6-second animation
+        path_percentage = (time_seconds / ANIMATION_DURATION) * 100
         print(f"  Peak {i+1}: X={x:.1f}, Y={y:.1f} (flux height)")
         print(f"           Path: {path_percentage:.1f}% | Time: {time_seconds:.2f}s")
     
     # Find shoulder/valley between peaks if we have 2+ peaks
-    if len(peaks) >= 2:
-        # Find the highest Y value (lowest flux) between the two main peaks
-        start_idx = peak_indices[0]
-        end_idx = peak_indices[1]
-        
-        valley_idx = start_idx + np.argmax(points[start_idx:end_idx, 1])
-        valley_point = points[valley_idx]
-        valley_percentage = (valley_idx / len(points)) * 100
-        valley_time = (valley_idx / len(points)) * 6
+    if valley_data is not None:
+        valley_point = (valley_data['x'], valley_data['y'])
+        valley_time = float(param_to_time(table, valley_data['params'], ANIMATION_DURATION))
+        valley_percentage = (valley_time / ANIMATION_DURATION) * 100
         
         print(f"\nValley/Shoulder between peaks:")
         print(f"  X={valley_point[0]:.1f}, Y={valley_point[1]:.1f}")
         print(f"  Path: {valley_percentage:.1f}% | Time: {valley_time:.2f}s")
     
-    # Create visualization
-    plt.figure(figsize=(12, 6))
-    plt.plot(points[:, 0], points[:, 1], 'b-', linewidth=2, label='Flux Curve')
-    plt.gca().invert_yaxis()  # Invert Y to match SVG coordinates
-    
-    # Mark peaks
-    for i, (peak, idx) in enumerate(zip(peaks, peak_indices)):
-        plt.plot(peak[0], peak[1], 'ro', markersize=10, label=f'Peak {i+1}')
-    
-    if len(peaks) >= 2:
-        plt.plot(valley_point[0], valley_point[1], 'go', markersize=8, label='Valley/Shoulder')
-    
-    plt.xlabel('X Position (SVG coordinates)')
-    plt.ylabel('Y Position (SVG coordinates - inverted for flux)')
-    plt.title('Solar Flare X-Ray Flux Curve Analysis')
-    plt.legend()
-    plt.grid(True, alpha=0.3)
-    plt.tight_layout()
-    plt.savefig('svg_path_analysis.png', dpi=150, bbox_inches='tight')
-    print(f"\nVisualization saved as 'svg_path_analysis.png'")
+    if plot:
+        plot_analysis(points, peaks, valley_point if valley_data is not None else None)
     
+    # Sample closest in path parameter to each exact peak (params only increase, x may not)
+    right = np.clip(np.searchsorted(params, peak_data['params']), 1, len(params) - 1)
+    closer_left = peak_data['params'] - params[right - 1] <= params[right] - peak_data['params']
+    peak_indices = np.where(closer_left, right - 1, right)
+
     return {
         'points': points,
         'peaks': peaks,
-        'peak_indices': peak_indices,
-        'peak_percentages': [(idx / len(points)) * 100 for idx in peak_indices],
-        'peak_times': [(idx / len(points)) * 6 for idx in peak_indices]
+        'peak_indices': peak_indices.tolist(),
+        'peak_params': peak_data['params'].tolist(),
+        'peak_percentages': (peak_times / ANIMATION_DURATION * 100).tolist(),
+        'peak_times': peak_times.tolist()
     }
 
 if __name__ == "__main__":
-    results = analyze_path()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Locate the flux curve's peaks and their animation timings")
+    parser.add_argument('--no-plot', action='store_true', help="skip svg_path_analysis.png (headless mode)")
+    args = parser.parse_args()
+    
+    results = analyze_path(plot=not args.no_plot)
     
     print("\n=== IMPLEMENTATION OUTPUTS ===")
     print("Use these values for CSS animation timing:")
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Arc-Length Parameterization for Solar Flare Animation Timing
+SVG animateMotion moves the indicator at constant speed along the path, so time follows arc length, not t
+"""
+
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+from svg_path_parser import parse_path_data
+
+# Path parameters are global: u = segment index + local t, so u runs from 0 to n_segments.
+# knot_segments/knot_params/knot_ends describe every table interval; lengths[i] is the
+# arc length from the path start to knot i (one extra entry for the path end).
+# derivative holds the per-segment quadratic coefficients (a, b, c) of B'(t) = a t^2 + b t + c.
+ArcLengthTable = namedtuple('ArcLengthTable', ['controls', 'derivative', 'knot_segments', 'knot_params', 'knot_ends', 'lengths', 'total'])
+
+GAUSS_ORDER = 8
+NEWTON_ITERATIONS = 6
+
+
+@lru_cache(maxsize=4)
+def _gauss_legendre(order):
+    """Gauss-Legendre nodes and weights on [-1, 1]"""
+    nodes, weights = np.polynomial.legendre.leggauss(order)
+    return nodes, weights
+
+
+def derivative_coefficients(controls):
+    """Quadratic coefficients (segments, 3, 2) of each cubic's derivative"""
+    d0 = controls[:, 1] - controls[:, 0]
+    d1 = controls[:, 2] - controls[:, 1]
+    d2 = controls[:, 3] - controls[:, 2]
+    return np.stack([3.0 * (d0 - 2.0 * d1 + d2), 6.0 * (d1 - d0), 3.0 * d0], axis=1)
+
+
+def segment_speed(derivative, segments, t):
+    """|dB/dt| of the cubic segments[i] at parameter t (t may carry extra trailing axes)"""
+    coeffs = derivative[segments]
+    t = np.asarray(t, dtype=np.float64)
+    shape = (len(coeffs),) + (1,) * (t.ndim - 1)
+    a_x, b_x, c_x = (coeffs[:, k, 0].reshape(shape) for k in range(3))
+    a_y, b_y, c_y = (coeffs[:, k, 1].reshape(shape) for k in range(3))
+    return np.hypot((a_x * t + b_x) * t + c_x, (a_y * t + b_y) * t + c_y)
+
+
+def interval_lengths(derivative, segments, t0, t1, order=GAUSS_ORDER):
+    """Arc length of segments[i] between t0[i] and t1[i] by fixed-order Gauss-Legendre"""
+    nodes, weights = _gauss_legendre(order)
+    half = 0.5 * (t1 - t0)
+    t = (0.5 * (t0 + t1))[:, None] + half[:, None] * nodes
+    return half * (segment_speed(derivative, segments, t) @ weights)
+
+
+def build_arc_length_table(controls, tolerance=1e-10, initial_splits=4, max_depth=24):
+    """Cumulative arc-length table with adaptive Gauss-Legendre refinement per segment"""
+    controls = np.ascontiguousarray(controls, dtype=np.float64)
+    derivative = derivative_coefficients(controls)
+    n_segments = len(controls)
+    segments = np.repeat(np.arange(n_segments), initial_splits)
+    t0 = np.tile(np.arange(initial_splits) / initial_splits, n_segments)
+    t1 = t0 + 1.0 / initial_splits
+    whole = interval_lengths(derivative, segments, t0, t1)
+
+    done_segments, done_t0, done_t1, done_lengths = [], [], [], []
+    for depth in range(max_depth + 1):
+        # Compare each interval with the sum of its halves; split only where they disagree
+        mid = 0.5 * (t0 + t1)
+        left = interval_lengths(derivative, segments, t0, mid)
+        right = interval_lengths(derivative, segments, mid, t1)
+        error = np.abs(left + right - whole)
+        converged = (error <= tolerance * np.maximum(whole, 1.0)) | (depth == max_depth)
+
+        for lo, hi, length in ((t0, mid, left), (mid, t1, right)):
+            done_segments.append(segments[converged])
+            done_t0.append(lo[converged])
+            done_t1.append(hi[converged])
+            done_lengths.append(length[converged])
+
+        active = ~converged
+        if not np.any(active):
+            break
+        segments = np.repeat(segments[active], 2)
+        t0 = np.column_stack([t0[active], mid[active]]).ravel()
+        t1 = np.column_stack([mid[active], t1[active]]).ravel()
+        whole = np.column_stack([left[active], right[active]]).ravel()
+
+    knot_segments = np.concatenate(done_segments)
+    knot_params = np.concatenate(done_t0)
+    knot_ends = np.concatenate(done_t1)
+    interval = np.concatenate(done_lengths)
+    order = np.lexsort((knot_params, knot_segments))
+
+    lengths = np.zeros(len(order) + 1)
+    np.cumsum(interval[order], out=lengths[1:])
+    return ArcLengthTable(
+        controls,
+        derivative,
+        knot_segments[order],
+        knot_params[order],
+        knot_ends[order],
+        lengths,
+        float(lengths[-1]),
+    )
+
+
+@lru_cache(maxsize=16)
+def path_length_table(path_d):
+    """Arc-length table for an SVG path string, built once per distinct path"""
+    return build_arc_length_table(parse_path_data(path_d).controls)
+
+
+def _split_param(table, u):
+    """Table interval, segment and local t for global parameters u"""
+    u = np.clip(np.asarray(u, dtype=np.float64), 0.0, len(table.controls))
+    knot_u = table.knot_segments + table.knot_params
+    interval = np.clip(np.searchsorted(knot_u, u, side='right') - 1, 0, len(knot_u) - 1)
+    segments = table.knot_segments[interval]
+    t = np.clip(u - segments, table.knot_params[interval], table.knot_ends[interval])
+    return interval, segments, t
+
+
+def length_at(table, u):
+    """Arc length from the path start to global parameter u"""
+    u = np.asarray(u, dtype=np.float64)
+    interval, segments, t = _split_param(table, u.ravel())
+    partial = interval_lengths(table.derivative, segments, table.knot_params[interval], t)
+    return (table.lengths[interval] + partial).reshape(u.shape)
+
+
+def param_at_length(table, s):
+    """Global parameter u at arc length s (binary search in the table, then Newton on the interval)"""
+    s = np.asarray(s, dtype=np.float64)
+    flat = np.clip(s.ravel(), 0.0, table.total)
+    interval = np.clip(np.searchsorted(table.lengths, flat, side='right') - 1, 0, len(table.knot_params) - 1)
+    segments = table.knot_segments[interval]
+    a = table.knot_params[interval]
+    b = table.knot_ends[interval]
+    target = flat - table.lengths[interval]
+    span = table.lengths[interval + 1] - table.lengths[interval]
+
+    # Cubic Hermite guess for t(s) from the interval end speeds, then Newton on L(a, t) - target
+    derivative = table.derivative[segments]
+    local = np.arange(len(flat))
+    h = np.divide(target, span, out=np.zeros_like(target), where=span > 0)
+    slope_a = span / np.maximum(segment_speed(derivative, local, a), 1e-12)
+    slope_b = span / np.maximum(segment_speed(derivative, local, b), 1e-12)
+    h2, h3 = h * h, h * h * h
+    t = (a * (2 * h3 - 3 * h2 + 1) + slope_a * (h3 - 2 * h2 + h)
+         + b * (-2 * h3 + 3 * h2) + slope_b * (h3 - h2))
+    t = np.clip(t, a, b)
+    pending = np.arange(len(t))
+    for _ in range(NEWTON_ITERATIONS):
+        residual = interval_lengths(derivative, pending, a[pending], t[pending]) - target[pending]
+        speed = segment_speed(derivative, pending, t[pending])
+        t[pending] = np.clip(t[pending] - residual / np.maximum(speed, 1e-12), a[pending], b[pending])
+        # Queries drop out once they are converged to float precision
+        pending = pending[np.abs(residual) > 1e-13 * max(table.total, 1.0)]
+        if len(pending) == 0:
+            break
+    return (segments + t).reshape(s.shape)
+
+
+def point_at_param(controls, u):
+    """(x, y) on the path at global parameters u"""
+    u = np.asarray(u, dtype=np.float64)
+    flat = np.clip(u.ravel(), 0.0, len(controls))
+    segments = np.minimum(flat.astype(np.int64), len(controls) - 1)
+    t = flat - segments
+    mt = 1.0 - t
+    basis = np.stack([mt**3, 3 * mt**2 * t, 3 * mt * t**2, t**3], axis=1)
+    points = np.einsum('nk,nkd->nd', basis, controls[segments])
+    return points.reshape(u.shape + (2,))
+
+
+def param_to_time(table, u, duration=6.0):
+    """Animation time at which the constant-speed indicator reaches parameter u"""
+    return length_at(table, u) / table.total * duration
+
+
+def time_to_param(table, times, duration=6.0):
+    """Path parameter reached by the indicator at the given animation times"""
+    fraction = np.clip(np.asarray(times, dtype=np.float64) / duration, 0.0, 1.0)
+    return param_at_length(table, fraction * table.total)
+
+
+def time_to_point(table, times, duration=6.0):
+    """Indicator (x, y) position at the given animation times"""
+    return point_at_param(table.controls, time_to_param(table, times, duration))
+
+
+if __name__ == "__main__":
+    import os
+    import time
+
+    from svg_path_parser import extract_path_data
+
+    blog_page = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'blog', 'alexis-etl-pipeline.html')
+    with open(blog_page) as f:
+        path_d = extract_path_data(f.read())
+
+    table = path_length_table(path_d)
+    print("=== Arc-Length Parameterization ===\n")
+    print(f"Total path length: {table.total:.6f} ({len(table.knot_params)} table intervals)")
+
+    print("\nSegment boundaries (parameter time vs constant-speed time):")
+    for segment in range(len(table.controls) + 1):
+        linear = segment / len(table.controls) * 6
+        print(f"  u={segment}: t-linear {linear:.2f}s | arc length {param_to_time(table, segment):.2f}s")
+
+    times = np.linspace(0, 6, 1_000_000)
+    started = time.perf_counter()
+    params = time_to_param(table, times)
+    elapsed = time.perf_counter() - started
+    roundtrip = np.abs(param_to_time(table, params) - times).max()
+    print(f"\n1e6 time->t queries: {elapsed:.3f}s, round-trip error {roundtrip:.1e}s")
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Bezier Curve Fitting for Solar Flare Animation Timing
+Fit the fewest cubic segments to dense sample points within a distance tolerance (Schneider's
+least-squares fit with Newton reparameterization), returning the parser's segment table
+"""
+
+import numpy as np
+
+from svg_path_parser import SegmentTable
+
+NEWTON_ITERATIONS = 20
+REPARAMETERIZE_FACTOR = 16.0  # only reparameterize fits within this multiple of the tolerance
+MIN_SPAN = 2                  # spans of this many points are joined by a straight cubic
+CORNER_ANGLE = 8.0            # degrees of turn between neighbouring chords that mark a corner
+
+
+def _bernstein(u):
+    mu = 1.0 - u
+    return np.stack([mu ** 3, 3 * mu ** 2 * u, 3 * mu * u ** 2, u ** 3], axis=1)
+
+
+def _evaluate(controls, u):
+    return _bernstein(u) @ controls
+
+
+def _derivatives(controls, u):
+    """First and second derivative of one cubic at every parameter in u"""
+    first = 3.0 * np.diff(controls, axis=0)
+    second = 2.0 * np.diff(first, axis=0)
+    mu = 1.0 - u
+    d1 = np.stack([mu ** 2, 2 * mu * u, u ** 2], axis=1) @ first
+    d2 = np.stack([mu, u], axis=1) @ second
+    return d1, d2
+
+
+def chord_parameters(points):
+    """Cumulative chord-length parameters in [0, 1]"""
+    lengths = np.hypot(*np.diff(points, axis=0).T)
+    u = np.concatenate([[0.0], np.cumsum(lengths)])
+    return u / u[-1] if u[-1] > 0 else np.linspace(0.0, 1.0, len(points))
+
+
+def _unit(vector):
+    norm = np.hypot(*vector)
+    return vector / norm if norm > 0 else vector
+
+
+def fit_span(points, u, left_tangent, right_tangent):
+    """Least-squares cubic through the span's endpoints along the given unit tangents"""
+    p0, p3 = points[0], points[-1]
+    basis = _bernstein(u)
+    a1 = basis[:, 1:2] * left_tangent
+    a2 = basis[:, 2:3] * right_tangent
+    rest = points - np.outer(basis[:, 0] + basis[:, 1], p0) - np.outer(basis[:, 2] + basis[:, 3], p3)
+    c11, c12, c22 = np.sum(a1 * a1), np.sum(a1 * a2), np.sum(a2 * a2)
+    x1, x2 = np.sum(a1 * rest), np.sum(a2 * rest)
+    det = c11 * c22 - c12 * c12
+    chord = np.hypot(*(p3 - p0))
+    alpha1 = (x1 * c22 - x2 * c12) / det if det != 0 else 0.0
+    alpha2 = (c11 * x2 - c12 * x1) / det if det != 0 else 0.0
+    if alpha1 < 1e-6 * chord or alpha2 < 1e-6 * chord:
+        # Degenerate or reversed solution: fall back to the Wu/Barsky heuristic
+        alpha1 = alpha2 = chord / 3.0
+    return np.array([p0, p0 + alpha1 * left_tangent, p3 + alpha2 * right_tangent, p3])
+
+
+def reparameterize(controls, points, u):
+    """One Newton step per point towards its closest curve parameter, all points at once"""
+    offset = _evaluate(controls, u) - points
+    d1, d2 = _derivatives(controls, u)
+    numerator = np.einsum('nd,nd->n', offset, d1)
+    denominator = np.einsum('nd,nd->n', d1, d1) + np.einsum('nd,nd->n', offset, d2)
+    step = np.divide(numerator, denominator, out=np.zeros_like(numerator), where=np.abs(denominator) > 1e-12)
+    return np.clip(u - step, 0.0, 1.0)
+
+
+def max_error(controls, points, u):
+    """Largest distance between a point and the curve at its parameter, and where it occurs"""
+    distance = np.hypot(*(_evaluate(controls, u) - points).T)
+    worst = int(np.argmax(distance))
+    return float(distance[worst]), worst
+
+
+def corner_indices(points, angle=CORNER_ANGLE):
+    """Interior samples where the polyline turns by more than angle degrees"""
+    chords = np.diff(points, axis=0)
+    heading = np.arctan2(chords[:, 1], chords[:, 0])
+    turn = np.abs((np.diff(heading) + np.pi) % (2 * np.pi) - np.pi)
+    return np.flatnonzero(turn > np.radians(angle)) + 1
+
+
+def fit_curve(points, tolerance=0.05, corner_angle=CORNER_ANGLE):
+    """Fewest cubics (from splitting at the worst point) within tolerance of every sample: SegmentTable
+
+    Samples of piecewise curves turn sharply at the joints; those corners are split first with
+    one-sided tangents. Pass corner_angle=None for noisy data, where every sample can look like one.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    keep = np.concatenate([[True], np.any(np.diff(points, axis=0) != 0, axis=1)])
+    points = points[keep]
+    if len(points) < 2:
+        raise ValueError("need at least two distinct points to fit a curve")
+
+    fitted = []
+    # Explicit LIFO stack of (first, last, left tangent, right tangent); later spans are pushed
+    # first so segments come off in path order
+    corners = corner_indices(points, corner_angle) if corner_angle is not None else np.empty(0, dtype=np.int64)
+    bounds = np.concatenate([[0], corners, [len(points) - 1]])
+    stack = [
+        (first, last, _unit(points[first + 1] - points[first]), _unit(points[last - 1] - points[last]))
+        for first, last in zip(bounds[:-1][::-1].tolist(), bounds[1:][::-1].tolist())
+    ]
+    while stack:
+        first, last, left, right = stack.pop()
+        span = points[first:last + 1]
+        if len(span) <= MIN_SPAN:
+            chord = (span[-1] - span[0]) / 3.0
+            fitted.append(np.array([span[0], span[0] + chord, span[-1] - chord, span[-1]]))
+            continue
+
+        u = chord_parameters(span)
+        controls = fit_span(span, u, left, right)
+        error, split = max_error(controls, span, u)
+        if error > tolerance and error < REPARAMETERIZE_FACTOR * tolerance:
+            for _ in range(NEWTON_ITERATIONS):
+                u = reparameterize(controls, span, u)
+                controls = fit_span(span, u, left, right)
+                previous = error
+                error, split = max_error(controls, span, u)
+                if error <= tolerance or error > 0.99 * previous:
+                    break  # fitted, or stalled: splitting is cheaper than more Newton steps
+        if error <= tolerance:
+            fitted.append(controls)
+            continue
+
+        # Split at the worst point with a shared tangent through its neighbours
+        split = min(max(split, 1), len(span) - 2) + first
+        centre = _unit(points[split - 1] - points[split + 1])
+        stack.append((split, last, -centre, right))
+        stack.append((first, split, left, centre))
+
+    controls = np.ascontiguousarray(np.array(fitted))
+    return SegmentTable(controls, np.full(len(controls), ord('C'), dtype=np.uint8), np.zeros(len(controls), dtype=np.int32))
+
+
+if __name__ == "__main__":
+    import time
+
+    from analyze_svg_path import flux_event_timings, parse_svg_path, read_flux_path, sample_full_path
+    from arc_length import build_arc_length_table, param_to_time
+    from bezier_extrema import flux_peaks
+    from flux_path_generator import path_d
+
+    path_d_original = read_flux_path()
+    points = sample_full_path(*parse_svg_path(path_d_original), samples_per_segment=200)
+    reference = flux_event_timings(path_d_original)
+
+    print("=== Bezier Curve Fitting ===\n")
+    for tolerance in (0.5, 0.05, 0.005):
+        started = time.perf_counter()
+        table = fit_curve(points, tolerance)
+        elapsed = time.perf_counter() - started
+        peaks, _ = flux_peaks(table.controls)
+        times = param_to_time(build_arc_length_table(table.controls), peaks['params'], reference['duration'])
+        shift = np.abs(times - np.array(reference['peak_times'])).max() * 1000
+        print(f"tolerance {tolerance:<6} {len(points)} points -> {len(table.controls):3d} segments in {elapsed * 1000:5.1f}ms, "
+              f"peak times within {shift:.1f}ms, {len(path_d(table.controls, 2))} byte d string")
+
+    # Noisy dense data: fit then analyze like the hand-drawn curve
+    rng = np.random.default_rng(0)
+    noisy = sample_full_path(*parse_svg_path(path_d_original), samples_per_segment=2000)
+    noisy = noisy + rng.normal(0, 0.02, noisy.shape) * [0, 1]
+    started = time.perf_counter()
+    table = fit_curve(noisy, 0.1, corner_angle=None)
+    print(f"\nNoisy: {len(noisy)} points -> {len(table.controls)} segments in {(time.perf_counter() - started) * 1000:.1f}ms")
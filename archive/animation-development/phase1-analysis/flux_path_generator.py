@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Flux Path Generator - Compact SVG Paths from Long Flux Series
+Reduce any number of samples to a point budget (min/max bucketing, then Largest-Triangle-Three-
+Buckets), join the kept points with overshoot-free Catmull-Rom cubics and write the `d` string
+"""
+
+import numpy as np
+
+from peak_detection import detect_peaks
+
+POINT_BUDGET = 120
+PRESELECT = 4          # min/max candidates per output point handed to LTTB
+KEEP_PEAKS = 8         # most prominent flux peaks always kept
+PRECISION = 1          # decimals in the `d` string
+
+
+def minmax_indices(y, n_buckets):
+    """Indices of the min and max of y in each of n_buckets equal buckets, in order (O(n), no sort)"""
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n <= 2 * n_buckets:
+        return np.arange(n)
+    size = -(-n // n_buckets)
+    n_buckets = -(-n // size)
+    padded = np.empty(n_buckets * size)
+    padded[:n] = y
+    padded[n:] = y[-1]
+    blocks = padded.reshape(n_buckets, size)
+    base = np.arange(n_buckets) * size
+    low = base + np.argmin(blocks, axis=1)
+    high = base + np.argmax(blocks, axis=1)
+    pairs = np.sort(np.column_stack([low, high]), axis=1).ravel()
+    pairs = np.minimum(pairs, n - 1)
+    keep = np.concatenate([[True], pairs[1:] != pairs[:-1]])
+    return np.unique(np.concatenate([[0], pairs[keep], [n - 1]]))
+
+
+def lttb_indices(x, y, n_out, required=()):
+    """Largest-Triangle-Three-Buckets selection of n_out points; required indices are always kept"""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if n <= n_out:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    bucket_sum_x = np.add.reduceat(x[:-1], edges[:-1]) if n_out > 2 else np.empty(0)
+    bucket_sum_y = np.add.reduceat(y[:-1], edges[:-1]) if n_out > 2 else np.empty(0)
+    counts = np.diff(edges)
+    mean_x = np.append(bucket_sum_x / counts, x[-1])
+    mean_y = np.append(bucket_sum_y / counts, y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(n_out - 2):
+        lo, hi = edges[bucket], edges[bucket + 1]
+        # Triangle (previous kept point, candidate, mean of the next bucket)
+        area = np.abs((x[previous] - mean_x[bucket + 1]) * (y[lo:hi] - y[previous])
+                      - (x[previous] - x[lo:hi]) * (mean_y[bucket + 1] - y[previous]))
+        previous = lo + int(np.argmax(area))
+        selected[bucket + 1] = previous
+    return np.unique(np.concatenate([selected, np.asarray(required, dtype=np.int64)]))
+
+
+def reduce_points(x, y, budget=POINT_BUDGET, keep_peaks=KEEP_PEAKS, peak_sign=-1.0):
+    """Indices of at most about budget points: min/max preselection, LTTB, plus the main peaks
+
+    peak_sign=-1 treats minima of y as peaks (SVG y grows downwards, flux upwards).
+    """
+    candidates = minmax_indices(y, PRESELECT * budget // 2)
+    cx, cy = np.asarray(x)[candidates], np.asarray(y)[candidates]
+    peaks = detect_peaks(peak_sign * cy, window=max(len(cy) // budget, 1), top_k=keep_peaks)['indices']
+    return candidates[lttb_indices(cx, cy, budget - len(peaks), required=peaks)]
+
+
+def catmull_rom_controls(points):
+    """(segments, 4, 2) cubic controls of a uniform Catmull-Rom spline through the points
+
+    Inner control y values are clamped to each segment's endpoint range, so the curve never
+    overshoots a kept sample: peaks and valleys land exactly on the data. Inner x values are
+    clamped and ordered the same way, so unevenly spaced samples never make time run backwards.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    padded = np.concatenate([points[:1], points, points[-1:]])
+    p0, p1, p2, p3 = padded[:-3], padded[1:-2], padded[2:-1], padded[3:]
+    c1 = p1 + (p2 - p0) / 6.0
+    c2 = p2 - (p3 - p1) / 6.0
+    low, high = np.minimum(p1, p2), np.maximum(p1, p2)
+    c1 = np.clip(c1, low, high)
+    c2 = np.clip(c2, low, high)
+    crossed = c1[:, 0] > c2[:, 0]
+    c1[crossed, 0] = c2[crossed, 0] = 0.5 * (c1[crossed, 0] + c2[crossed, 0])
+    return np.stack([p1, c1, c2, p2], axis=1)
+
+
+def _format(values, precision):
+    text = np.char.mod(f'%.{precision}f', np.round(values, precision) + 0.0)
+    if precision > 0:
+        text = np.char.rstrip(np.char.rstrip(text, '0'), '.')
+    return np.where(text == '-0', '0', text)
+
+
+def path_d(controls, precision=PRECISION):
+    """SVG `d` string (M + one C per segment) of a (segments, 4, 2) control array"""
+    controls = np.asarray(controls, dtype=np.float64)
+    text = _format(controls[:, 1:].reshape(-1, 2), precision)
+    pairs = np.char.add(np.char.add(text[:, 0], ','), text[:, 1]).reshape(-1, 3)
+    start = _format(controls[0, 0], precision)
+    segments = (' '.join(row) for row in pairs.tolist())
+    return f"M{start[0]},{start[1]} C" + ' C'.join(segments)
+
+
+def generate_path(x, y, budget=POINT_BUDGET, precision=PRECISION, keep_peaks=KEEP_PEAKS):
+    """Reduced Catmull-Rom path for an (x, y) series already in SVG coordinates: (d, controls)"""
+    keep = reduce_points(x, y, budget, keep_peaks)
+    controls = catmull_rom_controls(np.column_stack([np.asarray(x)[keep], np.asarray(y)[keep]]))
+    return path_d(controls, precision), controls
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    from bezier_extrema import flux_peaks
+    from svg_path_parser import parse_path_data
+    from xrs_ingest import SVG_FRAME, flux_to_svg_y, ingest
+
+    parser = argparse.ArgumentParser(description="Generate a compact SVG flux path from a long series")
+    parser.add_argument('series', nargs='?', help="GOES XRS CSV/.npy (default: synthetic 10M-sample series)")
+    parser.add_argument('--budget', type=int, default=POINT_BUDGET)
+    parser.add_argument('--precision', type=int, default=PRECISION)
+    args = parser.parse_args()
+
+    if args.series:
+        points = ingest(args.series)['points']
+        x, y = points[:, 0], points[:, 1]
+    else:
+        n = 10_000_000
+        rng = np.random.default_rng(0)
+        t = np.linspace(0.0, 1.0, n)
+        flux = 2e-6 * np.exp(rng.normal(0, 0.08, n))
+        for onset, peak, decay in ((0.2, 3e-5, 0.03), (0.45, 2e-4, 0.05), (0.5, 8.7e-4, 0.08), (0.8, 5e-5, 0.04)):
+            ramp = np.clip(t - onset, 0, None)
+            flux += peak * (1 - np.exp(-ramp / 0.004)) * np.exp(-ramp / decay)
+        x = SVG_FRAME['x0'] + (SVG_FRAME['x1'] - SVG_FRAME['x0']) * t
+        y = flux_to_svg_y(flux)
+        del t, flux, ramp
+
+    started = time.perf_counter()
+    d, controls = generate_path(x, y, args.budget, args.precision)
+    elapsed = time.perf_counter() - started
+
+    print("=== Flux Path Generator ===\n")
+    print(f"{len(x)} samples -> {len(controls)} cubic segments, {len(d)} byte d string in {elapsed * 1000:.0f}ms")
+    peak = int(np.argmin(y))
+    found, _ = flux_peaks(parse_path_data(d).controls, min_prominence=1.0, top_k=1)
+    print(f"Highest sample: x={x[peak]:.2f}, y={y[peak]:.3f}; path peak: x={found['x'][0]:.2f}, y={found['y'][0]:.3f}")
+    print(f"\n{d[:160]}...")
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Path Store - Memory-Mapped Samples and Extrema for Many Flux Curves
+One contiguous point array for every curve plus an offsets index and a structured extrema table,
+written append-only and reopened zero-copy, so any flare's samples are an O(1) slice
+"""
+
+import json
+import os
+
+import numpy as np
+
+from adaptive_subdivision import sample_adaptive
+from arc_length import build_arc_length_table, param_to_time
+from bezier_extrema import PEAK, extrema_prominences, segment_extrema
+from svg_path_parser import parse_path_data
+
+# One row per y-extremum of a curve; times follow arc length like the indicator
+EXTREMA_DTYPE = np.dtype([
+    ('curve', np.int64),
+    ('kind', np.int8),         # bezier_extrema.PEAK (flux peak) or VALLEY
+    ('param', np.float64),     # global path parameter (segment + t)
+    ('x', np.float64),
+    ('y', np.float64),
+    ('prominence', np.float64),
+    ('time', np.float64),      # seconds into the animation
+])
+ID_LENGTH = 64
+
+POINTS_FILE = 'points.bin'
+EXTREMA_FILE = 'extrema.bin'
+POINT_OFFSETS_FILE = 'point_offsets.npy'
+EXTREMA_OFFSETS_FILE = 'extrema_offsets.npy'
+IDS_FILE = 'ids.npy'
+META_FILE = 'meta.json'
+
+
+class PathStoreWriter:
+    """Appends curves to a store directory; the index files are written on close"""
+
+    def __init__(self, directory, dtype=np.float32):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.dtype = np.dtype(dtype)
+        self._points = open(os.path.join(directory, POINTS_FILE), 'wb')
+        self._extrema = open(os.path.join(directory, EXTREMA_FILE), 'wb')
+        self._point_offsets = [0]
+        self._extrema_offsets = [0]
+        self._ids = []
+
+    def append(self, flare_id, points, extrema=None):
+        """Add one curve's (n, 2) samples and its extrema (EXTREMA_DTYPE rows, curve filled in here)"""
+        if len(flare_id) > ID_LENGTH:
+            raise ValueError(f"flare id longer than {ID_LENGTH} characters: {flare_id!r}")
+        np.ascontiguousarray(points, dtype=self.dtype).reshape(-1, 2).tofile(self._points)
+        self._point_offsets.append(self._point_offsets[-1] + len(points))
+        if extrema is not None and len(extrema):
+            rows = np.array(extrema, dtype=EXTREMA_DTYPE)
+            rows['curve'] = len(self._ids)
+            rows.tofile(self._extrema)
+            self._extrema_offsets.append(self._extrema_offsets[-1] + len(rows))
+        else:
+            self._extrema_offsets.append(self._extrema_offsets[-1])
+        self._ids.append(flare_id)
+
+    def close(self):
+        self._points.close()
+        self._extrema.close()
+        # Plain (non-object) arrays, so readers never need allow_pickle
+        np.save(os.path.join(self.directory, POINT_OFFSETS_FILE), np.array(self._point_offsets, dtype=np.int64))
+        np.save(os.path.join(self.directory, EXTREMA_OFFSETS_FILE), np.array(self._extrema_offsets, dtype=np.int64))
+        np.save(os.path.join(self.directory, IDS_FILE), np.array(self._ids, dtype=f'U{ID_LENGTH}'))
+        with open(os.path.join(self.directory, META_FILE), 'w') as f:
+            json.dump({
+                'curves': len(self._ids),
+                'points': self._point_offsets[-1],
+                'extrema': self._extrema_offsets[-1],
+                'point_dtype': self.dtype.str,
+            }, f, indent=4)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class PathStore:
+    """Read-only, memory-mapped view of a store directory"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, META_FILE)) as f:
+            self.meta = json.load(f)
+        self.all_points = self._memmap(POINTS_FILE, np.dtype(self.meta['point_dtype']), (self.meta['points'], 2))
+        self.all_extrema = self._memmap(EXTREMA_FILE, EXTREMA_DTYPE, (self.meta['extrema'],))
+        load = lambda name: np.load(os.path.join(directory, name), mmap_mode='r', allow_pickle=False)
+        self.point_offsets = load(POINT_OFFSETS_FILE)
+        self.extrema_offsets = load(EXTREMA_OFFSETS_FILE)
+        self.ids = load(IDS_FILE)
+        self._rows = None
+
+    def _memmap(self, name, dtype, shape):
+        if shape[0] == 0:
+            return np.empty(shape, dtype=dtype)
+        return np.memmap(os.path.join(self.directory, name), dtype=dtype, mode='r', shape=shape)
+
+    def __len__(self):
+        return self.meta['curves']
+
+    def row(self, flare_id):
+        """Curve index of a flare id (the id -> row map is built on first use)"""
+        if self._rows is None:
+            self._rows = {flare_id: row for row, flare_id in enumerate(self.ids.tolist())}
+        return self._rows[flare_id]
+
+    def points(self, row):
+        """(n, 2) samples of one curve: a view into the mapped file, nothing is copied"""
+        return self.all_points[self.point_offsets[row]:self.point_offsets[row + 1]]
+
+    def extrema(self, row):
+        """EXTREMA_DTYPE rows of one curve, also a view"""
+        return self.all_extrema[self.extrema_offsets[row]:self.extrema_offsets[row + 1]]
+
+    def peaks(self, row, min_prominence=8, top_k=2):
+        """Most prominent flux peaks of one curve in time order, as flux_peaks selects them"""
+        rows = self.extrema(row)
+        rows = rows[(rows['kind'] == PEAK) & (rows['prominence'] >= min_prominence)]
+        if top_k is not None and len(rows) > top_k:
+            rows = np.sort(rows[np.argsort(-rows['prominence'], kind='stable')[:top_k]], order='param')
+        return rows
+
+    def __getitem__(self, flare_id):
+        row = self.row(flare_id)
+        return self.points(row), self.extrema(row)
+
+
+def curve_record(path_d, tolerance=0.05, duration=6.0):
+    """Adaptive samples and the full extrema table of one path, ready for PathStoreWriter.append"""
+    controls = parse_path_data(path_d).controls
+    points, _ = sample_adaptive(controls, tolerance)
+    found = segment_extrema(controls)
+    rows = np.zeros(len(found['t']), dtype=EXTREMA_DTYPE)
+    rows['kind'] = found['kind']
+    rows['param'] = found['params']
+    rows['x'], rows['y'] = found['x'], found['y']
+    rows['prominence'] = extrema_prominences(controls, found)
+    rows['time'] = param_to_time(build_arc_length_table(controls), found['params'], duration)
+    return points, rows
+
+
+if __name__ == "__main__":
+    import argparse
+    import tempfile
+    import time
+
+    from analyze_svg_path import read_flux_path
+    from flux_path_generator import path_d as format_path_d
+
+    parser = argparse.ArgumentParser(description="Build and query a memory-mapped path store")
+    parser.add_argument('--curves', type=int, default=2000)
+    parser.add_argument('--out', default=None, help="store directory (default: a temporary directory)")
+    args = parser.parse_args()
+    directory = args.out or tempfile.mkdtemp(suffix='-path-store')
+
+    # Jittered copies of the blog curve stand in for the catalog
+    controls = parse_path_data(read_flux_path()).controls
+    rng = np.random.default_rng(0)
+    started = time.perf_counter()
+    with PathStoreWriter(directory) as writer:
+        for i in range(args.curves):
+            jittered = controls.copy()
+            jittered[:, 1:3, 1] += rng.normal(0, 4, (len(controls), 2))
+            writer.append(f'flare-{i:05d}', *curve_record(format_path_d(jittered, 2)))
+    built = time.perf_counter() - started
+
+    started = time.perf_counter()
+    store = PathStore(directory)
+    opened = time.perf_counter() - started
+    rows = rng.integers(0, len(store), 100_000)
+    started = time.perf_counter()
+    for row in rows.tolist():
+        store.points(row)
+        store.extrema(row)
+    lookup = (time.perf_counter() - started) / len(rows)
+
+    size = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+    print("=== Path Store ===\n")
+    print(f"{len(store)} curves, {store.meta['points']} points, {store.meta['extrema']} extrema, {size / 1e6:.1f} MB "
+          f"written in {built:.1f}s to {directory}")
+    print(f"Open: {opened * 1000:.2f}ms; random curve access: {lookup * 1e6:.1f}us")
+    points, extrema = store['flare-00042']
+    peaks = store.peaks(store.row('flare-00042'))
+    print(f"flare-00042: {len(points)} samples (view of the mapped file: {not points.flags.owndata}), "
+          f"peaks at {', '.join(f'{t:.2f}s' for t in peaks['time'])}")
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Linear-Time Peak Detection for Solar Flare Animation Timing
+Sliding-window extrema with true topographic prominence, widths and bases as arrays
+"""
+
+import numpy as np
+
+# Block size for the block-decomposed sparse tables used by the range searches
+BLOCK_SIZE = 32
+
+
+def sliding_extremum(values, half_width, op=np.minimum):
+    """Centered sliding min/max over [i - half_width, i + half_width] in O(n) (van Herk/Gil-Werman)"""
+    values = np.asarray(values, dtype=np.float64)
+    identity = np.inf if op is np.minimum else -np.inf
+    width = 2 * half_width + 1
+    n = len(values)
+
+    # Pad so every centered window lies inside the array and the length is a multiple of width
+    n_blocks = -(-(n + 2 * half_width) // width)
+    padded = np.full(n_blocks * width, identity)
+    padded[half_width:half_width + n] = values
+    blocks = padded.reshape(n_blocks, width)
+
+    # Prefix/suffix extrema inside each block: any window spans one suffix and one prefix.
+    # The padded length is a multiple of width, so reversing it keeps the block boundaries.
+    prefix = op.accumulate(blocks, axis=1).ravel()
+    suffix = op.accumulate(padded[::-1].reshape(n_blocks, width), axis=1).ravel()[::-1]
+    return op(suffix[:n], prefix[width - 1:width - 1 + n])
+
+
+def _block_tables(values, op, identity):
+    """Sparse table (list of levels) over per-block reductions of values"""
+    n_blocks = -(-len(values) // BLOCK_SIZE)
+    padded = np.full(n_blocks * BLOCK_SIZE, identity)
+    padded[:len(values)] = values
+    levels = [op.reduce(padded.reshape(n_blocks, BLOCK_SIZE), axis=1)]
+    span = 1
+    while 2 * span <= n_blocks:
+        previous = levels[-1]
+        levels.append(op(previous[:-span], previous[span:]))
+        span *= 2
+    return levels
+
+
+def _gather_block(values, first, identity, valid):
+    """Gather BLOCK_SIZE values per query starting at first, masking invalid slots with identity"""
+    index = first[:, None] + np.arange(BLOCK_SIZE)
+    mask = valid(index)
+    window = values.take(index, mode='clip')
+    window[~mask] = identity
+    return index, window, mask
+
+
+def _range_reduce(values, levels, op, identity, lo, hi):
+    """op-reduce values[lo:hi] for every query (lo < hi) using partial blocks plus the sparse table"""
+    first_full = -(-lo // BLOCK_SIZE)
+    end_full = hi // BLOCK_SIZE
+
+    head_end = np.minimum(hi, first_full * BLOCK_SIZE)
+    _, head, _ = _gather_block(values, lo, identity, lambda index: index < head_end[:, None])
+    tail_start = np.maximum(lo, end_full * BLOCK_SIZE)
+    _, tail, _ = _gather_block(values, tail_start, identity, lambda index: index < hi[:, None])
+    result = op(op.reduce(head, axis=1), op.reduce(tail, axis=1))
+
+    has_full = first_full < end_full
+    if np.any(has_full):
+        lo_b = first_full[has_full]
+        hi_b = end_full[has_full]
+        level = np.floor(np.log2(hi_b - lo_b)).astype(np.int64)
+        full = np.empty(len(lo_b))
+        for k in np.unique(level):
+            pick = level == k
+            table = levels[k]
+            full[pick] = op(table[lo_b[pick]], table[hi_b[pick] - (1 << k)])
+        result[has_full] = op(result[has_full], full)
+    return result
+
+
+def _nearest(values, levels, identity, starts, thresholds, limits, direction, satisfied):
+    """Nearest index from starts (exclusive) towards limits (inclusive) whose value satisfies the threshold, else -1"""
+    n_queries = len(starts)
+    found = np.full(n_queries, -1, dtype=np.int64)
+    if n_queries == 0:
+        return found
+    thr = thresholds[:, None]
+
+    def scan(block_first, active):
+        # Check one whole block per query and keep the closest satisfying index
+        if direction < 0:
+            valid = lambda index: (index < starts[active, None]) & (index >= limits[active, None])
+        else:
+            valid = lambda index: (index > starts[active, None]) & (index <= limits[active, None])
+        index, window, mask = _gather_block(values, block_first, identity, valid)
+        hits = mask & satisfied(window, thr[active])
+        any_hit = hits.any(axis=1)
+        if direction < 0:
+            pos = BLOCK_SIZE - 1 - np.argmax(hits[:, ::-1], axis=1)
+        else:
+            pos = np.argmax(hits, axis=1)
+        return np.where(any_hit, index[np.arange(len(index)), pos], -1)
+
+    # 1) the partial block containing the first candidate index
+    first = starts + direction
+    in_range = (first >= limits) if direction < 0 else (first <= limits)
+    active = np.flatnonzero(in_range)
+    found[active] = scan((first[active] // BLOCK_SIZE) * BLOCK_SIZE, active)
+
+    # 2) binary lifting over whole blocks strictly between the start block and the limit block
+    pending = active[found[active] < 0]
+    if len(pending) == 0:
+        return found
+    start_block = first[pending] // BLOCK_SIZE
+    limit_block = limits[pending] // BLOCK_SIZE
+    block_thr = thresholds[pending]
+    if direction < 0:
+        cursor = start_block.copy()
+        for k in range(len(levels) - 1, -1, -1):
+            step = 1 << k
+            candidate = cursor - step
+            can_step = candidate >= limit_block
+            block_value = levels[k][np.maximum(candidate, 0)]
+            skip = can_step & ~satisfied(block_value, block_thr)
+            cursor = np.where(skip, candidate, cursor)
+        target = cursor - 1
+        has_block = target >= limit_block
+    else:
+        cursor = start_block.copy()
+        n_blocks = len(levels[0])
+        for k in range(len(levels) - 1, -1, -1):
+            step = 1 << k
+            candidate_end = cursor + step
+            can_step = candidate_end <= limit_block
+            block_value = levels[k][np.minimum(cursor + 1, len(levels[k]) - 1)]
+            skip = can_step & (cursor + 1 < n_blocks) & ~satisfied(block_value, block_thr)
+            cursor = np.where(skip, candidate_end, cursor)
+        target = cursor + 1
+        has_block = target <= limit_block
+
+    # 3) the block found by the lifting step
+    pending = pending[has_block]
+    if len(pending):
+        found[pending] = scan(target[has_block] * BLOCK_SIZE, pending)
+    return found
+
+
+def _base_minima(signal, peaks, max_table, min_table):
+    """Search bounds and lowest value on each side of every peak before a strictly higher sample"""
+    n = len(signal)
+    heights = signal[peaks]
+    greater = lambda window, thr: window > thr
+
+    # The nearest strictly higher sample on each side bounds the search for the base
+    left_higher = _nearest(signal, max_table, -np.inf, peaks, heights, np.zeros_like(peaks), -1, greater)
+    right_higher = _nearest(signal, max_table, -np.inf, peaks, heights, np.full_like(peaks, n - 1), 1, greater)
+    left_lo = np.where(left_higher < 0, 0, left_higher + 1)
+    right_hi = np.where(right_higher < 0, n, right_higher)
+
+    left_min = _range_reduce(signal, min_table, np.minimum, np.inf, left_lo, peaks + 1)
+    right_min = _range_reduce(signal, min_table, np.minimum, np.inf, peaks, right_hi)
+    return left_lo, right_hi, left_min, right_min
+
+
+def _base_indices(signal, peaks, min_table, left_lo, right_hi, left_min, right_min):
+    """Positions of the side minima closest to each peak (same convention as scipy.signal)"""
+    at_most = lambda window, thr: window <= thr
+    left_bases = _nearest(signal, min_table, np.inf, peaks + 1, left_min, left_lo, -1, at_most)
+    right_bases = _nearest(signal, min_table, np.inf, peaks - 1, right_min, right_hi - 1, 1, at_most)
+    return left_bases, right_bases
+
+
+def peak_prominences(signal, peaks, max_table=None, min_table=None):
+    """True prominence and bases of each peak (maxima of signal), vectorized over peaks"""
+    signal = np.asarray(signal, dtype=np.float64)
+    peaks = np.asarray(peaks, dtype=np.int64)
+    if max_table is None:
+        max_table = _block_tables(signal, np.maximum, -np.inf)
+    if min_table is None:
+        min_table = _block_tables(signal, np.minimum, np.inf)
+
+    left_lo, right_hi, left_min, right_min = _base_minima(signal, peaks, max_table, min_table)
+    left_bases, right_bases = _base_indices(signal, peaks, min_table, left_lo, right_hi, left_min, right_min)
+    prominences = signal[peaks] - np.maximum(left_min, right_min)
+    return prominences, left_bases, right_bases
+
+
+def peak_widths(signal, peaks, prominences, left_bases, right_bases, rel_height=0.5, min_table=None):
+    """Interpolated peak widths at rel_height of the prominence, vectorized over peaks"""
+    signal = np.asarray(signal, dtype=np.float64)
+    peaks = np.asarray(peaks, dtype=np.int64)
+    if min_table is None:
+        min_table = _block_tables(signal, np.minimum, np.inf)
+    heights = signal[peaks] - prominences * rel_height
+    at_most = lambda window, thr: window <= thr
+
+    # Walk out from the peak until the signal drops to the evaluation height (or hits a base)
+    left = _nearest(signal, min_table, np.inf, peaks, heights, left_bases, -1, at_most)
+    left = np.where(left < 0, left_bases, left)
+    right = _nearest(signal, min_table, np.inf, peaks, heights, right_bases, 1, at_most)
+    right = np.where(right < 0, right_bases, right)
+
+    # Linear interpolation between the crossing sample and its inner neighbour
+    left_ips = left.astype(np.float64)
+    step = signal[np.minimum(left + 1, len(signal) - 1)] - signal[left]
+    interpolate = (signal[left] < heights) & (step != 0)
+    left_ips[interpolate] += ((heights - signal[left]) / np.where(step != 0, step, 1.0))[interpolate]
+
+    right_ips = right.astype(np.float64)
+    step = signal[np.maximum(right - 1, 0)] - signal[right]
+    interpolate = (signal[right] < heights) & (step != 0)
+    right_ips[interpolate] -= ((heights - signal[right]) / np.where(step != 0, step, 1.0))[interpolate]
+
+    return right_ips - left_ips, heights, left_ips, right_ips
+
+
+def _drop_weak(signal, peaks, min_prominence):
+    """Candidates whose prominence may reach min_prominence, by a bound from their neighbours
+
+    If a candidate's neighbour is strictly higher, the base search on that side stops at or
+    before it, so the minimum between the two caps the prominence from above. Dropping the
+    candidates under the threshold and repeating with the survivors' merged gaps leaves only
+    a few times the final peak count for the exact (block-gather) base searches.
+    """
+    heights = signal[peaks]
+    # gaps[i]: minimum over [peaks[i], peaks[i + 1]], a lower bound on either side's base
+    gaps = np.minimum(np.minimum.reduceat(signal, peaks)[:-1], heights[1:])
+    keep = np.arange(len(peaks))
+    while len(keep) > 1:
+        current = heights[keep]
+        bound = np.full(len(keep), np.inf)
+        left = current[:-1] > current[1:]
+        bound[1:][left] = current[1:][left] - gaps[left]
+        right = current[1:] > current[:-1]
+        bound[:-1][right] = np.minimum(bound[:-1][right], current[:-1][right] - gaps[right])
+        survivors = np.flatnonzero(bound >= min_prominence)
+        if len(survivors) == len(keep):
+            break
+        keep = keep[survivors]
+        gaps = np.minimum.reduceat(gaps[:survivors[-1]], survivors[:-1]) if len(survivors) > 1 else gaps[:0]
+    return peaks[keep]
+
+
+def detect_peaks(signal, window=50, min_prominence=0.0, top_k=None, rel_height=0.5):
+    """Find maxima of signal that dominate a +/-window neighbourhood, with prominence, width and bases"""
+    signal = np.asarray(signal, dtype=np.float64)
+    n = len(signal)
+    empty = np.empty(0, dtype=np.int64)
+    result = {
+        'indices': empty, 'prominences': np.empty(0), 'widths': np.empty(0),
+        'left_bases': empty, 'right_bases': empty,
+        'left_ips': np.empty(0), 'right_ips': np.empty(0), 'width_heights': np.empty(0),
+    }
+    if n <= 2 * window:
+        return result
+
+    # A candidate equals the maximum of its full window; the first sample of a plateau represents it
+    local_max = sliding_extremum(signal, window, np.maximum)
+    candidate = signal >= local_max
+    candidate[:window] = False
+    candidate[n - window:] = False
+    candidate[1:] &= ~(candidate[:-1] & (signal[1:] == signal[:-1]))
+    peaks = np.flatnonzero(candidate)
+    if min_prominence > 0 and len(peaks):
+        peaks = _drop_weak(signal, peaks, min_prominence)
+    if len(peaks) == 0:
+        return result
+
+    max_table = _block_tables(signal, np.maximum, -np.inf)
+    min_table = _block_tables(signal, np.minimum, np.inf)
+    bounds = _base_minima(signal, peaks, max_table, min_table)
+    prominences = signal[peaks] - np.maximum(bounds[2], bounds[3])
+
+    # Drop weak peaks before locating bases and widths, which only the survivors need
+    keep = np.flatnonzero(prominences >= min_prominence)
+    if top_k is not None and len(keep) > top_k:
+        # Most prominent first, then back into time order
+        keep = np.sort(keep[np.argsort(-prominences[keep], kind='stable')[:top_k]])
+    peaks, prominences = peaks[keep], prominences[keep]
+    bounds = [bound[keep] for bound in bounds]
+    left_bases, right_bases = _base_indices(signal, peaks, min_table, *bounds)
+
+    widths, width_heights, left_ips, right_ips = peak_widths(
+        signal, peaks, prominences, left_bases, right_bases, rel_height, min_table)
+
+    result.update({
+        'indices': peaks, 'prominences': prominences, 'widths': widths,
+        'left_bases': left_bases, 'right_bases': right_bases,
+        'left_ips': left_ips, 'right_ips': right_ips, 'width_heights': width_heights,
+    })
+    return result
+
+
+if __name__ == "__main__":
+    import time
+
+    print("=== Linear-Time Peak Detection ===\n")
+    rng = np.random.default_rng(7)
+    print(f"{'samples':>10} {'peaks':>7} {'detect (s)':>11}")
+    for n in (10**5, 10**6, 10**7):
+        x = np.linspace(0, 200 * np.pi, n)
+        flux = np.sin(x) * np.exp(np.sin(x / 37.0)) + 0.05 * rng.standard_normal(n)
+        started = time.perf_counter()
+        found = detect_peaks(flux, window=50, min_prominence=0.5)
+        elapsed = time.perf_counter() - started
+        print(f"{n:>10} {len(found['indices']):>7} {elapsed:11.3f}")
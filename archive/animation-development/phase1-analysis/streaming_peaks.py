@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Streaming Peaks - Chunked Path Sampling and Peak Detection Without the Full Curve
+Sample a path into fixed-size chunks and confirm peaks as the chunks arrive, with results identical
+to detect_peaks / find_peaks on the whole array while the skeleton of undecided history stays under
+max_skeleton values; beyond that the oldest history is forgotten and prominences become lower bounds
+"""
+
+import heapq
+
+import numpy as np
+
+from bezier_batch import bernstein_basis
+from peak_detection import _base_minima, _block_tables, sliding_extremum
+
+CHUNK_SAMPLES = 1 << 14
+MAX_SKELETON = 1 << 12   # skeleton values kept per detector; None keeps every one (exact, unbounded)
+
+
+def iter_samples(controls, samples_per_segment=100, chunk_size=CHUNK_SAMPLES):
+    """(chunk_size, 2) pieces of sample_segments(controls) in order; only the last may be shorter"""
+    controls = np.asarray(controls, dtype=np.float64)
+    basis = bernstein_basis(samples_per_segment)
+    per_block = max(chunk_size // samples_per_segment, 1)
+    carry = np.empty((0, 2))
+    for first in range(0, len(controls), per_block):
+        points = np.matmul(basis, controls[first:first + per_block]).reshape(-1, 2)
+        if len(carry):
+            points = np.concatenate([carry, points])
+        full = len(points) - len(points) % chunk_size
+        for start in range(0, full, chunk_size):
+            yield points[start:start + chunk_size]
+        carry = points[full:]
+    if len(carry):
+        yield carry
+
+
+class StreamingPeakDetector:
+    """detect_peaks (indices and prominences) over a signal that arrives in chunks
+
+    A sample's candidacy is decided once `window` later samples have arrived. Everything before
+    that point is folded into a skeleton: the samples not yet exceeded by a later one, the minima
+    between them and the still-open peaks. Left and right prominence searches only ever stop at
+    or pass over those values, so running the batch search on skeleton + new chunk is exact.
+    Skeleton entries whose left minimum can no longer change any answer are merged away, which
+    keeps it to a handful of nested levels for flux-like signals.
+
+    Signals whose peaks keep falling while their valleys keep rising (a damped oscillation) leave
+    every peak open, since a later deep dip would still raise its prominence, so the skeleton grows
+    with the number of cycles. Once it exceeds max_skeleton values the oldest part is dropped: open
+    peaks in it are reported with their prominence so far, and later searches stop at the retained
+    history. Both only ever underestimate prominence, so a capped run never reports a peak the
+    batch detector would reject; `forgotten` counts the dropped values (0 means exact).
+    """
+
+    def __init__(self, window=50, min_prominence=0.0, max_skeleton=MAX_SKELETON):
+        self.window = window
+        self.min_prominence = min_prominence
+        self.max_skeleton = max_skeleton
+        self.forgotten = 0         # skeleton values dropped by the cap
+        self.received = 0          # samples seen
+        self.decided = 0           # candidacy is known for every sample before this index
+        self._raw = np.empty(0)    # samples [decided - window, received)
+        self._raw_rows = None
+        self._previous_candidate = False
+        self._values = np.empty(0)
+        self._index = np.empty(0, dtype=np.int64)      # sample index of open peaks, else -1
+        self._open = np.empty(0, dtype=bool)
+        self._rows = {}
+
+    def _resolve(self, extended, positions):
+        """Prominence of the peaks at positions of extended, and whether it can still change"""
+        tables = (_block_tables(extended, np.maximum, -np.inf), _block_tables(extended, np.minimum, np.inf))
+        _, right_hi, left_min, right_min = _base_minima(extended, positions, *tables)
+        # Without a higher sample yet, the right minimum can still fall, until it reaches the left one
+        final = (right_hi < len(extended)) | (right_min <= left_min)
+        return extended[positions] - np.maximum(left_min, right_min), final
+
+    def _emit(self, indices, prominences):
+        keep = prominences >= self.min_prominence
+        found = [(index, prominence, self._rows.get(index))
+                 for index, prominence in zip(indices[keep].tolist(), prominences[keep].tolist())]
+        for index in indices.tolist():
+            self._rows.pop(index, None)
+        return found
+
+    def update(self, signal, rows=None):
+        """Feed the next samples; returns the (index, prominence, row) peaks confirmed by them
+
+        rows, if given, is aligned with signal (e.g. the sampled points) and the row of each
+        peak is handed back with it.
+        """
+        signal = np.asarray(signal, dtype=np.float64)
+        window = self.window
+        base = self.received - len(self._raw)
+        raw = np.concatenate([self._raw, signal])
+        if rows is not None:
+            rows = np.asarray(rows)
+            raw_rows = rows if self._raw_rows is None else np.concatenate([self._raw_rows, rows])
+        self.received += len(signal)
+        lo, hi = self.decided, self.received - window
+        if hi <= lo:
+            self._raw = raw
+            self._raw_rows = raw_rows if rows is not None else None
+            return []
+
+        # Candidates exactly as detect_peaks marks them, including the plateau rule across chunks
+        span = raw[lo - base:hi - base]
+        local_max = sliding_extremum(raw, window, np.maximum)[lo - base:hi - base]
+        candidate = (span >= local_max) & (np.arange(lo, hi) >= window)
+        previous = np.concatenate([[self._previous_candidate], candidate[:-1]])
+        before = raw[lo - base - 1] if lo > base else np.nan
+        same = span == np.concatenate([[before], span[:-1]])
+        new_peaks = np.flatnonzero(candidate & ~(previous & same))
+        self._previous_candidate = bool(candidate[-1])
+        if rows is not None:
+            for peak in new_peaks.tolist():
+                self._rows[lo + peak] = raw_rows[lo + peak - base]
+
+        # Open peaks and new candidates against the skeleton plus every sample received so far
+        extended = np.concatenate([self._values, raw[lo - base:]])
+        open_positions = np.flatnonzero(self._open)
+        positions = np.concatenate([open_positions, len(self._values) + new_peaks])
+        indices = np.concatenate([self._index[open_positions], lo + new_peaks])
+        prominences, final = self._resolve(extended, positions)
+        found = self._emit(indices[final], prominences[final])
+
+        is_open = np.zeros(len(self._values) + hi - lo, dtype=bool)
+        is_open[positions[~final]] = True
+        index = np.concatenate([self._index, np.full(hi - lo, -1, dtype=np.int64)])
+        index[positions] = indices
+        self._fold(extended[:len(is_open)], index, is_open)
+        if self.max_skeleton is not None and len(self._values) > self.max_skeleton:
+            found += self._forget(len(self._values) - self.max_skeleton, indices[~final], prominences[~final])
+        self.decided = hi
+        keep_from = max(hi - max(window, 1) - base, 0)
+        self._raw = raw[keep_from:]
+        self._raw_rows = raw_rows[keep_from:] if rows is not None else None
+        return found
+
+    def _fold(self, values, index, is_open):
+        """Skeleton of values: entries not exceeded later, the minimum before each, open peaks kept"""
+        later_max = np.maximum.accumulate(values[::-1])[::-1]
+        entries = np.flatnonzero(values >= np.append(later_max[1:], -np.inf))
+        masked = values.copy()
+        masked[entries] = np.inf
+        # gaps[k]: minimum between entry k - 1 and entry k; the last entry is the last sample
+        gaps = np.append(np.minimum.reduceat(masked, np.concatenate([[0], entries[:-1] + 1])), np.inf)
+
+        # Entry k only matters to later peaks if the minimum before it is below every later one
+        # up to the next open peak, whose left search ends at itself
+        opened = is_open[entries]
+        later_min = np.empty_like(gaps)
+        bounds = np.flatnonzero(opened) + 1
+        for first, last in zip(np.r_[0, bounds], np.r_[bounds, len(gaps)]):
+            later_min[first:last] = np.minimum.accumulate(gaps[first:last][::-1])[::-1]
+        keep = (gaps[:-1] < later_min[1:]) | opened
+        keep[-1] = True  # the last sample bounds every minimum that runs to the end
+        kept = np.flatnonzero(keep)
+        merged = np.minimum.reduceat(gaps, np.concatenate([[0], kept + 1]))
+
+        n = len(kept)
+        skeleton = np.empty(2 * n + 1)
+        skeleton[0::2], skeleton[1::2] = merged, values[entries[kept]]
+        skeleton_index = np.full(2 * n + 1, -1, dtype=np.int64)
+        skeleton_index[1::2] = index[entries[kept]]
+        skeleton_open = np.zeros(2 * n + 1, dtype=bool)
+        skeleton_open[1::2] = is_open[entries[kept]]
+        present = np.isfinite(skeleton) | skeleton_open
+        self._values, self._index, self._open = skeleton[present], skeleton_index[present], skeleton_open[present]
+
+    def _forget(self, count, open_indices, open_prominences):
+        """Drop the oldest count skeleton values, reporting the open peaks among them as they stand"""
+        dropped = self._open[:count]
+        estimate = dict(zip(open_indices.tolist(), open_prominences.tolist()))
+        indices = self._index[:count][dropped]
+        found = self._emit(indices, np.array([estimate[index] for index in indices.tolist()]))
+        self._values, self._index, self._open = self._values[count:], self._index[count:], self._open[count:]
+        self.forgotten += count
+        return found
+
+    def finish(self):
+        """End of the stream: every open peak is final; candidates in the last window never are"""
+        open_positions = np.flatnonzero(self._open)
+        if len(open_positions) == 0:
+            return []
+        base = self.received - len(self._raw)
+        extended = np.concatenate([self._values, self._raw[self.decided - base:]])
+        prominences, _ = self._resolve(extended, open_positions)
+        found = self._emit(self._index[open_positions], prominences)
+        self._open[:] = False
+        return found
+
+
+def iter_peaks(chunks, window=50, min_prominence=0.0, max_skeleton=MAX_SKELETON):
+    """(index, prominence, point) of every flux peak (minimum of SVG y) of streamed point chunks,
+    each yielded as soon as it is confirmed"""
+    detector = StreamingPeakDetector(window, min_prominence, max_skeleton)
+    for chunk in chunks:
+        yield from detector.update(-chunk[:, 1], chunk)
+    yield from detector.finish()
+
+
+def stream_find_peaks(chunks, min_prominence=8, top_k=2, window=50, max_skeleton=MAX_SKELETON):
+    """find_peaks over streamed point chunks: same (peaks, peak_indices), O(top_k) extra state"""
+    best = []
+    for index, prominence, point in iter_peaks(chunks, window, min_prominence, max_skeleton):
+        # Ties keep the earlier peak, as the stable sort in detect_peaks does
+        entry = (prominence, -index, point)
+        if top_k is None or len(best) < top_k:
+            heapq.heappush(best, entry)
+        elif entry[:2] > best[0][:2]:
+            heapq.heapreplace(best, entry)
+    best.sort(key=lambda entry: -entry[1])
+    return [(point[0], point[1]) for _, _, point in best], [-entry[1] for entry in best]
+
+
+if __name__ == "__main__":
+    import time
+    import tracemalloc
+
+    from analyze_svg_path import find_peaks, parse_svg_path, read_flux_path, sample_full_path
+    from bezier_batch import sample_segments, segments_to_controls
+    from peak_detection import detect_peaks
+
+    print("=== Streaming Peaks ===\n")
+    start_point, bezier_segments = parse_svg_path(read_flux_path())
+    controls = segments_to_controls(start_point, bezier_segments)
+    for samples in (100, 1000):
+        points = sample_full_path(start_point, bezier_segments, samples_per_segment=samples)
+        streamed = stream_find_peaks(iter_samples(controls, samples, chunk_size=257), window=samples // 2)
+        batch = find_peaks(points, window=samples // 2)
+        print(f"Blog curve, {len(points)} samples: {streamed[1]} (batch {batch[1]}, identical: {streamed == batch})")
+
+    # Long random walk with a few flares: streamed peaks against detect_peaks on the whole signal
+    rng = np.random.default_rng(3)
+    n = 2_000_000
+    signal = np.cumsum(rng.normal(0, 1, n)) * 0.01 + 3 * np.sin(np.linspace(0, 40 * np.pi, n))
+    found = detect_peaks(signal, window=200, min_prominence=0.5)
+    detector = StreamingPeakDetector(window=200, min_prominence=0.5)
+    streamed = []
+    for start in range(0, n, CHUNK_SAMPLES):
+        streamed += detector.update(signal[start:start + CHUNK_SAMPLES])
+    streamed += detector.finish()
+    streamed.sort()
+    match = (np.array_equal([peak[0] for peak in streamed], found['indices'])
+             and np.array_equal([peak[1] for peak in streamed], found['prominences']))
+    print(f"\nRandom walk, {n} samples: {len(streamed)} peaks, identical to detect_peaks: {match}, "
+          f"skeleton {len(detector._values)} values")
+
+    # Worst case: a damped oscillation leaves every peak open, so only the cap bounds the skeleton
+    t = np.arange(200_000, dtype=np.float64)
+    damped = np.cos(2 * np.pi * t / 50) / (1 + t / 500)
+    found = detect_peaks(damped, window=5)
+    print("\nDamped oscillation, 200000 samples, window 5:")
+    for cap in (None, MAX_SKELETON, 256):
+        detector = StreamingPeakDetector(window=5, max_skeleton=cap)
+        started = time.perf_counter()
+        streamed, largest = [], 0
+        for start in range(0, len(damped), 4096):
+            streamed += detector.update(damped[start:start + 4096])
+            largest = max(largest, len(detector._values))
+        streamed += detector.finish()
+        elapsed = time.perf_counter() - started
+        prominence = {index: value for index, value, _ in streamed}
+        exact = np.array_equal(sorted(prominence), found['indices']) and np.allclose(
+            [prominence[index] for index in found['indices'].tolist()], found['prominences'])
+        under = all(prominence[index] <= value + 1e-12 for index, value in zip(found['indices'].tolist(), found['prominences'].tolist()))
+        print(f"  max_skeleton {str(cap):>5}: largest skeleton {largest:>5} values, {elapsed:.2f}s, "
+              f"forgotten {detector.forgotten}, identical: {exact}, never above batch: {under}")
+
+    # Memory of a 1e5-segment path streamed at 100 samples per segment (1e7 points)
+    segments = 100_000
+    x = np.linspace(0.0, 3000.0, 3 * segments + 1)
+    y = 75 - 30 * np.abs(np.sin(x / 37.0)) - rng.normal(0, 1, len(x))
+    knots = np.column_stack([x, y])
+    long_controls = np.stack([knots[0:-1:3], knots[1::3], knots[2::3], knots[3::3]], axis=1)
+    tracemalloc.start()
+    started = time.perf_counter()
+    peaks, indices = stream_find_peaks(iter_samples(long_controls), top_k=5)
+    elapsed = time.perf_counter() - started
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"\n{segments} segments, {segments * 100} samples streamed in {elapsed:.1f}s, "
+          f"peak traced memory {peak_memory / 1e6:.1f} MB (full array: {segments * 100 * 16 / 1e6:.0f} MB)")
+    check = find_peaks(sample_segments(long_controls), top_k=5)
+    print(f"Top peaks at {indices}, identical to find_peaks: {(peaks, indices) == check}")
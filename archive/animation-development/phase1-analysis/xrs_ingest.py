@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+XRS Ingestion - Streaming GOES X-Ray Flux Series into the Flux Curve Frame
+Read CSV or .npy flux series in fixed-size chunks, normalize timestamps, map log flux onto the
+blog curve's SVG coordinates and reduce everything into a fixed number of bins, so memory stays
+bounded however long the storm interval is
+"""
+
+import os
+from itertools import islice
+
+import numpy as np
+
+from peak_detection import detect_peaks
+
+CHUNK_ROWS = 1 << 16
+N_BINS = 2000
+TIME_FIELD = 'time_tag'   # column names of the NOAA SWPC GOES XRS products
+FLUX_FIELD = 'flux'
+CSV_DTYPE = np.dtype([('time', 'U64'), ('flux', 'f8')])   # one CSV row as read by iter_csv_chunks
+
+# GOES flare classes A1 .. X10 span 1e-8 .. 1e-3 W/m^2; fixed so no pre-pass over the flux is needed
+FLUX_RANGE = (1e-8, 1e-3)
+# Plot frame of the blog's flux curve: x runs 30 -> 330, baseline at y=75, strongest flux at y=15
+SVG_FRAME = {'x0': 30.0, 'x1': 330.0, 'y_base': 75.0, 'y_top': 15.0}
+
+
+def to_seconds(values):
+    """Epoch seconds from numeric timestamps or ISO-8601 strings (trailing Z allowed)"""
+    values = np.asarray(values)
+    if values.dtype.kind in 'iuf':
+        return values.astype(np.float64)
+    if values.dtype.kind == 'M':
+        return values.astype('datetime64[us]').astype(np.int64) / 1e6
+    stamps = np.char.rstrip(np.char.strip(values.astype(str), '"'), 'Z')
+    return stamps.astype('datetime64[us]').astype(np.int64) / 1e6
+
+
+def _csv_columns(header, time_field, flux_field):
+    names = [name.strip().strip('"') for name in header.rstrip('\n').split(',')]
+    try:
+        return names.index(time_field), names.index(flux_field)
+    except ValueError:
+        raise ValueError(f"CSV header {names} lacks {time_field!r} or {flux_field!r}") from None
+
+
+def iter_csv_chunks(path, chunk_rows=CHUNK_ROWS, time_field=TIME_FIELD, flux_field=FLUX_FIELD):
+    """(epoch seconds, flux) arrays of at most chunk_rows rows from a CSV with a header"""
+    with open(path) as f:
+        time_col, flux_col = _csv_columns(f.readline(), time_field, flux_field)
+        while True:
+            lines = list(islice(f, chunk_rows))
+            if not lines:
+                return
+            # Both columns in one parse; timestamps stay text because they may be ISO-8601 strings
+            rows = np.loadtxt(lines, delimiter=',', usecols=(time_col, flux_col), dtype=CSV_DTYPE,
+                              quotechar='"', ndmin=1)
+            try:
+                seconds = rows['time'].astype(np.float64)
+            except ValueError:
+                seconds = to_seconds(rows['time'])
+            yield seconds, rows['flux']
+
+
+def iter_npy_chunks(path, chunk_rows=CHUNK_ROWS, time_field=TIME_FIELD, flux_field=FLUX_FIELD):
+    """Chunks of a memory-mapped .npy: a structured array with the named fields or an (n, 2) array"""
+    data = np.load(path, mmap_mode='r')
+    for start in range(0, len(data), chunk_rows):
+        block = data[start:start + chunk_rows]
+        if data.dtype.names:
+            yield to_seconds(block[time_field]), np.asarray(block[flux_field], dtype=np.float64)
+        else:
+            yield np.asarray(block[:, 0], dtype=np.float64), np.asarray(block[:, 1], dtype=np.float64)
+
+
+def iter_chunks(path, chunk_rows=CHUNK_ROWS, time_field=TIME_FIELD, flux_field=FLUX_FIELD):
+    """Chunked (epoch seconds, flux) reader chosen by file extension"""
+    reader = iter_npy_chunks if path.endswith('.npy') else iter_csv_chunks
+    return reader(path, chunk_rows, time_field, flux_field)
+
+
+def series_span(path, time_field=TIME_FIELD, flux_field=FLUX_FIELD):
+    """First and last timestamp without reading the series: header row plus the file's tail"""
+    if path.endswith('.npy'):
+        data = np.load(path, mmap_mode='r')
+        ends = data[[0, -1]]
+        return tuple(to_seconds(ends[time_field] if data.dtype.names else ends[:, 0]).tolist())
+    with open(path, 'rb') as f:
+        header = f.readline().decode()
+        first = f.readline().decode()
+        f.seek(0, os.SEEK_END)
+        f.seek(max(f.tell() - 4096, 0))
+        last = f.read().decode().rstrip('\n').rsplit('\n', 1)[-1]
+    time_col, _ = _csv_columns(header, time_field, flux_field)
+    stamps = np.array([line.split(',')[time_col] for line in (first, last)])
+    try:
+        return tuple(stamps.astype(np.float64).tolist())
+    except ValueError:
+        return tuple(to_seconds(stamps).tolist())
+
+
+def flux_to_svg_y(flux, frame=SVG_FRAME, flux_range=FLUX_RANGE):
+    """SVG y of log10 flux in the curve frame, clipped to the flux range (NaN stays NaN)"""
+    low, high = np.log10(flux_range[0]), np.log10(flux_range[1])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        level = (np.log10(np.clip(flux, flux_range[0], flux_range[1])) - low) / (high - low)
+    return frame['y_base'] + (frame['y_top'] - frame['y_base']) * level
+
+
+class BinnedFlux:
+    """Fixed-size min/max flux envelope over a known time span, updated one sorted chunk at a time"""
+
+    def __init__(self, start, end, n_bins=N_BINS):
+        self.start, self.end, self.n_bins = float(start), float(end), n_bins
+        self.maximum = np.full(n_bins, -np.inf)
+        self.minimum = np.full(n_bins, np.inf)
+        self.count = np.zeros(n_bins, dtype=np.int64)
+        self.rows = 0
+        self.dropped = 0
+
+    def update(self, times, flux):
+        # GOES fill values (-9999) and missing samples carry no flux
+        valid = np.isfinite(flux) & (flux > 0) & np.isfinite(times)
+        self.rows += len(flux)
+        self.dropped += int(len(flux) - valid.sum())
+        times, flux = times[valid], flux[valid]
+        if len(times) == 0:
+            return
+        scale = self.n_bins / max(self.end - self.start, 1e-12)
+        bins = np.clip(((times - self.start) * scale).astype(np.int64), 0, self.n_bins - 1)
+        if np.any(np.diff(bins) < 0):
+            order = np.argsort(bins, kind='stable')
+            bins, flux = bins[order], flux[order]
+        # Runs of equal bins reduce with reduceat; each run touches a distinct bin
+        first = np.flatnonzero(np.concatenate([[True], bins[1:] != bins[:-1]]))
+        touched = bins[first]
+        self.maximum[touched] = np.maximum(self.maximum[touched], np.maximum.reduceat(flux, first))
+        self.minimum[touched] = np.minimum(self.minimum[touched], np.minimum.reduceat(flux, first))
+        self.count[touched] += np.diff(np.append(first, len(bins)))
+
+    def times(self):
+        """Bin centres in seconds since the series start"""
+        return (np.arange(self.n_bins) + 0.5) * (self.end - self.start) / self.n_bins
+
+    def svg_points(self, frame=SVG_FRAME, flux_range=FLUX_RANGE):
+        """(x, y) of the max-flux envelope in the curve frame; empty bins are skipped"""
+        filled = self.count > 0
+        x = frame['x0'] + (frame['x1'] - frame['x0']) * (np.arange(self.n_bins) + 0.5) / self.n_bins
+        return np.column_stack([x[filled], flux_to_svg_y(self.maximum[filled], frame, flux_range)])
+
+
+def ingest(path, n_bins=N_BINS, chunk_rows=CHUNK_ROWS, time_field=TIME_FIELD, flux_field=FLUX_FIELD,
+           frame=SVG_FRAME, flux_range=FLUX_RANGE, min_prominence=3.0, top_k=None):
+    """Stream a flux series into the curve frame: binned envelope, SVG points and detected peaks"""
+    start, end = series_span(path, time_field, flux_field)
+    binned = BinnedFlux(start, end, n_bins)
+    for times, flux in iter_chunks(path, chunk_rows, time_field, flux_field):
+        binned.update(times, flux)
+    points = binned.svg_points(frame, flux_range)
+    # Peaks in flux are minima of SVG y, as in analyze_svg_path.find_peaks
+    window = max(n_bins // 100, 1)
+    peaks = detect_peaks(-points[:, 1], window=window, min_prominence=min_prominence, top_k=top_k)
+    filled = np.flatnonzero(binned.count > 0)
+    return {
+        'binned': binned,
+        'points': points,
+        'peaks': peaks,
+        'peak_times': binned.times()[filled][peaks['indices']],
+        'peak_flux': binned.maximum[filled][peaks['indices']],
+    }
+
+
+def flare_class(flux):
+    """GOES class label (e.g. X8.7) of a peak flux in W/m^2"""
+    for letter, level in (('X', 1e-4), ('M', 1e-5), ('C', 1e-6), ('B', 1e-7), ('A', 1e-8)):
+        if flux >= level:
+            return f"{letter}{flux / level:.1f}"
+    return f"A{flux / 1e-8:.1f}"
+
+
+def synthetic_storm(path, rows, seed=0):
+    """1 s cadence storm (background C-class flux plus impulsive flares) saved as a structured .npy"""
+    rng = np.random.default_rng(seed)
+    flux = np.full(rows, 2e-6) * np.exp(rng.normal(0, 0.05, rows))
+    for onset, peak, decay in ((0.2, 3e-5, 900), (0.45, 2e-4, 1800), (0.5, 8.7e-4, 2400), (0.8, 5e-5, 1200)):
+        start = int(onset * rows)
+        ramp = np.arange(rows - start, dtype=np.float64)
+        flux[start:] += peak * (1 - np.exp(-ramp / 120)) * np.exp(-ramp / decay)
+    data = np.empty(rows, dtype=[(TIME_FIELD, 'f8'), (FLUX_FIELD, 'f8')])
+    data[TIME_FIELD], data[FLUX_FIELD] = np.arange(rows, dtype=np.float64) + 1.7153e9, flux
+    np.save(path, data)
+
+
+if __name__ == "__main__":
+    import argparse
+    import tempfile
+    import time
+    import tracemalloc
+
+    parser = argparse.ArgumentParser(description="Stream a GOES XRS flux series into the flux curve frame")
+    parser.add_argument('path', nargs='?', help="CSV (time_tag, flux columns) or .npy series; default: synthetic storm")
+    parser.add_argument('--rows', type=int, default=3_000_000, help="rows of the synthetic series")
+    args = parser.parse_args()
+
+    # The synthetic series is written to a scratch directory removed on exit
+    with tempfile.TemporaryDirectory() as scratch:
+        path = args.path
+        if path is None:
+            path = os.path.join(scratch, 'xrs_synthetic.npy')
+            synthetic_storm(path, args.rows)
+
+        started = time.perf_counter()
+        result = ingest(path)
+        elapsed = time.perf_counter() - started
+        tracemalloc.start()
+        ingest(path)
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        binned = result['binned']
+        print("=== XRS Ingestion ===\n")
+        print(f"{binned.rows} rows ({binned.dropped} invalid) -> {len(result['points'])} points in {elapsed:.2f}s, "
+              f"peak traced memory {peak_memory / 1e6:.1f} MB")
+        for seconds, flux in zip(result['peak_times'], result['peak_flux']):
+            print(f"  Peak {flare_class(flux):>6} at +{seconds / 3600:.2f}h")
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Catalog Batch - Flare Animations for a Whole Catalog Across All Cores
+Run parse -> arc-length peak timing -> region assignment -> keyframes for every flux curve in
+a manifest on a process pool, writing sharded per-flare CSS/JSON and resuming after interruption
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'phase1-analysis'))
+
+from phase7_blending import emit_blended_css
+from pipeline import PARAMS_FILE, flux_timings, load_params, region_peaks, region_windows
+from svg_path_parser import extract_path_data, parse_path_data
+
+CHUNK_SIZE = 32            # flares per worker task
+N_SHARDS = 256             # output directories, keyed by a hash of the flare id
+SHARD_DIGITS = len(f'{N_SHARDS - 1:x}')   # hex digits of a shard directory name
+# Flare ids become file names: no separators, no leading dot (so never '.' or '..')
+FLARE_ID = re.compile(r'[A-Za-z0-9][A-Za-z0-9._-]{0,127}')
+
+
+def read_manifest(path, on_error=None):
+    """Manifest entries one at a time: JSON lines with flare_id and path_d or path_file (HTML/SVG)
+
+    A line that is not a JSON object raises ValueError, or with on_error is passed to
+    on_error(line_number, error) and skipped
+    """
+    with open(path) as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line.strip())
+                if not isinstance(entry, dict):
+                    raise ValueError(f"expected a JSON object, got {type(entry).__name__}")
+            except ValueError as error:
+                if on_error is None:
+                    raise ValueError(f"{path} line {line_number}: {error}") from None
+                on_error(line_number, error)
+                continue
+            yield entry
+
+
+def entry_path_d(entry, base_dir):
+    """Flux curve path data of one manifest entry"""
+    if 'path_d' in entry:
+        return entry['path_d']
+    with open(os.path.join(base_dir, entry['path_file'])) as f:
+        return extract_path_data(f.read(), entry.get('element_id', 'fluxCurve'))
+
+
+def shard_paths(out_dir, flare_id):
+    """(css, json) output paths of one flare; the shard is its id's hash modulo N_SHARDS"""
+    if not isinstance(flare_id, str) or not FLARE_ID.fullmatch(flare_id):
+        raise ValueError(f"invalid flare id {flare_id!r}: use up to 128 letters, digits, '.', '_' or '-', "
+                         f"starting with a letter or digit")
+    digest = hashlib.sha1(str(flare_id).encode()).digest()
+    shard = os.path.join(out_dir, f'{int.from_bytes(digest[:4], "big") % N_SHARDS:0{SHARD_DIGITS}x}')
+    return os.path.join(shard, f'{flare_id}.css'), os.path.join(shard, f'{flare_id}.json')
+
+
+def input_key(path_d, params, minify):
+    """Hash of everything a flare's outputs depend on, stored in its JSON for resume checks"""
+    digest = hashlib.sha256(path_d.encode())
+    digest.update(json.dumps({key: params[key] for key in ('duration', 'first_peak', 'regions')}, sort_keys=True).encode())
+    digest.update(b'minify' if minify else b'pretty')
+    return digest.hexdigest()
+
+
+def is_done(json_path, key):
+    """True when a previous run finished this flare from identical inputs"""
+    try:
+        with open(json_path) as f:
+            return json.load(f).get('input_key') == key
+    except (OSError, ValueError):
+        return False
+
+
+def _write_atomic(path, text):
+    with open(path + '.tmp', 'w') as f:
+        f.write(text)
+    os.replace(path + '.tmp', path)
+
+
+def process_flare(flare_id, path_d, params, minify=False):
+    """One flare's summary record and stylesheet (None when the curve has fewer than two peaks)"""
+    controls = parse_path_data(path_d).controls
+    if len(controls) == 0:
+        raise ValueError("path data has no curve segments")
+    timings = flux_timings(path_d, params['duration'])
+    record = {
+        'flare_id': flare_id,
+        'segments': len(controls),
+        'timings': timings,
+    }
+    if len(timings['peak_times']) < 2:
+        record['status'] = 'skipped: fewer than two flux peaks'
+        return record, None
+
+    peaks = region_peaks(timings, params['first_peak'])
+    windows = {region_id: region_windows(peaks, region)['blended'] for region_id, region in params['regions'].items()}
+    buffer = io.StringIO()
+    emit_blended_css(windows, buffer, minify=minify)
+    record.update({'status': 'ok', 'region_peaks': peaks, 'windows': windows, 'css_bytes': len(buffer.getvalue())})
+    return record, buffer.getvalue()
+
+
+def _process_chunk(entries, base_dir, params, out_dir, minify):
+    """Worker task: process and write a chunk of flares; returns (flare_id, status) pairs"""
+    results = []
+    for entry in entries:
+        flare_id = entry.get('flare_id')
+        try:
+            css_path, json_path = shard_paths(out_dir, flare_id)
+            path_d = entry_path_d(entry, base_dir)
+            record, css = process_flare(flare_id, path_d, params, minify)
+            record['input_key'] = input_key(path_d, params, minify)
+        except Exception as error:
+            # One bad curve must not take down its chunk: record it and carry on
+            results.append((flare_id, f'failed: {type(error).__name__}: {error}'))
+            continue
+        os.makedirs(os.path.dirname(json_path), exist_ok=True)
+        if css is not None:
+            _write_atomic(css_path, css)
+        # The JSON goes last: its presence marks the flare as done for --resume
+        _write_atomic(json_path, json.dumps(record, indent=2))
+        results.append((flare_id, record['status']))
+    return results
+
+
+def _pending_entries(manifest, base_dir, params, out_dir, minify, resume, counts, failures):
+    """Manifest entries still to do; finished ones are counted and skipped when resuming
+
+    Malformed manifest lines are counted as failed under their line number
+    """
+    def malformed(line_number, error):
+        counts['failed'] += 1
+        failures.append((f'line {line_number}', f'failed: {type(error).__name__}: {error}'))
+
+    for entry in read_manifest(manifest, on_error=malformed):
+        if resume:
+            try:
+                key = input_key(entry_path_d(entry, base_dir), params, minify)
+                json_path = shard_paths(out_dir, entry.get('flare_id'))[1]
+            except Exception:
+                yield entry  # let the worker report the failure
+                continue
+            if is_done(json_path, key):
+                counts['resumed'] += 1
+                continue
+        yield entry
+
+
+def run_catalog(manifest, out_dir, params, workers=None, chunk_size=CHUNK_SIZE, minify=False, resume=True):
+    """Process every manifest entry on a process pool with a bounded number of chunks in flight"""
+    base_dir = os.path.dirname(os.path.abspath(manifest))
+    workers = workers or os.cpu_count()
+    counts = {'ok': 0, 'skipped': 0, 'failed': 0, 'resumed': 0}
+    failures = []
+    entries = _pending_entries(manifest, base_dir, params, out_dir, minify, resume, counts, failures)
+
+    def collect(futures):
+        for future in futures:
+            for flare_id, status in future.result():
+                kind = status.split(':')[0]
+                counts[kind] += 1
+                if kind == 'failed':
+                    failures.append((flare_id, status))
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        while True:
+            chunk = list(islice(entries, chunk_size))
+            if not chunk:
+                break
+            pending.add(pool.submit(_process_chunk, chunk, base_dir, params, out_dir, minify))
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+        collect(pending)
+    return counts, failures
+
+
+def synthetic_manifest(path, n_flares, page, seed=0):
+    """Manifest of jittered copies of the blog's flux curve, for benchmarking the batch mode"""
+    from flux_path_generator import path_d as format_path_d
+
+    controls = parse_path_data(extract_path_data(page, 'fluxCurve')).controls
+    rng = np.random.default_rng(seed)
+    with open(path, 'w') as f:
+        for i in range(n_flares):
+            jittered = controls.copy()
+            # Move inner control points and joints vertically; shared joints stay shared
+            jittered[:, 1:3, 1] += rng.normal(0, 4, (len(controls), 2))
+            joints = rng.normal(0, 2, len(controls) - 1)
+            jittered[:-1, 3, 1] += joints
+            jittered[1:, 0, 1] += joints
+            f.write(json.dumps({'flare_id': f'flare-{i:05d}', 'path_d': format_path_d(jittered, 2)}) + '\n')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate flare animations for every curve in a manifest")
+    parser.add_argument('manifest', nargs='?', help="JSON lines: flare_id plus path_d or path_file")
+    parser.add_argument('--params', default=PARAMS_FILE)
+    parser.add_argument('--out', default='catalog_animations')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--chunk', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--minify', action='store_true')
+    parser.add_argument('--no-resume', action='store_true', help="recompute flares that already have outputs")
+    parser.add_argument('--synthetic', type=int, default=0, help="write a manifest of N jittered curves first")
+    args = parser.parse_args(argv)
+
+    params = load_params(args.params)
+    manifest = args.manifest or os.path.join(args.out, 'manifest.jsonl')
+    if args.synthetic:
+        os.makedirs(os.path.dirname(os.path.abspath(manifest)), exist_ok=True)
+        with open(params['blog_page']) as f:
+            synthetic_manifest(manifest, args.synthetic, f.read())
+
+    print("=== Catalog Batch ===\n")
+    started = time.perf_counter()
+    counts, failures = run_catalog(manifest, args.out, params, args.workers, args.chunk, args.minify, not args.no_resume)
+    elapsed = time.perf_counter() - started
+    processed = counts['ok'] + counts['skipped'] + counts['failed']
+    print(f"{processed} flares in {elapsed:.1f}s ({processed / max(elapsed, 1e-9):.0f}/s): {counts['ok']} ok, "
+          f"{counts['skipped']} skipped, {counts['failed']} failed, {counts['resumed']} already done")
+    for flare_id, status in failures[:10]:
+        print(f"  {flare_id}: {status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+CSS Emitter - Streaming Output for Generated Animations
+Write region rules and @keyframes straight to a file-like sink, either in the phase scripts'
+layout (pretty) or minified for inlining into the blog page
+"""
+
+import re
+from functools import lru_cache
+
+# Numbers that are not part of an identifier such as flare-region-1
+NUMBER = re.compile(r'(?<![\w.#-])-?(?:\d+\.?\d*|\.\d+)')
+WHITE_RGBA = re.compile(r'rgba\(\s*255\s*,\s*255\s*,\s*255\s*,\s*([\d.]+)\s*\)')
+
+# Where each flare sits on the blog figure, keyed by region id
+REGION_PLACEMENTS = {
+    'region_1': [('top', '30%'), ('left', '20%')],
+    'region_2': [('top', '60%'), ('right', '25%')],
+    'region_3': [('bottom', '35%'), ('left', '40%')],
+}
+
+
+def short_number(text):
+    """Shortest spelling of a CSS number: 0.30 -> .3, 2.00 -> 2, -0.50 -> -.5"""
+    value = float(text)
+    if value == int(value):
+        return str(int(value))
+    digits = repr(value)
+    if 'e' in digits:
+        return digits
+    if digits.startswith('0.'):
+        return digits[1:]
+    if digits.startswith('-0.'):
+        return '-' + digits[2:]
+    return digits
+
+
+def white_hex(alpha):
+    """#fff / #fffa / #ffffffaa for white at the given alpha (browsers keep 8-bit alpha anyway)"""
+    level = min(max(round(float(alpha) * 255), 0), 255)
+    if level == 255:
+        return '#fff'
+    high, low = divmod(level, 16)
+    if high == low:
+        return f'#fff{high:x}'
+    return f'#ffffff{level:02x}'
+
+
+@lru_cache(maxsize=4096)
+def minify_value(value):
+    """Minified declaration value: white rgba() as hex, shortest numbers, no space after commas"""
+    value = WHITE_RGBA.sub(lambda match: white_hex(match.group(1)), value)
+    value = NUMBER.sub(lambda match: short_number(match.group(0)), value)
+    return value.replace(', ', ',')
+
+
+def flare_declarations(scale, opacity, glow, glow_alpha):
+    """transform/opacity/box-shadow declarations of a flare keyframe from preformatted values"""
+    return [
+        ('transform', f'scale({scale})'),
+        ('opacity', opacity),
+        ('box-shadow', f'0 0 {glow}px rgba(255, 255, 255, {glow_alpha})'),
+    ]
+
+
+def emit_region_rules(emitter, keyframe_name, timing, comment=None):
+    """.region-N rule of every placed flare, animating keyframe_name(region_id) with the given timing"""
+    for region_id, position in REGION_PLACEMENTS.items():
+        animation = f"{keyframe_name(region_id)} {timing}"
+        emitter.rule(f".{region_id.replace('_', '-')}", position, [('animation', animation)], comment=comment)
+        comment = None
+
+
+class Tee:
+    """File-like sink that writes to several sinks at once (e.g. stdout and the .css file)"""
+
+    def __init__(self, *sinks):
+        self.sinks = sinks
+
+    def write(self, text):
+        for sink in self.sinks:
+            sink.write(text)
+
+
+class CSSEmitter:
+    """Streams top-level CSS blocks to a sink without holding the stylesheet in memory
+
+    Pretty mode reproduces the phase scripts' layout byte for byte: a blank line between
+    blocks, two when switching from rules to @keyframes, comments directly above their
+    block and no trailing newline. Minified mode drops comments and whitespace and merges
+    identical adjacent keyframe blocks.
+    """
+
+    def __init__(self, sink, minify=False):
+        self.sink = sink
+        self.minify = minify
+        self._previous = None
+
+    def _begin(self, kind, comment):
+        if not self.minify:
+            if self._previous is not None:
+                self.sink.write('\n\n\n' if kind != self._previous else '\n\n')
+            if comment:
+                self.sink.write(f'/* {comment} */\n')
+        self._previous = kind
+
+    def _declarations(self, declarations):
+        return ';'.join(f'{prop}:{minify_value(str(value))}' for prop, value in declarations)
+
+    def rule(self, selector, position, declarations, comment=None):
+        """One rule; position declarations share the first line in pretty mode"""
+        self._begin('rule', comment)
+        if self.minify:
+            self.sink.write(f'{selector}{{{self._declarations(list(position) + list(declarations))}}}')
+            return
+        lines = [f'{selector} {{ ']
+        if position:
+            lines.append('    ' + ' '.join(f'{prop}: {value};' for prop, value in position) + ' ')
+        lines.extend(f'    {prop}: {value};' for prop, value in declarations)
+        lines.append('}')
+        self.sink.write('\n'.join(lines))
+
+    def keyframes(self, name, frames, comment=None):
+        """@keyframes block from an iterable of (selectors, declarations), streamed frame by frame"""
+        self._begin('keyframes', comment)
+        if self.minify:
+            self._minified_keyframes(name, frames)
+            return
+        self.sink.write(f'@keyframes {name} {{')
+        for selectors, declarations in frames:
+            self.sink.write(f'\n    {", ".join(selectors)} {{\n')
+            for prop, value in declarations:
+                self.sink.write(f'        {prop}: {value};\n')
+            self.sink.write('    }')
+        self.sink.write('\n}')
+
+    def _minified_keyframes(self, name, frames):
+        # Only the previous frame is buffered, so identical neighbours can share one block
+        self.sink.write(f'@keyframes {name}{{')
+        pending_selectors, pending_body = [], None
+        for selectors, declarations in frames:
+            body = self._declarations(declarations)
+            selectors = [minify_value(selector) for selector in selectors]
+            if body == pending_body:
+                pending_selectors.extend(selectors)
+                continue
+            if pending_body is not None:
+                self.sink.write(f'{",".join(pending_selectors)}{{{pending_body}}}')
+            pending_selectors, pending_body = list(selectors), body
+        if pending_body is not None:
+            self.sink.write(f'{",".join(pending_selectors)}{{{pending_body}}}')
+        self.sink.write('}')
+
+
+if __name__ == "__main__":
+    import io
+    import time
+    import tracemalloc
+
+    import numpy as np
+
+    from keyframe_engine import BLENDED_BUILDUP, BLENDED_DECAY, REGION_DTYPE, compute_keyframes
+
+    rng = np.random.default_rng(0)
+    n_regions = 20_000
+    regions = np.zeros(n_regions, dtype=REGION_DTYPE)
+    regions['buildup_start'] = rng.uniform(1, 60, n_regions).round(1)
+    regions['peak'] = regions['buildup_start'] + rng.uniform(2, 15, n_regions).round(1)
+    regions['decay_end'] = regions['peak'] + rng.uniform(5, 30, n_regions).round(1)
+    regions['max_scale'] = 2.2
+    regions['max_glow'] = 25
+    regions['rise_exponent'] = 1.3
+    regions['decay_rate'] = 1.8
+    regions['floor'] = 0.25
+    regions['glow_floor'] = 4
+    keyframes = compute_keyframes(regions, BLENDED_BUILDUP, BLENDED_DECAY)
+
+    def frames(row):
+        yield ['0%', f"{regions['buildup_start'][row] - 1.0:.1f}%"], flare_declarations('0.8', '0.25', 4, '0.3')
+        for k in range(keyframes['time'].shape[1]):
+            opacity = f"{keyframes['opacity'][row, k]:.2f}"
+            yield [f"{keyframes['time'][row, k]:.1f}%"], flare_declarations(
+                f"{keyframes['scale'][row, k]:.2f}", opacity, f"{keyframes['glow'][row, k]:.0f}", opacity)
+        yield [f"{regions['decay_end'][row] + 2.0:.1f}%", '100%'], flare_declarations('0.8', '0.25', 4, '0.3')
+
+    class CountingSink:
+        def __init__(self):
+            self.size = 0
+
+        def write(self, text):
+            self.size += len(text)
+
+    def emit_all(sink, minify):
+        emitter = CSSEmitter(sink, minify=minify)
+        for row in range(n_regions):
+            emitter.keyframes(f'flare-{row}', frames(row), comment=f'Region {row}')
+
+    print("=== Streaming CSS Emitter ===\n")
+    for minify in (False, True):
+        sink = CountingSink()
+        started = time.perf_counter()
+        emit_all(sink, minify)
+        elapsed = time.perf_counter() - started
+        # Second pass under tracemalloc: peak memory stays flat however many regions are written
+        tracemalloc.start()
+        emit_all(CountingSink(), minify)
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        label = 'minified' if minify else 'pretty'
+        print(f"{label:>9}: {n_regions} regions, {sink.size / 1e6:.1f} MB in {elapsed:.2f}s, peak memory {peak_memory / 1e3:.0f} KB")
+
+    buffer = io.StringIO()
+    CSSEmitter(buffer, minify=True).keyframes('flare-demo', frames(0))
+    print(f"\nMinified sample:\n{buffer.getvalue()[:240]}...")
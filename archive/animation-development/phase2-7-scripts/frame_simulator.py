@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Frame Simulator - Offline Rendering of the Flare Animation
+Evaluate every region's @keyframes with its easing at a fixed frame rate, the way the browser
+interpolates them, and score the summed brightness against the indicator on the flux curve
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+from collections import namedtuple
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'phase1-analysis'))
+
+from arc_length import path_length_table, time_to_point
+from pipeline import PARAMS_FILE, flux_path, load_params
+from timing_function import KEYWORDS, STEP_KEYWORDS, parse_timing_function
+
+FPS = 240
+REGION_SELECTOR = re.compile(r'\.region-\d+')
+PROPERTIES = ('opacity', 'scale', 'glow', 'glow_alpha')
+
+STYLE = re.compile(r'<style[^>]*>(.*?)</style>', re.DOTALL)
+COMMENT = re.compile(r'/\*.*?\*/', re.DOTALL)
+KEYFRAMES = re.compile(r'@keyframes\s+([\w-]+)\s*\{((?:[^{}]*\{[^{}]*\})*)\s*\}')
+BLOCK = re.compile(r'([^{}]+)\{([^{}]*)\}')
+DURATION = re.compile(r'^(-?\d*\.?\d+)(m?s)$')
+ITERATIONS = re.compile(r'^\d*\.?\d+$')
+EASING_FUNCTION = re.compile(r'(?:cubic-bezier|steps)\(')
+DIRECTIONS = ('normal', 'reverse', 'alternate', 'alternate-reverse')
+# Other animation shorthand keywords: iteration count, fill mode and play state
+ANIMATION_KEYWORDS = ('infinite', 'none', 'forwards', 'backwards', 'both', 'running', 'paused')
+SCALE = re.compile(r'scale\(\s*([-\d.]+)')
+SHADOW = re.compile(r'([-\d.]+)px\s+(?:rgba\(\s*[\d.]+\s*,\s*[\d.]+\s*,\s*[\d.]+\s*,\s*([\d.]+)\s*\)|#([0-9a-fA-F]{3,8}))\s*$')
+
+# One animated element: its keyframes name, loop duration (s), animation-timing-function,
+# delay (s) and direction
+Animation = namedtuple('Animation', ['name', 'duration', 'easing', 'delay', 'direction'], defaults=(0.0, 'normal'))
+
+
+def _declarations(body):
+    pairs = (item.split(':', 1) for item in body.split(';') if ':' in item)
+    return {prop.strip(): value.strip() for prop, value in pairs}
+
+
+def parse_animation(shorthand):
+    """Keyframes name, duration, easing, delay and direction from an `animation` shorthand value
+
+    Only the first animation of a comma-separated list is read. As in CSS, the first time is the
+    duration and the second the delay, and the name is the first token no other part claims.
+    """
+    first = re.split(r',(?![^(]*\))', shorthand)[0]
+    tokens = re.findall(r'[\w-]+\([^)]*\)|[^\s]+', first)
+    name, times, easing, direction = None, [], parse_timing_function('ease'), 'normal'
+    for token in tokens:
+        match = DURATION.match(token)
+        if match:
+            times.append(float(match.group(1)) / (1000.0 if match.group(2) == 'ms' else 1.0))
+        elif EASING_FUNCTION.match(token) or token in KEYWORDS or token in STEP_KEYWORDS:
+            easing = parse_timing_function(token)
+        elif token in DIRECTIONS:
+            direction = token
+        elif token in ANIMATION_KEYWORDS or ITERATIONS.match(token):
+            continue
+        elif name is None:
+            name = token
+    duration = times[0] if times else 0.0
+    delay = times[1] if len(times) > 1 else 0.0
+    return Animation(name, duration, easing, delay, direction)
+
+
+def _hex_alpha(digits):
+    if len(digits) in (4, 8):
+        alpha = digits[-1] * 2 if len(digits) == 4 else digits[-2:]
+        return int(alpha, 16) / 255
+    return 1.0
+
+
+def keyframe_values(declarations):
+    """Numeric opacity, scale, glow radius and glow alpha of one keyframe (NaN where unset)"""
+    values = dict.fromkeys(PROPERTIES, np.nan)
+    if 'opacity' in declarations:
+        values['opacity'] = float(declarations['opacity'])
+    match = SCALE.search(declarations.get('transform', ''))
+    if match:
+        values['scale'] = float(match.group(1))
+    match = SHADOW.search(declarations.get('box-shadow', ''))
+    if match:
+        values['glow'] = float(match.group(1))
+        values['glow_alpha'] = float(match.group(2)) if match.group(2) else _hex_alpha(match.group(3))
+    return values
+
+
+def parse_keyframes(body):
+    """Sorted keyframe offsets (percent) and the value of every property at each"""
+    offsets, rows = [], []
+    for selectors, declarations in BLOCK.findall(body):
+        values = keyframe_values(_declarations(declarations))
+        for selector in selectors.split(','):
+            selector = selector.strip()
+            offsets.append({'from': 0.0, 'to': 100.0}[selector] if selector in ('from', 'to') else float(selector.rstrip('%')))
+            rows.append([values[prop] for prop in PROPERTIES])
+    order = np.argsort(offsets, kind='stable')
+    table = np.array(rows, dtype=np.float64)[order]
+    return np.array(offsets)[order], {prop: table[:, j] for j, prop in enumerate(PROPERTIES)}
+
+
+def parse_stylesheet(css, selector=REGION_SELECTOR):
+    """Animations of the matching rules and every @keyframes block of a stylesheet or HTML page"""
+    styles = STYLE.findall(css)
+    css = COMMENT.sub('', '\n'.join(styles) if styles else css)
+    keyframes = {name: parse_keyframes(body) for name, body in KEYFRAMES.findall(css)}
+    animations = {}
+    for selectors, body in BLOCK.findall(KEYFRAMES.sub('', css)):
+        declarations = _declarations(body)
+        for name in selectors.split(','):
+            name = name.strip()
+            if selector.fullmatch(name) and 'animation' in declarations:
+                animations[name] = parse_animation(declarations['animation'])
+    return animations, keyframes
+
+
+def interpolate(offsets, values, progress, easing):
+    """Property values at animation progress (percent), eased within each keyframe interval
+
+    Each property interpolates between the keyframes that set it; before the first and after
+    the last of those the nearest value holds.
+    """
+    known = ~np.isnan(values)
+    offsets, values = offsets[known], values[known]
+    if len(offsets) == 0:
+        return np.full(progress.shape, np.nan)
+    if len(offsets) == 1:
+        return np.full(progress.shape, values[0])
+    interval = np.clip(np.searchsorted(offsets, progress, side='right') - 1, 0, len(offsets) - 2)
+    low, high = offsets[interval], offsets[interval + 1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        local = np.clip(np.where(high > low, (progress - low) / (high - low), 1.0), 0.0, 1.0)
+    return values[interval] + (values[interval + 1] - values[interval]) * easing(local)
+
+
+def simulate(animations, keyframes, duration=6.0, fps=FPS):
+    """Frame times and per-region property timelines over one loop; regions without keyframes are reported"""
+    times = np.arange(int(round(duration * fps))) / fps
+    frames, missing = {}, []
+    for selector, animation in animations.items():
+        if animation.name not in keyframes:
+            missing.append((selector, animation.name))  # the browser leaves these elements static
+            continue
+        offsets, values = keyframes[animation.name]
+        # Steady state of the infinite loop: the delay only shifts its phase
+        elapsed = (times - animation.delay) / animation.duration
+        progress = (elapsed % 1.0) * 100.0
+        reverse = {'normal': False, 'reverse': True}.get(animation.direction)
+        if reverse is None:
+            reverse = np.floor(elapsed) % 2 == (0 if animation.direction == 'alternate-reverse' else 1)
+        progress = np.where(reverse, 100.0 - progress, progress)
+        frames[selector] = {prop: interpolate(offsets, values[prop], progress, animation.easing) for prop in PROPERTIES}
+    return times, frames, missing
+
+
+def indicator_flux(path_d, times, duration=6.0):
+    """Normalized flux (inverted SVG y, 0 to 1) under the paced animateMotion indicator"""
+    y = time_to_point(path_length_table(path_d), times, duration)[:, 1]
+    return (y.max() - y) / (y.max() - y.min())
+
+
+def _normalize(values):
+    span = values.max() - values.min()
+    return (values - values.min()) / span if span > 0 else np.zeros_like(values)
+
+
+def sync_score(brightness, flux, fps=FPS):
+    """RMS error between the normalized timelines and the circular FFT cross-correlation lag (s)
+
+    A positive lag means the flares trail the indicator.
+    """
+    brightness, flux = _normalize(brightness), _normalize(flux)
+    error = float(np.sqrt(np.mean((brightness - flux) ** 2)))
+    a, b = brightness - brightness.mean(), flux - flux.mean()
+    correlation = np.fft.irfft(np.fft.rfft(a) * np.conj(np.fft.rfft(b)), n=len(a))
+    best = int(np.argmax(correlation))
+    # Parabolic refinement between frames
+    left, centre, right = correlation[best - 1], correlation[best], correlation[(best + 1) % len(a)]
+    curvature = left - 2 * centre + right
+    offset = 0.5 * (left - right) / curvature if curvature < 0 else 0.0
+    lag = (best + offset) % len(a)
+    if lag > len(a) / 2:
+        lag -= len(a)
+    return error, lag / fps
+
+
+def score_stylesheet(css, path_d, duration=6.0, fps=FPS):
+    """Simulate a stylesheet against a flux path: sync error, lag and unresolved animations"""
+    animations, keyframes = parse_stylesheet(css)
+    times, frames, missing = simulate(animations, keyframes, duration, fps)
+    if not frames:
+        names = ', '.join(name for _, name in missing) or 'none'
+        raise ValueError(f"no animated region has matching @keyframes (animations: {names})")
+    brightness = sum(frame['opacity'] for frame in frames.values())
+    error, lag = sync_score(brightness, indicator_flux(path_d, times, duration), fps)
+    return {'sync_error': error, 'lag': lag, 'frames': frames, 'times': times, 'missing': missing}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render the flare animation offline and score its sync with the flux curve")
+    parser.add_argument('--params', default=PARAMS_FILE)
+    parser.add_argument('--css', default=None, help="stylesheet to simulate (default: the blog page's <style>)")
+    parser.add_argument('--fps', type=float, default=FPS)
+    parser.add_argument('--max-sync-error', type=float, default=None, help="exit non-zero above this sync error")
+    args = parser.parse_args(argv)
+
+    params = load_params(args.params)
+    with open(params['blog_page']) as f:
+        page = f.read()
+    css = page
+    if args.css:
+        with open(args.css) as f:
+            css = f.read()
+
+    print("=== Frame Simulator ===\n")
+    started = time.perf_counter()
+    try:
+        result = score_stylesheet(css, flux_path(page), params['duration'], args.fps)
+    except ValueError as error:
+        print(f"FAIL: {error}")
+        return 1
+    elapsed = time.perf_counter() - started
+    print(f"{len(result['times'])} frames at {args.fps:g} fps, {len(result['frames'])} regions in {elapsed * 1000:.1f}ms")
+    for selector, name in result['missing']:
+        print(f"  WARNING: {selector} animates @keyframes {name}, which is not defined")
+    for selector, frame in sorted(result['frames'].items()):
+        peak = int(np.argmax(frame['opacity']))
+        print(f"  {selector}: opacity {frame['opacity'].min():.2f}-{frame['opacity'].max():.2f}, brightest at {result['times'][peak]:.3f}s")
+    print(f"\nSync error: {result['sync_error']:.4f}")
+    print(f"Lag: {result['lag'] * 1000:+.1f}ms ({'flares trail' if result['lag'] > 0 else 'flares lead'} the indicator)")
+    if args.max_sync_error is not None and result['sync_error'] > args.max_sync_error:
+        print(f"FAIL: sync error above {args.max_sync_error}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Keyframe Engine - Batched Flare Envelopes
+Opacity, scale and glow of any number of flare regions at all keyframes in one vectorized pass
+"""
+
+import numpy as np
+
+# One row per flare region; times are animation percentages
+REGION_DTYPE = np.dtype([
+    ('buildup_start', np.float64),
+    ('peak', np.float64),
+    ('decay_end', np.float64),
+    ('max_scale', np.float64),
+    ('max_glow', np.float64),
+    ('rise_exponent', np.float64),  # buildup follows progress ** rise_exponent
+    ('decay_rate', np.float64),     # decay follows exp(-decay_rate * progress)
+    ('floor', np.float64),          # resting opacity
+    ('glow_floor', np.float64),     # resting glow radius (px)
+])
+
+BASE_SCALE = 0.8  # resting scale shared by every region
+
+# Keyframe fractions of the buildup (start -> peak) and decay (peak -> end) windows
+CONTINUOUS_BUILDUP = (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)
+CONTINUOUS_DECAY = (0.1, 0.25, 0.45, 0.65, 0.85, 1.0)
+BLENDED_BUILDUP = (0.0, 0.15, 0.35, 0.60, 0.85, 1.0)
+BLENDED_DECAY = (0.20, 0.35, 0.55, 0.75, 0.90, 1.0)
+
+
+def region_array(regions, rise_exponent, decay_rate, floor, glow_floor):
+    """Structured region array from phase-script dicts; shape parameters apply to every region"""
+    table = np.zeros(len(regions), dtype=REGION_DTYPE)
+    for row, data in enumerate(regions):
+        table[row] = (
+            data['buildup_start'], data['peak_time'], data['decay_end'],
+            data['max_scale'], data['max_glow'],
+            rise_exponent, decay_rate, floor, glow_floor,
+        )
+    return table
+
+
+def keyframe_times(regions, buildup_fractions, decay_fractions):
+    """(regions, keyframes) animation percentages across each region's buildup and decay windows"""
+    start = regions['buildup_start'][:, None]
+    peak = regions['peak'][:, None]
+    end = regions['decay_end'][:, None]
+    buildup = start + (peak - start) * np.asarray(buildup_fractions, dtype=np.float64)
+    decay = peak + (end - peak) * np.asarray(decay_fractions, dtype=np.float64)
+    return np.concatenate([buildup, decay], axis=1)
+
+
+def brightness(regions, times):
+    """Envelope in [0, 1] at the given (regions, keyframes) times; 0 outside the flare window"""
+    times = np.asarray(times, dtype=np.float64)
+    start = regions['buildup_start'][:, None]
+    peak = regions['peak'][:, None]
+    end = regions['decay_end'][:, None]
+
+    rising = times <= peak
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rise_progress = np.clip((times - start) / (peak - start), 0.0, 1.0)
+        decay_progress = np.clip((times - peak) / (end - peak), 0.0, 1.0)
+    rise = rise_progress ** regions['rise_exponent'][:, None]
+    decay = np.exp(-regions['decay_rate'][:, None] * decay_progress)
+    factor = np.where(rising, rise, decay)
+    return np.where((times >= start) & (times <= end), factor, 0.0)
+
+
+def evaluate(regions, times):
+    """Opacity, scale and glow of every region at the given (regions, keyframes) times"""
+    times = np.broadcast_to(np.asarray(times, dtype=np.float64), (len(regions),) + np.shape(times)[-1:])
+    factor = brightness(regions, times)
+    floor = regions['floor'][:, None]
+    glow_floor = regions['glow_floor'][:, None]
+    return {
+        'time': times,
+        'opacity': floor + (1.0 - floor) * factor,
+        'scale': BASE_SCALE + (regions['max_scale'][:, None] - BASE_SCALE) * factor,
+        'glow': glow_floor + (regions['max_glow'][:, None] - glow_floor) * factor,
+    }
+
+
+def compute_keyframes(regions, buildup_fractions, decay_fractions):
+    """Dense keyframes for all regions: dict of (regions, keyframes) time/opacity/scale/glow arrays"""
+    return evaluate(regions, keyframe_times(regions, buildup_fractions, decay_fractions))
+
+
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(0)
+    n_regions = 10_000
+    regions = np.zeros(n_regions, dtype=REGION_DTYPE)
+    regions['buildup_start'] = rng.uniform(0, 60, n_regions)
+    regions['peak'] = regions['buildup_start'] + rng.uniform(2, 15, n_regions)
+    regions['decay_end'] = regions['peak'] + rng.uniform(5, 30, n_regions)
+    regions['max_scale'] = rng.uniform(1.5, 3.0, n_regions)
+    regions['max_glow'] = rng.uniform(15, 40, n_regions)
+    regions['rise_exponent'] = 1.3
+    regions['decay_rate'] = 1.8
+    regions['floor'] = 0.25
+    regions['glow_floor'] = 4
+
+    started = time.perf_counter()
+    keyframes = compute_keyframes(regions, BLENDED_BUILDUP, BLENDED_DECAY)
+    elapsed = time.perf_counter() - started
+    print("=== Keyframe Engine ===\n")
+    print(f"{n_regions} regions x {keyframes['time'].shape[1]} keyframes in {elapsed * 1000:.1f}ms")
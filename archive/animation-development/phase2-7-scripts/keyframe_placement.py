@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Keyframe Placement - Error-Bounded Adaptive Keyframes
+Place the fewest keyframes whose interpolation stays within an opacity/scale error of the
+analytic flare envelope, instead of fixed fractions of the buildup and decay windows
+"""
+
+import io
+
+import numpy as np
+
+from css_emitter import CSSEmitter, flare_declarations
+from keyframe_engine import BASE_SCALE, brightness, evaluate
+
+RESOLUTION = 0.1   # keyframe times are emitted with one decimal (percent)
+OVERSAMPLE = 8     # error checks per RESOLUTION step between candidate keyframes
+
+
+def brightness_tolerance(region, max_opacity_error, max_scale_error):
+    """Largest envelope error that keeps both opacity and scale within their bounds"""
+    # Opacity and scale are affine in the envelope, so their errors scale with it
+    opacity_span = 1.0 - region['floor']
+    scale_span = abs(region['max_scale'] - BASE_SCALE)
+    limits = [max_opacity_error / opacity_span if opacity_span > 0 else np.inf,
+              max_scale_error / scale_span if scale_span > 0 else np.inf]
+    return float(min(limits))
+
+
+def interval_error(times, values, a, b, easing=None):
+    """Max deviation between the curve and the keyframe interpolation from fine index a to b"""
+    x = times[a:b + 1]
+    progress = (x - times[a]) / (times[b] - times[a])
+    if easing is not None:
+        # CSS applies animation-timing-function between every pair of keyframes
+        progress = easing(progress)
+    interpolated = values[a] + (values[b] - values[a]) * progress
+    return float(np.abs(interpolated - values[a:b + 1]).max())
+
+
+def _farthest_reach(times, values, a, last, tolerance, easing):
+    """Largest candidate index b <= last with the interval a..b within tolerance (binary search)"""
+    if interval_error(times, values, a * OVERSAMPLE, last * OVERSAMPLE, easing) <= tolerance:
+        return last
+    # One step is always taken, even if a single RESOLUTION interval is out of tolerance
+    lo, hi = a + 1, last
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if interval_error(times, values, a * OVERSAMPLE, mid * OVERSAMPLE, easing) <= tolerance:
+            lo = mid
+        else:
+            hi = mid
+    return lo
+
+
+def place_keyframes(region, max_opacity_error=0.02, max_scale_error=0.02, easing=None, resolution=RESOLUTION):
+    """Minimal keyframe times (percent) for one region row, plus the envelope values there
+
+    The peak and the window ends are always keyframes; between them both envelope pieces
+    are monotone and convex, so greedily taking the farthest reachable keyframe is optimal.
+    """
+    tolerance = brightness_tolerance(region, max_opacity_error, max_scale_error)
+    table = np.asarray(region).reshape(1)
+    start, peak, end = (round(float(region[key]) / resolution) for key in ('buildup_start', 'peak', 'decay_end'))
+
+    knots = [start]
+    for lo, hi in ((start, peak), (peak, end)):
+        steps = hi - lo
+        if steps <= 0:
+            continue
+        fine = (lo + np.arange(steps * OVERSAMPLE + 1) / OVERSAMPLE) * resolution
+        values = brightness(table, fine[None])[0]
+        a = 0
+        while a < steps:
+            a = _farthest_reach(fine, values, a, steps, tolerance, easing)
+            knots.append(lo + a)
+
+    times = np.array(knots, dtype=np.float64) * resolution
+    keyframes = evaluate(table, times[None])
+    return {key: values[0] for key, values in keyframes.items()}
+
+
+def keyframe_error(region, times, easing=None, samples=4000):
+    """Max opacity and scale error of interpolating the envelope through the given keyframe times"""
+    table = np.asarray(region).reshape(1)
+    times = np.sort(np.asarray(times, dtype=np.float64))
+    fine = np.linspace(times[0], times[-1], samples)
+    exact = brightness(table, fine[None])[0]
+    knot_values = brightness(table, times[None])[0]
+
+    interval = np.clip(np.searchsorted(times, fine, side='right') - 1, 0, len(times) - 2)
+    progress = (fine - times[interval]) / (times[interval + 1] - times[interval])
+    if easing is not None:
+        progress = easing(progress)
+    interpolated = knot_values[interval] + (knot_values[interval + 1] - knot_values[interval]) * progress
+    worst = float(np.abs(interpolated - exact).max())
+    return worst * (1.0 - float(region['floor'])), worst * abs(float(region['max_scale']) - BASE_SCALE)
+
+
+def keyframe_css(keyframes, name='flare', minify=False):
+    """The @keyframes block the phase scripts emit for these keyframes"""
+    def frames():
+        for time_percent, scale, opacity, glow in zip(keyframes['time'], keyframes['scale'], keyframes['opacity'], keyframes['glow']):
+            yield [f"{time_percent:.1f}%"], flare_declarations(f"{scale:.2f}", f"{opacity:.2f}", f"{glow:.0f}", f"{opacity:.2f}")
+
+    buffer = io.StringIO()
+    CSSEmitter(buffer, minify=minify).keyframes(name, frames())
+    return buffer.getvalue()
+
+
+def placement_report(regions, names, fixed_keyframes, minify=False, **tolerances):
+    """Per-region keyframe counts, errors and CSS bytes: fixed fractions vs adaptive placement"""
+    rows = []
+    for row, name in enumerate(names):
+        fixed = {key: values[row] for key, values in fixed_keyframes.items()}
+        adaptive = place_keyframes(regions[row], **tolerances)
+        fixed_bytes = len(keyframe_css(fixed, minify=minify).encode())
+        adaptive_bytes = len(keyframe_css(adaptive, minify=minify).encode())
+        rows.append({
+            'region': name,
+            'fixed_keyframes': len(fixed['time']),
+            'adaptive_keyframes': len(adaptive['time']),
+            'fixed_error': keyframe_error(regions[row], fixed['time']),
+            'adaptive_error': keyframe_error(regions[row], adaptive['time']),
+            'fixed_bytes': fixed_bytes,
+            'adaptive_bytes': adaptive_bytes,
+            'saved_bytes': fixed_bytes - adaptive_bytes,
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    from keyframe_engine import BLENDED_BUILDUP, BLENDED_DECAY, compute_keyframes, region_array
+
+    # Phase 7 blended regions
+    names = ['region_1', 'region_3', 'region_2']
+    regions = region_array([
+        {'buildup_start': 17.2, 'peak_time': 25.2, 'decay_end': 42.0, 'max_scale': 2.2, 'max_glow': 25},
+        {'buildup_start': 22.2, 'peak_time': 30.2, 'decay_end': 58.0, 'max_scale': 2.0, 'max_glow': 22},
+        {'buildup_start': 53.0, 'peak_time': 66.7, 'decay_end': 82.2, 'max_scale': 2.8, 'max_glow': 35},
+    ], rise_exponent=1.3, decay_rate=1.8, floor=0.25, glow_floor=4)
+    fixed = compute_keyframes(regions, BLENDED_BUILDUP, BLENDED_DECAY)
+
+    print("=== Adaptive Keyframe Placement (max opacity/scale error 0.02) ===\n")
+    print(f"{'region':>10} {'keyframes':>10} {'opacity err':>16} {'scale err':>16} {'bytes':>14} {'saved':>6}")
+    for entry in placement_report(regions, names, fixed):
+        pair = lambda before, after, spec: f"{before:{spec}} -> {after:{spec}}"
+        print(f"{entry['region']:>10} {pair(entry['fixed_keyframes'], entry['adaptive_keyframes'], '>3'):>10} "
+              f"{pair(entry['fixed_error'][0], entry['adaptive_error'][0], '.4f'):>16} "
+              f"{pair(entry['fixed_error'][1], entry['adaptive_error'][1], '.4f'):>16} "
+              f"{pair(entry['fixed_bytes'], entry['adaptive_bytes'], '>5'):>14} {entry['saved_bytes']:>6}")
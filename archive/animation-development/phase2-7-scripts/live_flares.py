@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Live Flares - Online Flare Detection Driving the Solar-Disk Regions
+Detect flare start, peak and decay end one flux sample at a time in O(1), with the prominence
+semantics of find_peaks and a provisional peak when confirmation is slow, and replay a recorded
+GOES XRS file at accelerated speed to measure it
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from collections import namedtuple
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'phase1-analysis'))
+
+from pipeline import PARAMS_FILE, load_params
+from xrs_ingest import (CHUNK_ROWS, FLUX_RANGE, SVG_FRAME, flare_class, flux_to_svg_y, iter_chunks, series_span,
+                        synthetic_storm)
+
+MIN_PROMINENCE = 8.0   # SVG units above the curve baseline, as find_peaks uses on the blog curve
+DECAY_FRACTION = 0.5   # NOAA convention: a flare ends halfway back down to its pre-flare level
+ONSET_FRACTION = 0.25  # a flare starts when it last left this fraction of min_prominence above its minimum
+MAX_LATENCY = 60.0     # seconds a rising flare's maximum must hold before it is reported provisionally
+EVENT_KINDS = ('start', 'provisional', 'peak', 'decay_end')
+
+# kind is one of EVENT_KINDS; time/value locate the event in the stream and confirmed is the
+# time of the sample that revealed it (confirmed - time is the latency)
+FlareEvent = namedtuple('FlareEvent', ['kind', 'flare', 'time', 'value', 'confirmed'])
+
+
+class OnlineFlareDetector:
+    """Flare events from a stream of (time, height) samples, O(1) work and state per sample
+
+    A peak is reported once the signal has fallen min_prominence below it before exceeding it,
+    and its flare start once the signal has risen min_prominence above the preceding minimum.
+    Together these are exactly the peaks detect_peaks(window=0) keeps at that min_prominence,
+    each reported as soon as a drop of min_prominence confirms it.
+
+    A slow decay can take an hour to confirm a peak, so a started flare's running maximum is
+    also reported as a 'provisional' peak once max_latency seconds pass without a new maximum
+    (None disables this). A later, higher maximum gets its own provisional event; the 'peak'
+    events are unaffected.
+    """
+
+    def __init__(self, min_prominence=MIN_PROMINENCE, decay_fraction=DECAY_FRACTION, onset_fraction=ONSET_FRACTION,
+                 max_latency=MAX_LATENCY):
+        self.min_prominence = min_prominence
+        self.decay_fraction = decay_fraction
+        self.onset_level = onset_fraction * min_prominence
+        self.max_latency = max_latency
+        self.flares = 0
+        self.samples = 0
+        self._rising = False        # looking for a peak (after a start) or for the next minimum
+        self._extreme = None        # running maximum while rising, running minimum otherwise
+        self._extreme_time = None
+        self._onset_time = None     # last time the signal was near the running minimum
+        self._ties = []             # later, separate samples equal to the running maximum
+        self._provisional = False   # running maximum already reported provisionally
+        self._previous = None
+        self._base = None           # minimum the current flare rose from
+        self._decay_level = None    # pending decay end of the last peak
+
+    def update(self, time, value):
+        """Feed one sample; returns the events it confirms (usually none)"""
+        self.samples += 1
+        previous, self._previous = self._previous, value
+        if self._extreme is None:
+            self._extreme, self._extreme_time, self._onset_time = value, time, time
+            return []
+
+        events = []
+        if self._rising:
+            if value > self._extreme:
+                self._extreme, self._extreme_time, self._ties = value, time, []
+                self._provisional = False
+            elif value == self._extreme and previous != value:
+                # An equal maximum after a shallow dip is a peak of its own, as in detect_peaks
+                self._ties.append(time)
+            elif self._extreme - value >= self.min_prominence:
+                for peak_time in [self._extreme_time] + self._ties:
+                    events.append(FlareEvent('peak', self.flares, peak_time, self._extreme, time))
+                self._decay_level = self._base + self.decay_fraction * (self._extreme - self._base)
+                self._rising = False
+                self._extreme, self._extreme_time, self._onset_time = value, time, time
+            elif (not self._provisional and self.max_latency is not None
+                  and time - self._extreme_time >= self.max_latency):
+                events.append(FlareEvent('provisional', self.flares, self._extreme_time, self._extreme, time))
+                self._provisional = True
+        elif value < self._extreme:
+            self._extreme, self._extreme_time, self._onset_time = value, time, time
+        elif value - self._extreme <= self.onset_level:
+            self._onset_time = time
+        elif value - self._extreme >= self.min_prominence:
+            if self._decay_level is not None:
+                # The next flare began before this one had decayed: it ends at the minimum between
+                events.append(FlareEvent('decay_end', self.flares, self._extreme_time, self._extreme, time))
+                self._decay_level = None
+            self.flares += 1
+            events.append(FlareEvent('start', self.flares, self._onset_time, self._extreme, time))
+            self._base = self._extreme
+            self._rising = True
+            self._extreme, self._extreme_time, self._ties = value, time, []
+            self._provisional = False
+
+        if self._decay_level is not None and not self._rising and value <= self._decay_level:
+            events.append(FlareEvent('decay_end', self.flares, time, value, time))
+            self._decay_level = None
+        return events
+
+
+def flux_height(flux, frame=SVG_FRAME):
+    """Height of log flux above the curve baseline in SVG units (the find_peaks signal)"""
+    return frame['y_base'] - flux_to_svg_y(flux, frame)
+
+
+def height_flux(height, frame=SVG_FRAME, flux_range=FLUX_RANGE):
+    """Flux in W/m^2 of a height above the curve baseline (inverse of flux_height)"""
+    low, high = np.log10(flux_range[0]), np.log10(flux_range[1])
+    return 10 ** (low + (high - low) * height / (frame['y_base'] - frame['y_top']))
+
+
+def region_for(flare, region_ids):
+    """Region a flare drives: regions take turns in parameter order"""
+    return region_ids[(flare - 1) % len(region_ids)]
+
+
+def replay(path, detector, speed=0.0, chunk_rows=CHUNK_ROWS, on_event=None):
+    """Feed a recorded flux file to the detector, paced at speed x real time (0: as fast as possible)
+
+    Returns the events, the worst latency of each event kind and the throughput; fill values
+    and missing samples are skipped as in ingest.
+    """
+    events = []
+    lag = 0.0
+    started = time.perf_counter()
+    first = None
+    for times, flux in iter_chunks(path, chunk_rows):
+        valid = np.isfinite(flux) & (flux > 0) & np.isfinite(times)
+        times, heights = times[valid], flux_height(flux[valid])
+        update = detector.update
+        for sample_time, height in zip(times.tolist(), heights.tolist()):
+            if speed:
+                if first is None:
+                    first = sample_time
+                wait = (sample_time - first) / speed - (time.perf_counter() - started)
+                if wait > 0:
+                    time.sleep(wait)
+                else:
+                    lag = max(lag, -wait)
+            found = update(sample_time, height)
+            if found:
+                events.extend(found)
+                if on_event is not None:
+                    for event in found:
+                        on_event(event)
+    elapsed = time.perf_counter() - started
+    latency = {kind: max((event.confirmed - event.time for event in events if event.kind == kind), default=None)
+               for kind in EVENT_KINDS}
+    return {
+        'events': events,
+        'latency': latency,
+        'samples': detector.samples,
+        'elapsed': elapsed,
+        'rate': detector.samples / max(elapsed, 1e-9),
+        'max_lag': lag,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a recorded GOES XRS file through the online flare detector")
+    parser.add_argument('path', nargs='?', help="CSV (time_tag, flux) or .npy recording; default: synthetic storm")
+    parser.add_argument('--rows', type=int, default=1_000_000, help="rows of the synthetic recording")
+    parser.add_argument('--speed', type=float, default=0.0, help="replay speed-up over real time (0: unpaced)")
+    parser.add_argument('--min-prominence', type=float, default=MIN_PROMINENCE)
+    parser.add_argument('--max-latency', type=float, default=MAX_LATENCY,
+                        help="seconds without a new maximum before a provisional peak (0: confirmed peaks only)")
+    parser.add_argument('--params', default=PARAMS_FILE)
+    args = parser.parse_args(argv)
+
+    # A synthetic recording lives in a scratch directory removed on exit
+    with tempfile.TemporaryDirectory() as scratch:
+        path = args.path
+        if path is None:
+            path = os.path.join(scratch, 'xrs_recording.npy')
+            synthetic_storm(path, args.rows)
+        region_ids = list(load_params(args.params)['regions'])
+        first_time = series_span(path)[0]
+
+        def show(event):
+            print(f"  +{(event.time - first_time) / 3600:6.2f}h {event.kind:<11} flare {event.flare} -> "
+                  f"{region_for(event.flare, region_ids):<9} {flare_class(height_flux(event.value)):>6}  latency {event.confirmed - event.time:6.0f}s")
+
+        print("=== Live Flares ===\n")
+        detector = OnlineFlareDetector(args.min_prominence, max_latency=args.max_latency or None)
+        result = replay(path, detector, args.speed, on_event=show)
+    print(f"\n{result['samples']} samples in {result['elapsed']:.2f}s: {result['rate'] / 1e6:.2f}M samples/s, "
+          f"{len(result['events'])} events" + (f", max lag {result['max_lag'] * 1000:.1f}ms" if args.speed else ""))
+    worst = ', '.join(f"{kind} {seconds:.0f}s" for kind, seconds in result['latency'].items() if seconds is not None)
+    print(f"Worst-case latency: {worst}")
+
+
+if __name__ == "__main__":
+    main()
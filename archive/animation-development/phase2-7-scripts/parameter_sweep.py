@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Parameter Sweep - Blending Shape Search Across All Cores
+Score grid, random or Latin-hypercube designs of rise/decay shapes, floors and region windows on
+sync error against the flux curve, overlap coverage and CSS size, streaming results to columns
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'phase1-analysis'))
+
+from frame_simulator import indicator_flux
+from keyframe_engine import REGION_DTYPE, brightness
+from keyframe_placement import keyframe_css, place_keyframes
+from pipeline import PARAMS_FILE, flux_path, flux_timings, load_params, region_peaks
+
+TIME_SAMPLES = 601   # animation percent grid for the sync/coverage scores
+CHUNK_SIZE = 256     # candidates per worker task
+GLOW_FLOOR = 4
+
+SHAPE_SPACE = {
+    'rise_exponent': (1.0, 2.5),
+    'decay_rate': (0.5, 4.0),
+    'floor': (0.1, 0.4),
+}
+LEAD_RANGE = (2.0, 20.0)   # buildup_start = peak - lead (percent)
+TAIL_RANGE = (5.0, 35.0)   # decay_end = peak + tail (percent)
+
+SCORE_COLUMNS = ('sync_error', 'coverage', 'overlap', 'css_bytes')
+
+
+def build_space(params):
+    """Swept parameter ranges: envelope shape plus every region's blended lead and tail"""
+    space = dict(SHAPE_SPACE)
+    for region_id in params['regions']:
+        space[f'{region_id}_lead'] = LEAD_RANGE
+        space[f'{region_id}_tail'] = TAIL_RANGE
+    return space
+
+
+def build_context(params, page):
+    """Everything a worker needs to score candidates, computed once from the flux curve"""
+    timings = flux_timings(flux_path(page), params['duration'])
+    peaks = region_peaks(timings, params['first_peak'])
+    times = np.linspace(0.0, 100.0, TIME_SAMPLES)
+
+    # Target: normalized flux under the indicator at each animation percent
+    flux = indicator_flux(flux_path(page), times / 100 * params['duration'], params['duration'])
+
+    regions = params['regions']
+    return {
+        'times': times,
+        'flux': flux,
+        'region_ids': list(regions),
+        'peaks': np.array([peaks[region['source']] for region in regions.values()]),
+        'max_scale': np.array([region['max_scale'] for region in regions.values()]),
+        'max_glow': np.array([region['max_glow'] for region in regions.values()]),
+    }
+
+
+def candidate_regions(candidates, names, context):
+    """(candidates, regions) structured region array for a block of parameter rows"""
+    column = {name: candidates[:, j] for j, name in enumerate(names)}
+    regions = np.zeros((len(candidates), len(context['region_ids'])), dtype=REGION_DTYPE)
+    for r, region_id in enumerate(context['region_ids']):
+        peak = context['peaks'][r]
+        regions['buildup_start'][:, r] = peak - column[f'{region_id}_lead']
+        regions['peak'][:, r] = peak
+        regions['decay_end'][:, r] = peak + column[f'{region_id}_tail']
+        regions['max_scale'][:, r] = context['max_scale'][r]
+        regions['max_glow'][:, r] = context['max_glow'][r]
+    regions['rise_exponent'] = column['rise_exponent'][:, None]
+    regions['decay_rate'] = column['decay_rate'][:, None]
+    regions['floor'] = column['floor'][:, None]
+    regions['glow_floor'] = GLOW_FLOOR
+    return regions
+
+
+def evaluate_candidates(candidates, names, context, css=True):
+    """Score columns for a block of candidates; envelopes for the whole block in one pass"""
+    regions = candidate_regions(candidates, names, context)
+    n_candidates, n_regions = regions.shape
+    times = context['times']
+    flat = regions.ravel()
+    envelope = brightness(flat, np.broadcast_to(times, (len(flat), len(times)))).reshape(n_candidates, n_regions, -1)
+
+    # Sync: the regions' combined light, normalized, against the normalized flux curve
+    light = envelope.sum(axis=1)
+    low = light.min(axis=1, keepdims=True)
+    span = np.maximum(light.max(axis=1, keepdims=True) - low, 1e-12)
+    sync_error = np.sqrt(np.mean(((light - low) / span - context['flux']) ** 2, axis=1))
+
+    active = ((times >= regions['buildup_start'][..., None]) & (times <= regions['decay_end'][..., None])).sum(axis=1)
+    scores = {
+        'sync_error': sync_error,
+        'coverage': (active >= 1).mean(axis=1),
+        'overlap': (active >= 2).mean(axis=1),
+        'css_bytes': np.zeros(n_candidates),
+    }
+    if css:
+        # Minified size of the error-bounded keyframes each candidate would emit
+        for i, region in enumerate(flat):
+            scores['css_bytes'][i // n_regions] += len(keyframe_css(place_keyframes(region), minify=True))
+    return scores
+
+
+def design_block(design, space, start, stop, n_total, seed=0, levels=None, permutations=None):
+    """Candidate rows start..stop of a grid, random or Latin-hypercube design"""
+    low = np.array([bounds[0] for bounds in space.values()])
+    high = np.array([bounds[1] for bounds in space.values()])
+    rows = np.arange(start, stop)
+    if design == 'grid':
+        steps = np.array(np.unravel_index(rows, (levels,) * len(space))).T
+        unit = steps / max(levels - 1, 1)
+    elif design == 'random':
+        unit = np.random.default_rng([seed, start]).random((len(rows), len(space)))
+    elif design == 'lhs':
+        # One stratum per candidate and dimension, jittered within the stratum
+        jitter = np.random.default_rng([seed, start]).random((len(rows), len(space)))
+        unit = (permutations[:, rows].T + jitter) / n_total
+    else:
+        raise ValueError(f"unknown design {design!r}")
+    return low + (high - low) * unit
+
+
+class ColumnWriter:
+    """Appends result blocks to one raw float64 file per column, plus a JSON schema"""
+
+    def __init__(self, directory, columns):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.columns = list(columns)
+        self.rows = 0
+        self._files = {name: open(os.path.join(directory, f'{name}.f8'), 'wb') for name in self.columns}
+
+    def append(self, block):
+        for name in self.columns:
+            np.ascontiguousarray(block[name], dtype='<f8').tofile(self._files[name])
+        self.rows += len(block[self.columns[0]])
+
+    def close(self):
+        for f in self._files.values():
+            f.close()
+        with open(os.path.join(self.directory, 'schema.json'), 'w') as f:
+            json.dump({'columns': self.columns, 'dtype': '<f8', 'rows': self.rows}, f, indent=4)
+
+
+def read_columns(directory):
+    """Memory-mapped columns of a finished sweep"""
+    with open(os.path.join(directory, 'schema.json')) as f:
+        schema = json.load(f)
+    return {
+        name: np.memmap(os.path.join(directory, f'{name}.f8'), dtype=schema['dtype'], mode='r', shape=(schema['rows'],))
+        for name in schema['columns']
+    }
+
+
+_context = None
+
+
+def _init_worker(context):
+    global _context
+    _context = context
+
+
+def _evaluate_task(start, candidates, names, css):
+    scores = evaluate_candidates(candidates, names, _context, css)
+    return start, candidates, scores
+
+
+def run_sweep(params, page, out_dir, design='lhs', samples=10_000, levels=3, workers=None, seed=0, css=True):
+    """Evaluate the design on a process pool, keeping at most a few chunks in flight"""
+    space = build_space(params)
+    names = list(space)
+    context = build_context(params, page)
+    n_total = levels ** len(names) if design == 'grid' else samples
+    permutations = None
+    if design == 'lhs':
+        rng = np.random.default_rng(seed)
+        permutations = np.stack([rng.permutation(n_total).astype(np.int32) for _ in names])
+
+    writer = ColumnWriter(out_dir, ('candidate',) + tuple(names) + SCORE_COLUMNS)
+    workers = workers or os.cpu_count()
+    max_pending = 2 * workers
+    chunks = ((start, min(start + CHUNK_SIZE, n_total)) for start in range(0, n_total, CHUNK_SIZE))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(context,)) as pool:
+        pending = set()
+        for start, stop in chunks:
+            block = design_block(design, space, start, stop, n_total, seed, levels, permutations)
+            pending.add(pool.submit(_evaluate_task, start, block, names, css))
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    _write_result(writer, names, *future.result())
+        for future in pending:
+            _write_result(writer, names, *future.result())
+    writer.close()
+    return writer.rows
+
+
+def _write_result(writer, names, start, candidates, scores):
+    block = {'candidate': np.arange(start, start + len(candidates))}
+    block.update({name: candidates[:, j] for j, name in enumerate(names)})
+    block.update(scores)
+    writer.append(block)
+
+
+def baseline_candidate(params):
+    """The hand-tuned phase 7 shape and windows as one candidate row"""
+    row = {'rise_exponent': 1.3, 'decay_rate': 1.8, 'floor': 0.25}
+    for region_id, region in params['regions'].items():
+        row[f'{region_id}_lead'] = region['blended']['lead']
+        row[f'{region_id}_tail'] = region['blended']['tail']
+    return row
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep blending shapes and windows across all cores")
+    parser.add_argument('--params', default=PARAMS_FILE)
+    parser.add_argument('--design', choices=('grid', 'random', 'lhs'), default='lhs')
+    parser.add_argument('--samples', type=int, default=10_000, help="candidates for random/lhs designs")
+    parser.add_argument('--levels', type=int, default=3, help="levels per dimension for the grid design")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-css', action='store_true', help="skip the (slowest) CSS size score")
+    parser.add_argument('--out', default='sweep_results')
+    args = parser.parse_args(argv)
+
+    params = load_params(args.params)
+    with open(params['blog_page']) as f:
+        page = f.read()
+
+    print("=== Blending Parameter Sweep ===\n")
+    css = not args.no_css
+    started = time.perf_counter()
+    rows = run_sweep(params, page, args.out, args.design, args.samples, args.levels, args.workers, args.seed, css)
+    elapsed = time.perf_counter() - started
+    print(f"{rows} {args.design} candidates in {elapsed:.1f}s ({rows / elapsed:.0f}/s) -> {args.out}/")
+
+    space = build_space(params)
+    baseline = baseline_candidate(params)
+    base_scores = evaluate_candidates(np.array([[baseline[name] for name in space]]), list(space),
+                                      build_context(params, page), css)
+    css_bytes = lambda scores, row: f", css {scores['css_bytes'][row]:.0f} B" if css else ""
+    print(f"\nHand-tuned phase 7: sync {base_scores['sync_error'][0]:.4f}, coverage {base_scores['coverage'][0]:.2f}, "
+          f"overlap {base_scores['overlap'][0]:.2f}{css_bytes(base_scores, 0)}")
+
+    columns = read_columns(args.out)
+    best = np.argsort(columns['sync_error'])[:5]
+    print("\nBest sync error:")
+    for row in best:
+        shape = ', '.join(f"{name}={columns[name][row]:.2f}" for name in SHAPE_SPACE)
+        print(f"  #{int(columns['candidate'][row])}: sync {columns['sync_error'][row]:.4f}, coverage {columns['coverage'][row]:.2f}, "
+              f"overlap {columns['overlap'][row]:.2f}{css_bytes(columns, row)} ({shape})")
+
+
+if __name__ == "__main__":
+    main()
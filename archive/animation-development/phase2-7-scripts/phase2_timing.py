@@ -4,24 +4,37 @@ Phase 2: Calculate Precise Timing for CSS Animation Implementation
 Convert SVG path analysis into CSS keyframe percentages and animation delays
 """
 
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'phase1-analysis'))
+
+from analyze_svg_path import flux_event_timings, read_flux_path
+
+REGION_PLACEMENTS = {1: "top: 30%; left: 20%;", 2: "top: 60%; right: 25%;", 3: "bottom: 35%; left: 40%;"}
+# scale, opacity, glow radius (px) and glow alpha at each event's brightest keyframe
+PEAK_STYLES = {'peak_1': (2.2, 1, 25, 1), 'valley': (1.8, 0.8, 18, 0.9), 'peak_2': (2.5, 1, 30, 1)}
+EVENT_LABELS = {'peak_1': "Peak 1", 'valley': "Valley/Shoulder", 'peak_2': "Peak 2"}
+
 def calculate_css_timing():
     """Calculate precise CSS animation timing based on Phase 1 results"""
     print("=== Phase 2: Precise CSS Timing Calculation ===\n")
     
-    # Results from Phase 1 analysis
+    # Results from Phase 1 analysis (arc-length timings, cached per path)
     animation_duration = 6.0  # seconds
+    timings = flux_event_timings(read_flux_path(), animation_duration)
     
     peaks = {
-        'peak_1': {'time': 1.61, 'path_percent': 26.8, 'region': 1},
-        'peak_2': {'time': 4.00, 'path_percent': 66.7, 'region': 2},
-        'valley': {'time': 2.67, 'path_percent': 44.4, 'region': 3}
+        'peak_1': {'time': timings['peak_times'][0], 'path_percent': timings['peak_percentages'][0], 'region': 1},
+        'peak_2': {'time': timings['peak_times'][1], 'path_percent': timings['peak_percentages'][1], 'region': 2},
+        'valley': {'time': timings['valley_time'], 'path_percent': timings['valley_percentage'], 'region': 3}
     }
     
     print("Current Animation Analysis:")
     print(f"Total Duration: {animation_duration}s")
-    print(f"Peak 1 occurs at: {peaks['peak_1']['time']}s ({peaks['peak_1']['path_percent']}%)")
-    print(f"Valley occurs at: {peaks['valley']['time']}s ({peaks['valley']['path_percent']}%)")
-    print(f"Peak 2 occurs at: {peaks['peak_2']['time']}s ({peaks['peak_2']['path_percent']}%)")
+    print(f"Peak 1 occurs at: {peaks['peak_1']['time']:.2f}s ({peaks['peak_1']['path_percent']:.1f}%)")
+    print(f"Valley occurs at: {peaks['valley']['time']:.2f}s ({peaks['valley']['path_percent']:.1f}%)")
+    print(f"Peak 2 occurs at: {peaks['peak_2']['time']:.2f}s ({peaks['peak_2']['path_percent']:.1f}%)")
     
     print("\n=== CSS IMPLEMENTATION PLAN ===")
     
@@ -68,83 +81,45 @@ def calculate_css_timing():
         print(f"    box-shadow: 0 0 5px rgba(255, 255, 255, 0.4);")
         print(f"  }}")
         print(f"  Animation delay: 0s (timing built into keyframes)")
+        data['keyframes'] = (buildup_percent, peak_percent, fade_percent)
     
     # Generate complete CSS code
     print("\n=== COMPLETE CSS CODE ===")
     
-    css_code = """
-/* Region-specific animations with precise timing */
-.region-1 { 
-    top: 30%; left: 20%; 
-    animation: flare-region-1 6s ease-in-out infinite;
-}
-
-.region-2 { 
-    top: 60%; right: 25%; 
-    animation: flare-region-2 6s ease-in-out infinite;
-}
-
-.region-3 { 
-    bottom: 35%; left: 40%; 
-    animation: flare-region-3 6s ease-in-out infinite;
-}
-
-/* Peak 1 animation (Region 1) - triggers at 1.61s */
-@keyframes flare-region-1 {
-    0%, 21.8% {
-        transform: scale(0.8);
-        opacity: 0.3;
-        box-shadow: 0 0 5px rgba(255, 255, 255, 0.4);
-    }
-    26.8% {
-        transform: scale(2.2);
-        opacity: 1;
-        box-shadow: 0 0 25px rgba(255, 255, 255, 1);
-    }
-    35.2%, 100% {
-        transform: scale(0.8);
-        opacity: 0.3;
-        box-shadow: 0 0 5px rgba(255, 255, 255, 0.4);
-    }
-}
-
-/* Valley/Shoulder animation (Region 3) - triggers at 2.67s */
-@keyframes flare-region-3 {
-    0%, 39.4% {
-        transform: scale(0.8);
-        opacity: 0.3;
-        box-shadow: 0 0 5px rgba(255, 255, 255, 0.4);
-    }
-    44.4% {
-        transform: scale(1.8);
-        opacity: 0.8;
-        box-shadow: 0 0 18px rgba(255, 255, 255, 0.9);
-    }
-    52.8%, 100% {
-        transform: scale(0.8);
-        opacity: 0.3;
-        box-shadow: 0 0 5px rgba(255, 255, 255, 0.4);
-    }
-}
-
-/* Peak 2 animation (Region 2) - triggers at 4.00s */
-@keyframes flare-region-2 {
-    0%, 61.7% {
+    css_code = "\n/* Region-specific animations with precise timing */"
+    for region, placement in sorted(REGION_PLACEMENTS.items()):
+        css_code += f"""
+.region-{region} {{ 
+    {placement} 
+    animation: flare-region-{region} {animation_duration:g}s ease-in-out infinite;
+}}
+"""
+    
+    for event_name, data in sorted(peaks.items(), key=lambda item: item[1]['time']):
+        region = data['region']
+        buildup_percent, peak_percent, fade_percent = data['keyframes']
+        scale, opacity, glow, glow_alpha = PEAK_STYLES[event_name]
+        css_code += f"""
+/* {EVENT_LABELS[event_name]} animation (Region {region}) - triggers at {data['time']:.2f}s */
+@keyframes flare-region-{region} {{
+    0%, {buildup_percent:.1f}% {{
         transform: scale(0.8);
         opacity: 0.3;
         box-shadow: 0 0 5px rgba(255, 255, 255, 0.4);
-    }
-    66.7% {
-        transform: scale(2.5);
-        opacity: 1;
-        box-shadow: 0 0 30px rgba(255, 255, 255, 1);
-    }
-    75.0%, 100% {
+    }}
+    {peak_percent:.1f}% {{
+        transform: scale({scale});
+        opacity: {opacity};
+        box-shadow: 0 0 {glow}px rgba(255, 255, 255, {glow_alpha});
+    }}
+    {fade_percent:.1f}%, 100% {{
         transform: scale(0.8);
         opacity: 0.3;
         box-shadow: 0 0 5px rgba(255, 255, 255, 0.4);
-    }
-}"""
+    }}
+}}
+"""
+    css_code = css_code.rstrip("\n")
     
     print(css_code)
     
@@ -153,9 +128,9 @@ def calculate_css_timing():
     print("2. Load http://localhost:8000/blog/alexis-etl-pipeline.html")
     print("3. Watch the white indicator move along the curve")
     print("4. Verify timing:")
-    print("   - At ~1.6s: Region 1 (top-left) should brighten")
-    print("   - At ~2.7s: Region 3 (bottom-left) should glow moderately") 
-    print("   - At ~4.0s: Region 2 (right side) should flare brightest")
+    print(f"   - At ~{peaks['peak_1']['time']:.1f}s: Region 1 (top-left) should brighten")
+    print(f"   - At ~{peaks['valley']['time']:.1f}s: Region 3 (bottom-left) should glow moderately") 
+    print(f"   - At ~{peaks['peak_2']['time']:.1f}s: Region 2 (right side) should flare brightest")
     print("5. Check that flares are synchronized with curve peaks")
     
     return css_code
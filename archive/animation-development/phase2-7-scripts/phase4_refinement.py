@@ -4,36 +4,43 @@ Phase 4: Fine-tuning - Multi-region First Peak
 Divide first Gaussian into two overlapping regions, keep second peak as single region
 """
 
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'phase1-analysis'))
+
+from analyze_svg_path import flux_event_timings, read_flux_path
+
 def calculate_refined_timing():
     """Calculate refined timing for realistic multi-region first peak"""
     print("=== Phase 4: Fine-Tuning Multi-Region Animation ===\n")
     
-    # Original timing from Phase 2
-    first_peak_time = 1.61  # 26.8%
-    valley_time = 2.67      # 44.4% 
-    second_peak_time = 4.00 # 66.7%
+    # Timing from Phase 1/2 (arc-length timings, cached per path)
     animation_duration = 6.0
+    timings = flux_event_timings(read_flux_path(), animation_duration)
+    first_peak_time, second_peak_time = timings['peak_times'][:2]
+    valley_time = timings['valley_time']
     
     print("New Animation Strategy:")
-    print("- First Gaussian (1.61s): Two overlapping regions (1 + 3)")
-    print("- Valley (2.67s): Keep region 3 dim after first peak")
-    print("- Second Gaussian (4.00s): Single bright region (2)")
+    print(f"- First Gaussian ({first_peak_time:.2f}s): Two overlapping regions (1 + 3)")
+    print(f"- Valley ({valley_time:.2f}s): Keep region 3 dim after first peak")
+    print(f"- Second Gaussian ({second_peak_time:.2f}s): Single bright region (2)")
     
     # Calculate first peak subdivision
-    peak1_start = first_peak_time - 0.4  # 1.21s
-    peak1_end = first_peak_time + 0.5    # 2.11s
+    peak1_start = first_peak_time - 0.4
+    peak1_end = first_peak_time + 0.5
     peak1_duration = peak1_end - peak1_start  # 0.9s
     
     # Divide first peak into thirds
     third_duration = peak1_duration / 3  # 0.3s each
     
-    region1_start = peak1_start                           # 1.21s - early starter
-    region1_peak = peak1_start + third_duration          # 1.51s - peaks in 1st third
-    region1_fade = peak1_start + 2 * third_duration      # 1.81s - fades in 2nd third
+    region1_start = peak1_start                           # early starter
+    region1_peak = peak1_start + third_duration          # peaks in 1st third
+    region1_fade = peak1_start + 2 * third_duration      # fades in 2nd third
     
-    region3_start = peak1_start + third_duration         # 1.51s - starts in 1st third
-    region3_peak = peak1_start + 2 * third_duration      # 1.81s - peaks in 2nd third  
-    region3_fade = peak1_end                             # 2.11s - fades at end
+    region3_start = peak1_start + third_duration         # starts in 1st third
+    region3_peak = peak1_start + 2 * third_duration      # peaks in 2nd third  
+    region3_fade = peak1_end                             # fades at end
     
     # Convert to percentages
     def time_to_percent(time_sec):
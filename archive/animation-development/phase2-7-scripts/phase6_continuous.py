@@ -4,7 +4,47 @@ Phase 6: Continuous Breathing - Eliminate Discrete Steps
 Create truly smooth, continuous brightness transitions that breathe naturally
 """
 
-def calculate_continuous_breathing():
+import io
+import sys
+
+from css_emitter import CSSEmitter, Tee, emit_region_rules, flare_declarations
+from keyframe_engine import CONTINUOUS_BUILDUP, CONTINUOUS_DECAY, compute_keyframes, region_array
+
+def continuous_keyframes(regions):
+    """Keyframes of every region (region_id -> timing dict) in one pass of the shared envelope engine"""
+    region_table = region_array(regions.values(), rise_exponent=1.5, decay_rate=2.5, floor=0.3, glow_floor=5)
+    return compute_keyframes(region_table, CONTINUOUS_BUILDUP, CONTINUOUS_DECAY)
+
+def continuous_keyframe_name(region_id):
+    """Keyframe name the .region-N rules animate with (region_1 -> flare-region-1-continuous)"""
+    return f"flare-{region_id.replace('_', '-')}-continuous"
+
+def emit_continuous_css(regions, sink, minify=False, dense=None):
+    """Stream the continuous-breathing stylesheet for the given regions to a sink"""
+    if dense is None:
+        dense = continuous_keyframes(regions)
+    
+    def region_frames(row, data):
+        """Rest, breathing and rest keyframes of one region"""
+        rest = flare_declarations('0.8', '0.3', 5, '0.4')
+        yield ['0%', f"{data['buildup_start']-0.5:.1f}%"], rest
+        for k in range(dense['time'].shape[1]):
+            opacity = f"{dense['opacity'][row, k]:.2f}"
+            yield [f"{dense['time'][row, k]:.1f}%"], flare_declarations(
+                f"{dense['scale'][row, k]:.2f}", opacity, f"{dense['glow'][row, k]:.0f}", opacity)
+        yield [f"{data['decay_end']+0.5:.1f}%", '100%'], rest
+    
+    emitter = CSSEmitter(sink, minify=minify)
+    emit_region_rules(emitter, continuous_keyframe_name, "6s cubic-bezier(0.4, 0.0, 0.2, 1) infinite",
+                      comment='Ultra-smooth continuous breathing animations')
+    for row, (region_id, data) in enumerate(regions.items()):
+        emitter.keyframes(
+            continuous_keyframe_name(region_id),
+            region_frames(row, data),
+            comment=f"{region_id.replace('_', ' ').title()} - Continuous breathing",
+        )
+
+def calculate_continuous_breathing(sink=None, minify=False):
     """Calculate dense keyframes for continuous breathing effect"""
     print("=== Phase 6: Continuous Breathing Animation ===\n")
     
@@ -39,122 +79,34 @@ def calculate_continuous_breathing():
         }
     }
     
-    def generate_smooth_keyframes(region_data):
-        """Generate dense keyframes for continuous breathing"""
-        peak = region_data['peak_time']
-        start = region_data['buildup_start']
-        end = region_data['decay_end']
-        max_scale = region_data['max_scale']
-        max_glow = region_data['max_glow']
-        
-        keyframes = []
-        
-        # Dense keyframes for smooth curves
-        points = [
-            # Buildup phase - exponential curve
-            start, start + (peak-start)*0.2, start + (peak-start)*0.4, 
-            start + (peak-start)*0.6, start + (peak-start)*0.8, peak,
-            # Decay phase - exponential decay  
-            peak + (end-peak)*0.1, peak + (end-peak)*0.25, peak + (end-peak)*0.45,
-            peak + (end-peak)*0.65, peak + (end-peak)*0.85, end
+    dense = continuous_keyframes(regions)
+    
+    def generate_smooth_keyframes(row):
+        """Keyframes of one region from the batched envelopes"""
+        return [
+            {key: float(values[row, k]) for key, values in dense.items()}
+            for k in range(dense['time'].shape[1])
         ]
-        
-        for i, time_percent in enumerate(points):
-            if time_percent <= peak:
-                # Buildup - smooth exponential curve
-                progress = (time_percent - start) / (peak - start)
-                # Use exponential curve: y = x^2 for smooth acceleration
-                brightness_factor = progress ** 1.5
-            else:
-                # Decay - smooth exponential decay
-                progress = (time_percent - peak) / (end - peak)
-                # Use exponential decay: y = e^(-2x) for natural falloff
-                import math
-                brightness_factor = math.exp(-2.5 * progress)
-            
-            # Calculate smooth values
-            opacity = 0.3 + (0.7 * brightness_factor)
-            scale = 0.8 + ((max_scale - 0.8) * brightness_factor)
-            glow = 5 + ((max_glow - 5) * brightness_factor)
-            
-            keyframes.append({
-                'time': time_percent,
-                'opacity': opacity,
-                'scale': scale,
-                'glow': glow
-            })
-        
-        return keyframes
     
     print(f"\n=== CONTINUOUS KEYFRAME GENERATION ===")
     
-    css_regions = []
-    
-    for region_id, data in regions.items():
-        keyframes = generate_smooth_keyframes(data)
+    for row, (region_id, data) in enumerate(regions.items()):
+        keyframes = generate_smooth_keyframes(row)
         
         print(f"\n{region_id.upper()}:")
         print(f"  Generated {len(keyframes)} keyframes for smooth breathing")
         
-        # Build CSS keyframes
-        css_keyframes = []
-        
-        # Start state
-        css_keyframes.append(f"    0%, {data['buildup_start']-0.5:.1f}% {{")
-        css_keyframes.append(f"        transform: scale(0.8);")
-        css_keyframes.append(f"        opacity: 0.3;")
-        css_keyframes.append(f"        box-shadow: 0 0 5px rgba(255, 255, 255, 0.4);")
-        css_keyframes.append(f"    }}")
-        
-        # Smooth breathing keyframes
-        for kf in keyframes:
-            css_keyframes.append(f"    {kf['time']:.1f}% {{")
-            css_keyframes.append(f"        transform: scale({kf['scale']:.2f});")
-            css_keyframes.append(f"        opacity: {kf['opacity']:.2f};")
-            css_keyframes.append(f"        box-shadow: 0 0 {kf['glow']:.0f}px rgba(255, 255, 255, {kf['opacity']:.2f});")
-            css_keyframes.append(f"    }}")
-        
-        # End state
-        css_keyframes.append(f"    {data['decay_end']+0.5:.1f}%, 100% {{")
-        css_keyframes.append(f"        transform: scale(0.8);")
-        css_keyframes.append(f"        opacity: 0.3;")
-        css_keyframes.append(f"        box-shadow: 0 0 5px rgba(255, 255, 255, 0.4);")
-        css_keyframes.append(f"    }}")
-        
-        region_css = f"""
-/* {region_id.replace('_', ' ').title()} - Continuous breathing */
-@keyframes flare-{region_id}-continuous {{
-{chr(10).join(css_keyframes)}
-}}"""
-        css_regions.append(region_css)
-        
         # Show sample keyframes
         print(f"  Sample keyframes:")
         for i in range(0, len(keyframes), 3):  # Show every 3rd keyframe
             kf = keyframes[i]
             print(f"    {kf['time']:.1f}%: scale({kf['scale']:.2f}) opacity({kf['opacity']:.2f}) glow({kf['glow']:.0f}px)")
     
-    # Complete CSS
-    css_code = f"""/* Ultra-smooth continuous breathing animations */
-.region-1 {{ 
-    top: 30%; left: 20%; 
-    animation: flare-region-1-continuous 6s cubic-bezier(0.4, 0.0, 0.2, 1) infinite;
-}}
-
-.region-2 {{ 
-    top: 60%; right: 25%; 
-    animation: flare-region-2-continuous 6s cubic-bezier(0.4, 0.0, 0.2, 1) infinite;
-}}
-
-.region-3 {{ 
-    bottom: 35%; left: 40%; 
-    animation: flare-region-3-continuous 6s cubic-bezier(0.4, 0.0, 0.2, 1) infinite;
-}}
-
-{chr(10).join(css_regions)}"""
-    
     print(f"\n=== COMPLETE CONTINUOUS CSS ===")
-    print(css_code)
+    # Stream the stylesheet to stdout and the caller's sink instead of building it in memory
+    buffer = io.StringIO() if sink is None else None
+    emit_continuous_css(regions, Tee(sys.stdout, sink if sink is not None else buffer), minify=minify, dense=dense)
+    print()
     
     print(f"\n=== KEY IMPROVEMENTS ===")
     print("1. 12+ keyframes per region (vs previous 6-7)")
@@ -164,13 +116,13 @@ def calculate_continuous_breathing():
     print("5. Truly continuous brightness transitions")
     print("6. Organic, living breathing effect")
     
-    return css_code
+    return buffer.getvalue() if buffer is not None else None
 
 if __name__ == "__main__":
-    css_code = calculate_continuous_breathing()
+    minify = '--minify' in sys.argv[1:]
     
     with open('continuous_breathing.css', 'w') as f:
-        f.write(css_code)
+        calculate_continuous_breathing(f, minify=minify)
     
     print(f"\nContinuous breathing CSS saved to 'continuous_breathing.css'")
     print("Ready to implement Phase 6!")
\ No newline at end of file
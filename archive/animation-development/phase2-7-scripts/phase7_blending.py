@@ -4,7 +4,66 @@ Phase 7: Enhanced Blending - Extended Overlapping Periods
 Extend timing ranges so regions blend together more naturally
 """
 
-def calculate_blended_timing():
+import io
+import sys
+
+from css_emitter import CSSEmitter, emit_region_rules, flare_declarations
+from keyframe_engine import BLENDED_BUILDUP, BLENDED_DECAY, compute_keyframes, region_array
+from region_intervals import overlap_report
+
+BLENDED_SHAPE = {'rise_exponent': 1.3, 'decay_rate': 1.8, 'floor': 0.25, 'glow_floor': 4}
+
+def blended_keyframes(regions):
+    """Keyframes of every region (region_id -> timing dict) in one pass of the shared envelope engine"""
+    region_table = region_array(regions.values(), **BLENDED_SHAPE)
+    return compute_keyframes(region_table, BLENDED_BUILDUP, BLENDED_DECAY)
+
+def print_overlaps(regions):
+    """Overlap periods, coverage and peak concurrency computed from the region windows"""
+    region_ids = list(regions)
+    label = lambda row: region_ids[row].replace('region_', '')
+    report = overlap_report(region_array(regions.values(), **BLENDED_SHAPE))
+    for overlap in report['overlaps']:
+        print(f"Region {label(overlap['first'])} & {label(overlap['second'])} overlap: "
+              f"{overlap['start']:g}% - {overlap['end']:g}% ({overlap['end'] - overlap['start']:.3g}% of animation)")
+    spans = ', '.join(f"{start:g}% - {end:g}%" for start, end in report['union'])
+    print(f"Total coverage: {spans} ({report['coverage']:.3g}% of animation has active flaring)")
+    print(f"Peak concurrency: {report['max_concurrency']} regions at {report['max_concurrency_time']:g}%")
+
+def blended_frames(data, dense, row):
+    """Rest, blended and rest keyframes of one region (row of the batched envelopes)"""
+    # Higher minimum at rest for blending
+    rest = flare_declarations('0.8', '0.25', 4, '0.3')
+    yield ['0%', f"{data['buildup_start']-1.0:.1f}%"], rest
+    for k in range(dense['time'].shape[1]):
+        opacity = f"{dense['opacity'][row, k]:.2f}"
+        yield [f"{dense['time'][row, k]:.1f}%"], flare_declarations(
+            f"{dense['scale'][row, k]:.2f}", opacity, f"{dense['glow'][row, k]:.0f}", opacity)
+    # End state with gradual return to minimum
+    yield [f"{data['decay_end']+2.0:.1f}%", '100%'], rest
+
+def blended_keyframe_name(region_id):
+    """Keyframe name the .region-N rules animate with (region_1 -> flare-region-1-blended)"""
+    return f"flare-{region_id.replace('_', '-')}-blended"
+
+def emit_blended_css(regions, sink, minify=False, keyframe_name=blended_keyframe_name):
+    """Stream the blended stylesheet for the given regions to a sink
+
+    keyframe_name maps a region id to its @keyframes name, in both the rules and the @keyframes
+    """
+    dense = blended_keyframes(regions)
+    
+    emitter = CSSEmitter(sink, minify=minify)
+    emit_region_rules(emitter, keyframe_name, "6s cubic-bezier(0.35, 0.0, 0.25, 1) infinite",
+                      comment='Enhanced blending with extended overlapping periods')
+    for row, (region_id, data) in enumerate(regions.items()):
+        emitter.keyframes(
+            keyframe_name(region_id),
+            blended_frames(data, dense, row),
+            comment=f"{region_id.replace('_', ' ').title()} - Enhanced blending",
+        )
+
+def calculate_blended_timing(sink=None, minify=False):
     """Calculate extended timing ranges for better region blending"""
     print("=== Phase 7: Enhanced Blending Animation ===\n")
     
@@ -42,128 +101,18 @@ def calculate_blended_timing():
         }
     }
     
-    def generate_blended_keyframes(region_data):
-        """Generate keyframes with extended blending periods"""
-        peak = region_data['peak_time']
-        start = region_data['buildup_start']
-        end = region_data['decay_end']
-        max_scale = region_data['max_scale']
-        max_glow = region_data['max_glow']
-        
-        keyframes = []
-        
-        # More gradual buildup points
-        buildup_points = [
-            start, 
-            start + (peak-start)*0.15,  # Very early
-            start + (peak-start)*0.35,  # Early
-            start + (peak-start)*0.60,  # Mid
-            start + (peak-start)*0.85,  # Late
-            peak                        # Peak
-        ]
-        
-        # Extended decay points for better blending
-        decay_points = [
-            peak + (end-peak)*0.08,   # Just after peak
-            peak + (end-peak)*0.20,   # Early decay
-            peak + (end-peak)*0.35,   # Mid decay
-            peak + (end-peak)*0.55,   # Late decay
-            peak + (end-peak)*0.75,   # Very late decay
-            peak + (end-peak)*0.90,   # Final fade
-            end                       # End
-        ]
-        
-        all_points = buildup_points + decay_points[1:]  # Skip duplicate peak
-        
-        for i, time_percent in enumerate(all_points):
-            if time_percent <= peak:
-                # Buildup - smooth exponential curve
-                progress = (time_percent - start) / (peak - start)
-                brightness_factor = progress ** 1.3  # Gentler curve for blending
-            else:
-                # Decay - very gradual exponential decay for extended blending
-                progress = (time_percent - peak) / (end - peak)
-                import math
-                brightness_factor = math.exp(-1.8 * progress)  # Slower decay for blending
-            
-            # Calculate smooth values with minimum brightness for blending
-            min_opacity = 0.25  # Higher minimum for better blending
-            opacity = min_opacity + ((1.0 - min_opacity) * brightness_factor)
-            scale = 0.8 + ((max_scale - 0.8) * brightness_factor)
-            glow = 4 + ((max_glow - 4) * brightness_factor)
-            
-            keyframes.append({
-                'time': time_percent,
-                'opacity': opacity,
-                'scale': scale,
-                'glow': glow
-            })
-        
-        return keyframes
-    
     print(f"\n=== EXTENDED BLENDING PERIODS ===")
     
-    css_regions = []
-    
     for region_id, data in regions.items():
-        keyframes = generate_blended_keyframes(data)
-        
         print(f"\n{region_id.upper()} - {data['name']}:")
         print(f"  Buildup: {data['buildup_start']:.1f}% - {data['peak_time']:.1f}%")
         print(f"  Peak: {data['peak_time']:.1f}%")
         print(f"  Decay: {data['peak_time']:.1f}% - {data['decay_end']:.1f}%")
         print(f"  Total duration: {data['decay_end'] - data['buildup_start']:.1f}% of animation")
-        
-        # Build CSS keyframes with extended periods
-        css_keyframes = []
-        
-        # Start state with higher minimum for blending
-        css_keyframes.append(f"    0%, {data['buildup_start']-1.0:.1f}% {{")
-        css_keyframes.append(f"        transform: scale(0.8);")
-        css_keyframes.append(f"        opacity: 0.25;")  # Higher minimum
-        css_keyframes.append(f"        box-shadow: 0 0 4px rgba(255, 255, 255, 0.3);")
-        css_keyframes.append(f"    }}")
-        
-        # Blended keyframes
-        for kf in keyframes:
-            css_keyframes.append(f"    {kf['time']:.1f}% {{")
-            css_keyframes.append(f"        transform: scale({kf['scale']:.2f});")
-            css_keyframes.append(f"        opacity: {kf['opacity']:.2f};")
-            css_keyframes.append(f"        box-shadow: 0 0 {kf['glow']:.0f}px rgba(255, 255, 255, {kf['opacity']:.2f});")
-            css_keyframes.append(f"    }}")
-        
-        # End state with gradual return to minimum
-        css_keyframes.append(f"    {data['decay_end']+2.0:.1f}%, 100% {{")
-        css_keyframes.append(f"        transform: scale(0.8);")
-        css_keyframes.append(f"        opacity: 0.25;")  # Higher minimum
-        css_keyframes.append(f"        box-shadow: 0 0 4px rgba(255, 255, 255, 0.3);")
-        css_keyframes.append(f"    }}")
-        
-        region_css = f"""
-/* {region_id.replace('_', ' ').title()} - Enhanced blending */
-@keyframes flare-{region_id}-blended {{
-{chr(10).join(css_keyframes)}
-}}"""
-        css_regions.append(region_css)
     
-    # Complete CSS with enhanced blending
-    css_code = f"""/* Enhanced blending with extended overlapping periods */
-.region-1 {{ 
-    top: 30%; left: 20%; 
-    animation: flare-region-1-blended 6s cubic-bezier(0.35, 0.0, 0.25, 1) infinite;
-}}
-
-.region-2 {{ 
-    top: 60%; right: 25%; 
-    animation: flare-region-2-blended 6s cubic-bezier(0.35, 0.0, 0.25, 1) infinite;
-}}
-
-.region-3 {{ 
-    bottom: 35%; left: 40%; 
-    animation: flare-region-3-blended 6s cubic-bezier(0.35, 0.0, 0.25, 1) infinite;
-}}
-
-{chr(10).join(css_regions)}"""
+    # Complete CSS with enhanced blending, streamed to the sink
+    buffer = io.StringIO() if sink is None else None
+    emit_blended_css(regions, sink if sink is not None else buffer, minify=minify)
     
     print(f"\n=== BLENDING IMPROVEMENTS ===")
     print("1. Extended Region 1 decay: 25.2% → 42% (overlaps with Region 3)")
@@ -174,17 +123,15 @@ def calculate_blended_timing():
     print("6. Continuous 'handoff' between all three regions")
     
     print(f"\n=== OVERLAP PERIODS ===")
-    print("Region 1 & 3 overlap: 22.2% - 42% (19.8% of animation)")
-    print("Region 3 & 2 overlap: 53% - 58% (5% of animation)")
-    print("Total coverage: 17.2% - 82.2% (65% of animation has active flaring)")
+    print_overlaps(regions)
     
-    return css_code
+    return buffer.getvalue() if buffer is not None else None
 
 if __name__ == "__main__":
-    css_code = calculate_blended_timing()
+    minify = '--minify' in sys.argv[1:]
     
     with open('blended_timing.css', 'w') as f:
-        f.write(css_code)
+        calculate_blended_timing(f, minify=minify)
     
     print(f"\nBlended timing CSS saved to 'blended_timing.css'")
     print("Ready to implement Phase 7!")
\ No newline at end of file
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Animation Pipeline - Phases 1-7 as One Cached DAG
+Recompute the flare CSS from the blog page's flux curve and pipeline_params.json, re-running
+only the stages whose inputs changed
+"""
+
+import argparse
+import ast
+import hashlib
+import inspect
+import io
+import json
+import os
+import pickle
+import sys
+import time
+from collections import namedtuple
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PHASE1_DIR = os.path.join(SCRIPT_DIR, '..', 'phase1-analysis')
+sys.path.insert(0, PHASE1_DIR)
+
+from analyze_svg_path import flux_event_timings
+from phase6_continuous import emit_continuous_css
+from phase7_blending import emit_blended_css
+from svg_path_parser import extract_path_data
+
+PARAMS_FILE = os.path.join(SCRIPT_DIR, 'pipeline_params.json')
+CACHE_DIR = os.path.join(SCRIPT_DIR, '.pipeline-cache')
+CACHE_MAX_ENTRIES = 256   # least recently used entries beyond this are deleted after each run
+
+# inputs maps each stage argument to a value name (a parameter or an upstream stage),
+# or to a list of names whose values are passed as a dict
+Stage = namedtuple('Stage', ['name', 'func', 'inputs'])
+
+
+def flux_path(page):
+    """Phase 1 input: the flux curve's path data from the blog page"""
+    return extract_path_data(page, 'fluxCurve')
+
+
+def flux_timings(path_d, duration):
+    """Phase 1: arc-length timings of the flux peaks and valley"""
+    timings = flux_event_timings(path_d, duration)
+    return {key: list(value) if isinstance(value, tuple) else value for key, value in timings.items()}
+
+
+def region_peaks(timings, first_peak):
+    """Phase 4: split the first peak between two regions, keep the second peak whole (percent)"""
+    duration = timings['duration']
+    first_time, second_time = timings['peak_times'][:2]
+    start = first_time - first_peak['lead']
+    third = (first_peak['lead'] + first_peak['tail']) / 3
+    to_percent = lambda seconds: round(seconds / duration * 100, 1)
+    return {
+        'first_peak_early': to_percent(start + third),
+        'first_peak_late': to_percent(start + 2 * third),
+        'second_peak': to_percent(second_time),
+    }
+
+
+def region_windows(peaks, region):
+    """Phases 5-7: buildup/peak/decay windows of one region for each animation style"""
+    peak = peaks[region['source']]
+    windows = {}
+    for style in ('continuous', 'blended'):
+        windows[style] = {
+            'name': region['name'],
+            'buildup_start': round(peak - region[style]['lead'], 1),
+            'peak_time': peak,
+            'decay_end': round(peak + region[style]['tail'], 1),
+            'max_scale': region['max_scale'],
+            'max_glow': region['max_glow'],
+        }
+    return windows
+
+
+def continuous_css(windows, minify):
+    """Phase 6 stylesheet"""
+    buffer = io.StringIO()
+    emit_continuous_css({region_id: data['continuous'] for region_id, data in windows.items()}, buffer, minify=minify)
+    return buffer.getvalue()
+
+
+def blended_css(windows, minify):
+    """Phase 7 stylesheet"""
+    buffer = io.StringIO()
+    emit_blended_css({region_id: data['blended'] for region_id, data in windows.items()}, buffer, minify=minify)
+    return buffer.getvalue()
+
+
+def build_stages(region_ids):
+    """The pipeline DAG in topological order; one window stage per region"""
+    window_names = [f'windows:{region_id}' for region_id in region_ids]
+    stages = [
+        Stage('flux_path', flux_path, {'page': 'page'}),
+        Stage('flux_timings', flux_timings, {'path_d': 'flux_path', 'duration': 'duration'}),
+        Stage('region_peaks', region_peaks, {'timings': 'flux_timings', 'first_peak': 'first_peak'}),
+    ]
+    for region_id, name in zip(region_ids, window_names):
+        stages.append(Stage(name, region_windows, {'peaks': 'region_peaks', 'region': f'region:{region_id}'}))
+    stages.append(Stage('continuous_css', continuous_css, {'windows': window_names, 'minify': 'minify'}))
+    stages.append(Stage('blended_css', blended_css, {'windows': window_names, 'minify': 'minify'}))
+    return stages
+
+
+def _resolve(reference, values):
+    if isinstance(reference, list):
+        return {name.split(':', 1)[1]: values[name] for name in reference}
+    return values[reference]
+
+
+def _module_file(name):
+    """Source file of an analysis/phase module, or None for anything else"""
+    for directory in (SCRIPT_DIR, PHASE1_DIR):
+        path = os.path.join(directory, f'{name}.py')
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def local_imports(name, found=None):
+    """Analysis/phase modules name imports, directly or transitively, itself included
+
+    Imports under `if __name__ == "__main__":` only run the demo, so they are skipped.
+    """
+    found = set() if found is None else found
+    path = _module_file(name)
+    if path is None or name in found:
+        return found
+    found.add(name)
+    with open(path) as f:
+        tree = ast.parse(f.read(), path)
+    for statement in tree.body:
+        if isinstance(statement, ast.If) and '__main__' in ast.dump(statement.test):
+            continue
+        for node in ast.walk(statement):
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    local_imports(alias.name, found)
+            elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+                local_imports(node.module, found)
+    return found
+
+
+def _code_names(code):
+    """Global names a code object and its nested functions/comprehensions refer to"""
+    names = set(code.co_names)
+    for constant in code.co_consts:
+        if inspect.iscode(constant):
+            names |= _code_names(constant)
+    return names
+
+
+def code_fingerprint(func):
+    """Hash of a stage function's source and of the modules it uses, so only edits to those
+    invalidate its cache entries"""
+    modules = set()
+    for name in _code_names(func.__code__):
+        value = func.__globals__.get(name)
+        module = value.__name__ if inspect.ismodule(value) else getattr(value, '__module__', None)
+        if module and module != '__main__':
+            local_imports(module, modules)
+    digest = hashlib.sha256(inspect.getsource(func).encode())
+    for module in sorted(modules):
+        with open(_module_file(module), 'rb') as f:
+            digest.update(module.encode())
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def prune_cache(cache_dir=CACHE_DIR, max_entries=CACHE_MAX_ENTRIES):
+    """Delete the least recently used cache entries beyond max_entries; returns how many"""
+    entries = [entry for entry in os.scandir(cache_dir) if entry.name.endswith('.pkl')]
+    if len(entries) <= max_entries:
+        return 0
+    entries.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    for entry in entries[max_entries:]:
+        os.remove(entry.path)
+    return len(entries) - max_entries
+
+
+def stage_key(stage, arguments, code):
+    """Content hash of a stage's name, its code fingerprint and the stage inputs"""
+    digest = hashlib.sha256()
+    digest.update(stage.name.encode())
+    digest.update(code.encode())
+    digest.update(json.dumps(arguments, sort_keys=True, default=repr).encode())
+    return digest.hexdigest()
+
+
+def run_pipeline(params, page, minify=False, cache_dir=CACHE_DIR, use_cache=True):
+    """Run every stage, loading unchanged ones from the on-disk cache; returns (values, report)"""
+    values = {
+        'page': page,
+        'duration': params['duration'],
+        'first_peak': params['first_peak'],
+        'minify': minify,
+    }
+    for region_id, region in params['regions'].items():
+        values[f'region:{region_id}'] = region
+    if use_cache:
+        os.makedirs(cache_dir, exist_ok=True)
+
+    fingerprints = {}
+    report = []
+    for stage in build_stages(list(params['regions'])):
+        started = time.perf_counter()
+        arguments = {arg: _resolve(reference, values) for arg, reference in stage.inputs.items()}
+        if stage.func not in fingerprints:
+            fingerprints[stage.func] = code_fingerprint(stage.func)
+        key = stage_key(stage, arguments, fingerprints[stage.func])
+        path = os.path.join(cache_dir, f'{key}.pkl')
+        status = 'miss'
+        if use_cache and os.path.exists(path):
+            with open(path, 'rb') as f:
+                values[stage.name] = pickle.load(f)
+            os.utime(path)  # mark as recently used for prune_cache
+            status = 'hit'
+        else:
+            values[stage.name] = stage.func(**arguments)
+            if use_cache:
+                # Write-then-rename so an interrupted run never leaves a truncated entry
+                with open(path + '.tmp', 'wb') as f:
+                    pickle.dump(values[stage.name], f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(path + '.tmp', path)
+        report.append((stage.name, status, time.perf_counter() - started))
+    if use_cache:
+        prune_cache(cache_dir)
+    return values, report
+
+
+def load_params(path=PARAMS_FILE):
+    """Pipeline parameters with the blog page path resolved against the params file"""
+    with open(path) as f:
+        params = json.load(f)
+    params['blog_page'] = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(path)), params['blog_page']))
+    return params
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild the flare animation CSS from the flux curve")
+    parser.add_argument('--params', default=PARAMS_FILE, help="pipeline parameters (JSON)")
+    parser.add_argument('--out', default='.', help="directory for the generated .css files")
+    parser.add_argument('--minify', action='store_true', help="emit minified CSS")
+    parser.add_argument('--no-cache', action='store_true', help="recompute every stage")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    params = load_params(args.params)
+    with open(params['blog_page']) as f:
+        page = f.read()
+    values, report = run_pipeline(params, page, minify=args.minify, use_cache=not args.no_cache)
+
+    print("=== Animation Pipeline ===\n")
+    for name, status, seconds in report:
+        print(f"  {name:<22} {status:<5} {seconds * 1000:8.2f}ms")
+    peaks = values['region_peaks']
+    print(f"\nRegion peaks: {', '.join(f'{source} {percent:.1f}%' for source, percent in peaks.items())}")
+
+    os.makedirs(args.out, exist_ok=True)
+    for stage_name, filename in (('continuous_css', 'continuous_breathing.css'), ('blended_css', 'blended_timing.css')):
+        with open(os.path.join(args.out, filename), 'w') as f:
+            f.write(values[stage_name])
+        print(f"Wrote {filename} ({len(values[stage_name])} bytes)")
+    print(f"Total: {(time.perf_counter() - started) * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Watch Mode - Keep the Blog Page's Flare Animation in Sync
+Watch the region parameters and the flux curve in the blog page, regenerate only the
+@keyframes blocks whose inputs changed and splice them into the page in place when the
+frame simulator scores the result in better sync with the flux curve
+"""
+
+import argparse
+import io
+import os
+import re
+import time
+
+from css_emitter import CSSEmitter
+from frame_simulator import score_stylesheet
+from phase7_blending import blended_frames, blended_keyframe_name, blended_keyframes
+from pipeline import PARAMS_FILE, flux_path, load_params, run_pipeline
+
+# Generated blocks in the page's <style> are wrapped in marker comments:
+#     /* @generated flare-region-1-blended */ ... /* @end flare-region-1-blended */
+MARKER = re.compile(rb'^([ \t]*)/\* @generated ([\w-]+) \*/\n(.*?)^[ \t]*/\* @end \2 \*/', re.MULTILINE | re.DOTALL)
+
+
+def build_index(data):
+    """Byte-offset index of the marked blocks: name -> [start, end, indent]"""
+    return {
+        match.group(2).decode(): [match.start(3), match.end(3), match.group(1).decode()]
+        for match in MARKER.finditer(data)
+    }
+
+
+def splice(data, index, name, block):
+    """Replace one marked block in place and shift the offsets of every block after it"""
+    start, end, _ = index[name]
+    data[start:end] = block
+    delta = len(block) - (end - start)
+    index[name][1] = start + len(block)
+    for entry in index.values():
+        if entry[0] > start:
+            entry[0] += delta
+            entry[1] += delta
+
+
+def render_keyframes(region_id, window, indent, minify=False):
+    """One region's @keyframes block, indented to sit between its markers"""
+    dense = blended_keyframes({region_id: window})
+    buffer = io.StringIO()
+    CSSEmitter(buffer, minify=minify).keyframes(
+        blended_keyframe_name(region_id),
+        blended_frames(window, dense, 0),
+        comment=f"{region_id.replace('_', ' ').title()} - Enhanced blending",
+    )
+    lines = buffer.getvalue().split('\n')
+    return ('\n'.join(indent + line if line else line for line in lines) + '\n').encode()
+
+
+class BlogPatcher:
+    """Incrementally patches the generated animation blocks of one blog page"""
+
+    def __init__(self, params_path=PARAMS_FILE, page_path=None, minify=False):
+        self.params_path = params_path
+        self.page_path = page_path or load_params(params_path)['blog_page']
+        self.minify = minify
+        self.data = None
+        self.index = None
+        self._page_mtime = None
+        self._rendered = {}   # name -> (window, indent, block) of the last render
+        self.rejected = None  # (names, sync error before, after) of the last patch the simulator rejected
+
+    def _stamp(self):
+        return os.stat(self.page_path).st_mtime_ns, os.stat(self.params_path).st_mtime_ns
+
+    def sync(self):
+        """Regenerate and splice every block whose inputs changed; returns the patched names
+
+        The patched page is kept only when its simulated sync error is lower than the current
+        page's; otherwise the page is left untouched and the attempt recorded in rejected
+        """
+        page_mtime = os.stat(self.page_path).st_mtime_ns
+        if page_mtime != self._page_mtime:
+            # Edited outside the watcher: rebuild the index (one regex pass, no HTML parsing)
+            with open(self.page_path, 'rb') as f:
+                self.data = bytearray(f.read())
+            self.index = build_index(self.data)
+
+        params = load_params(self.params_path)
+        values, _ = run_pipeline(params, self.data.decode(), minify=self.minify)
+
+        data, index = bytearray(self.data), {name: list(entry) for name, entry in self.index.items()}
+        patched = []
+        self.rejected = None
+        for region_id in params['regions']:
+            name = blended_keyframe_name(region_id)
+            window = values[f'windows:{region_id}']['blended']
+            if name not in index:
+                continue
+            start, end, indent = index[name]
+            # Re-render only when the window changed, but always compare with the page's bytes
+            # so hand edits inside a marked block are repaired
+            if self._rendered.get(name, (None, None))[:2] != (window, indent):
+                self._rendered[name] = (window, indent, render_keyframes(region_id, window, indent, self.minify))
+            block = self._rendered[name][2]
+            if data[start:end] != block:
+                splice(data, index, name, block)
+                patched.append(name)
+
+        if patched:
+            path_d = flux_path(self.data.decode())
+            before = score_stylesheet(self.data.decode(), path_d, params['duration'])['sync_error']
+            after = score_stylesheet(data.decode(), path_d, params['duration'])['sync_error']
+            if after >= before:
+                self.rejected = (patched, before, after)
+                patched = []
+        if patched:
+            self.data, self.index = data, index
+            # Write-then-rename so the dev server never serves a half-written page
+            with open(self.page_path + '.tmp', 'wb') as f:
+                f.write(self.data)
+            os.replace(self.page_path + '.tmp', self.page_path)
+        self._page_mtime = os.stat(self.page_path).st_mtime_ns
+        return patched
+
+    def watch(self, interval=0.1):
+        """Poll the page and the parameters, patching on every change until interrupted"""
+        stamp = None
+        while True:
+            current = self._stamp()
+            if current != stamp:
+                started = time.perf_counter()
+                patched = self.sync()
+                if patched:
+                    print(f"Patched {', '.join(patched)} in {(time.perf_counter() - started) * 1000:.1f}ms")
+                report_rejected(self.rejected)
+                stamp = self._stamp()
+            time.sleep(interval)
+
+
+def report_rejected(rejected):
+    """Say which regenerated blocks were left out of the page and why"""
+    if rejected:
+        names, before, after = rejected
+        print(f"Left {', '.join(names)} unpatched: sync error {before:.4f} -> {after:.4f} is no improvement")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Keep the blog page's flare @keyframes in sync with the pipeline")
+    parser.add_argument('--params', default=PARAMS_FILE, help="pipeline parameters (JSON)")
+    parser.add_argument('--page', default=None, help="blog page to patch (default: blog_page from the parameters)")
+    parser.add_argument('--minify', action='store_true', help="splice minified @keyframes")
+    parser.add_argument('--interval', type=float, default=0.1, help="poll interval in seconds")
+    parser.add_argument('--once', action='store_true', help="sync once and exit")
+    args = parser.parse_args(argv)
+
+    patcher = BlogPatcher(args.params, args.page, args.minify)
+    print(f"=== Watching {patcher.page_path} ===")
+    if args.once:
+        started = time.perf_counter()
+        patched = patcher.sync()
+        print(f"Patched {', '.join(patched) or 'nothing'} in {(time.perf_counter() - started) * 1000:.1f}ms")
+        report_rejected(patcher.rejected)
+        return
+    try:
+        patcher.watch(args.interval)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()